@@ -0,0 +1,38 @@
+from src.config.config_price import SIGMOID_K, SIGMOID_X0, LOWER_THRESHOLD, UPPER_THRESHOLD, SCORE_AT_LOWER, MAX_SCORE
+
+
+###------ CURVAS DECLARATIVAS ------###
+# Curvas de precio definidas sin código (compiladas en src/utils/curve_dsl.py).
+# Cada curva: "base" (MAX_PRICE o REF_PRICE, x = price / base) y "expr", la
+# fracción de puntuación f(x) en [0, 1]:
+#   P = MIN_SCORE + (MAX_SCORE - MIN_SCORE) * f(x)
+#
+# Expresiones disponibles:
+#   {"points": [[x, f], ...]}                        interpolación lineal entre puntos de control
+#   {"logistic": {"k": k, "x0": x0, "center": 1.0}}  1 / (1 + e^(k * (x - center - x0)))
+#   {"power": {"exponent": p}}                        1 - x^p
+#   {"clamp": {"expr": ..., "min": a, "max": b}}      limita la expresión a [a, b]
+#   {"piecewise": [{"upto": x1, "expr": ...}, ..., {"expr": ...}]}
+#   número                                            fracción constante
+
+CURVE_DEFINITIONS = {
+    # Puntos de control de la sigmoide como tramos lineales (x = price / REF_PRICE)
+    "tramos": {
+        "base": "REF_PRICE",
+        "expr": {"points": [
+            [0.0, 1.0],
+            [LOWER_THRESHOLD, SCORE_AT_LOWER / MAX_SCORE],
+            [UPPER_THRESHOLD, 0.0],
+        ]},
+    },
+    # Misma logística que la curva 'sigmoid', definida en configuración
+    "logistica": {
+        "base": "REF_PRICE",
+        "expr": {"logistic": {"k": SIGMOID_K, "x0": SIGMOID_X0}},
+    },
+    # Caída cuadrática hasta MAX_PRICE
+    "potencia": {
+        "base": "MAX_PRICE",
+        "expr": {"clamp": {"expr": {"power": {"exponent": 2.0}}, "min": 0.0, "max": 1.0}},
+    },
+}
@@ -54,3 +54,8 @@ MAX_PROJECTS_PER_DISCIPLINA = 5
 
 MIN_SCORE_PER_PROJECT = 1
 MAX_SCORE_PER_PROJECT = 100
+
+
+# --- near-duplicate projects across competitors ---
+# Minimum Jaccard similarity of the normalized names (character trigrams) to flag a pair
+DUPLICATE_SIMILARITY = 0.7
@@ -1,4 +1,4 @@
-import math
+import numpy as np
 
 
 ###------ SCORING CONFIGURATION ------###
@@ -22,34 +22,47 @@ MAX_PRICE = 953_405.00
 # ES RESTELO = 1_050_000.00
 REF_PRICE = MAX_PRICE / UPPER_THRESHOLD
 
-# Conversion en fracciones normalizadas (0-1) para el calculo en sigmoide
-s_low = SCORE_AT_LOWER / MAX_SCORE
-s_up  = SCORE_AT_UPPER  / MAX_SCORE
 
-# Relative positions (x_rel = price/REF_PRICE – 1)
-L_rel = LOWER_THRESHOLD - 1.0
-U_rel = UPPER_THRESHOLD - 1.0
+def calc_sigmoid_params(score_at_lower, score_at_upper, lower_threshold, upper_threshold, max_score=MAX_SCORE):
+    """
+    Solve the logistic steepness k and centre x0 from the two control points.
+    Works on floats or on NumPy arrays of control points (e.g. calibration grids).
 
-# For a logistic of the form
-#   score_frac(x_rel) = 1 / (1 + exp(  k*(x_rel – x0)  )),
-# we need to solve for k and x0 given:
-#   score_frac(L_rel) = s_low
-#   score_frac(U_rel) = s_up
+    Returns:
+        (k, x0)
+    """
+    # Conversion en fracciones normalizadas (0-1) para el calculo en sigmoide
+    s_low = np.asarray(score_at_lower, dtype=float) / max_score
+    s_up  = np.asarray(score_at_upper, dtype=float) / max_score
 
-# 1) α_low  = exp( k*(L_rel – x0) ) = (1/s_low) – 1
-# 2) α_up   = exp( k*(U_rel – x0) ) = (1/s_up)  – 1
-# ⇒ dividing (1)/(2):
-#    exp[ k*(L_rel – U_rel) ] = α_low / α_up
-# ⇒  k = ln(α_low/α_up) / (L_rel – U_rel)
+    # Relative positions (x_rel = price/REF_PRICE – 1)
+    L_rel = np.asarray(lower_threshold, dtype=float) - 1.0
+    U_rel = np.asarray(upper_threshold, dtype=float) - 1.0
 
-alpha_low = (1.0 / s_low) - 1.0
-alpha_up  = (1.0 / s_up)  - 1.0
+    # For a logistic of the form
+    #   score_frac(x_rel) = 1 / (1 + exp(  k*(x_rel – x0)  )),
+    # we need to solve for k and x0 given:
+    #   score_frac(L_rel) = s_low
+    #   score_frac(U_rel) = s_up
 
-SIGMOID_K  = math.log(alpha_low / alpha_up) / (L_rel - U_rel)
+    # 1) α_low  = exp( k*(L_rel – x0) ) = (1/s_low) – 1
+    # 2) α_up   = exp( k*(U_rel – x0) ) = (1/s_up)  – 1
+    # ⇒ dividing (1)/(2):
+    #    exp[ k*(L_rel – U_rel) ] = α_low / α_up
+    # ⇒  k = ln(α_low/α_up) / (L_rel – U_rel)
 
-# print(f"SIGMOIDE k: {SIGMOID_K}")
+    alpha_low = (1.0 / s_low) - 1.0
+    alpha_up  = (1.0 / s_up)  - 1.0
+
+    k = np.log(alpha_low / alpha_up) / (L_rel - U_rel)
+
+    # 2) then from α_low = exp[k*(L_rel – x0)]  ⇒  x0 = L_rel - ln(α_low)/k
+    x0 = L_rel - (np.log(alpha_low) / k)
 
-# 2) then from α_low = exp[k*(L_rel – x0)]  ⇒  x0 = L_rel - ln(α_low)/k
-SIGMOID_X0 = L_rel - (math.log(alpha_low) / SIGMOID_K)
+    return k, x0
 
-# print(f"SIGMOIDE x0: {SIGMOID_X0}")
\ No newline at end of file
+
+SIGMOID_K, SIGMOID_X0 = (float(v) for v in calc_sigmoid_params(SCORE_AT_LOWER, SCORE_AT_UPPER, LOWER_THRESHOLD, UPPER_THRESHOLD))
+
+# print(f"SIGMOIDE k: {SIGMOID_K}")
+# print(f"SIGMOIDE x0: {SIGMOID_X0}")
@@ -0,0 +1,114 @@
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime
+from types import MappingProxyType
+from typing import Mapping, Tuple
+import copy
+
+from src.config.config_price import (
+    MAX_SCORE, MAX_PRICE, LOWER_THRESHOLD, UPPER_THRESHOLD, SCORE_AT_LOWER, SCORE_AT_UPPER, calc_sigmoid_params,
+)
+from src.config.config_linear import (
+    CURRENT_DATE, DATE_LIMITS, ACCEPTED_DATE_FORMATS, FACTOR_WEIGHTS, FACTOR_THRESHOLDS,
+    MAX_PROJECTS_PER_DISCIPLINA, MIN_SCORE_PER_PROJECT, MAX_SCORE_PER_PROJECT,
+)
+from src.utils.calibration import calibrate
+
+
+def _frozen(mapping):
+    """Read-only deep copy of a (nested) dict."""
+    return MappingProxyType({
+        key: _frozen(value) if isinstance(value, Mapping) else copy.deepcopy(value)
+        for key, value in mapping.items()
+    })
+
+
+def _thawed(mapping):
+    """Plain (nested) dict copy of a read-only mapping."""
+    return {key: _thawed(value) if isinstance(value, Mapping) else value for key, value in mapping.items()}
+
+
+def _restore_context(settings):
+    return ScoringContext(**settings)
+
+
+@dataclass(frozen=True, eq=False)
+class ScoringContext:
+    """
+    Immutable set of scoring settings for one tender / calibration.
+
+    Holds what config_price.py and config_linear.py define at import time, plus
+    the constants derived from them (REF_PRICE, MIN_SCORE, sigmoid k and x0),
+    computed once when the context is created. Contexts are read-only, so one
+    process can evaluate several tenders (even concurrently) by passing a
+    different context to evaluate_bids / evaluate_linear_abs.
+
+    Use ScoringContext() for the config defaults and .replace(...) for variants.
+    """
+    # --- price ---
+    max_price: float = MAX_PRICE
+    max_score: float = MAX_SCORE
+    score_at_lower: float = SCORE_AT_LOWER
+    score_at_upper: float = SCORE_AT_UPPER
+    lower_threshold: float = LOWER_THRESHOLD
+    upper_threshold: float = UPPER_THRESHOLD
+    # Extra sigmoid control points (fraction of REF_PRICE, score): with them k and
+    # x0 are fitted by least squares through all points instead of the closed form
+    sigmoid_points: Tuple[Tuple[float, float], ...] = ()
+
+    # --- linear / factors ---
+    factor_weights: Mapping = field(default_factory=lambda: FACTOR_WEIGHTS)
+    factor_thresholds: Mapping = field(default_factory=lambda: FACTOR_THRESHOLDS)
+    max_projects_per_disciplina: int = MAX_PROJECTS_PER_DISCIPLINA
+    min_score_per_project: float = MIN_SCORE_PER_PROJECT
+    max_score_per_project: float = MAX_SCORE_PER_PROJECT
+
+    # --- dates ---
+    current_date: datetime = CURRENT_DATE
+    date_limits: Mapping = field(default_factory=lambda: DATE_LIMITS)
+    accepted_date_formats: Tuple[str, ...] = tuple(ACCEPTED_DATE_FORMATS)
+
+    # --- derived (computed in __post_init__) ---
+    ref_price: float = field(init=False)
+    min_score: float = field(init=False)
+    sigmoid_k: float = field(init=False)
+    sigmoid_x0: float = field(init=False)
+
+    def __post_init__(self):
+        # frozen: set through object.__setattr__
+        object.__setattr__(self, "factor_weights", _frozen(self.factor_weights))
+        object.__setattr__(self, "factor_thresholds", _frozen(self.factor_thresholds))
+        object.__setattr__(self, "date_limits", _frozen(self.date_limits))
+        object.__setattr__(self, "accepted_date_formats", tuple(self.accepted_date_formats))
+        object.__setattr__(self, "sigmoid_points", tuple(tuple(point) for point in self.sigmoid_points))
+
+        if self.sigmoid_points:
+            # Memoized: contexts with the same control points share one solve
+            calibration = calibrate("sigmoid", self.control_points(), self.max_score, self.upper_threshold)
+            k, x0 = calibration.params["k"], calibration.params["x0"]
+        else:
+            k, x0 = calc_sigmoid_params(self.score_at_lower, self.score_at_upper,
+                                        self.lower_threshold, self.upper_threshold, self.max_score)
+        object.__setattr__(self, "ref_price", self.max_price / self.upper_threshold)
+        object.__setattr__(self, "min_score", self.score_at_upper)
+        object.__setattr__(self, "sigmoid_k", float(k))
+        object.__setattr__(self, "sigmoid_x0", float(x0))
+
+    def control_points(self) -> Tuple[Tuple[float, float], ...]:
+        """Sigmoid control points: lower and upper thresholds plus sigmoid_points."""
+        return ((self.lower_threshold, self.score_at_lower), (self.upper_threshold, self.score_at_upper),
+                *self.sigmoid_points)
+
+    def replace(self, **changes) -> "ScoringContext":
+        """New context with some settings changed (derived constants are recomputed)."""
+        return replace(self, **changes)
+
+    def __reduce__(self):
+        # Pickled as its settings (mappingproxy cannot be pickled), e.g. for process pools
+        settings = {
+            f.name: _thawed(getattr(self, f.name)) if isinstance(getattr(self, f.name), Mapping) else getattr(self, f.name)
+            for f in fields(self) if f.init
+        }
+        return _restore_context, (settings,)
+
+
+DEFAULT_CONTEXT = ScoringContext()
@@ -0,0 +1,90 @@
+import argparse
+from datetime import datetime
+import os
+
+from src.config.config_price import MAX_SCORE, MAX_PRICE, LOWER_THRESHOLD, UPPER_THRESHOLD, SCORE_AT_LOWER, SCORE_AT_UPPER
+from src.utils.artifacts import ArtifactWriter, ARTIFACTS
+from src.utils.calibration import CALIBRATION_FAMILIES, calibrate
+from src.utils.report import Column, Report, REPORT_FORMATS
+
+RESIDUAL_COLUMNS = [
+    Column("x (REF_PRICE)", 16, ".4f"),
+    Column("Preço (€)", 20, ",.2f"),
+    Column("Pontuação alvo", 18, ".4f"),
+    Column("Pontuação ajust.", 18, ".4f"),
+    Column("Resíduo", 14, ".6f"),
+]
+
+
+def parse_points(values):
+    """Parse CLI control points "x:score" (x as a fraction of REF_PRICE)."""
+    points = []
+    for token in values:
+        try:
+            x, score = (float(v) for v in token.split(":"))
+        except ValueError:
+            raise ValueError(f"Control point must be 'x:score' (e.g. 0.8:80), got '{token}'")
+        points.append((x, score))
+    return points
+
+
+def calibration_report(calibrations, max_price=MAX_PRICE, upper_threshold=UPPER_THRESHOLD):
+    """Report with the fitted parameters and the per-point residuals of each family."""
+    ref_price = max_price / upper_threshold
+    report = Report()
+    report.text("=" * 80, "PRICE CURVE CALIBRATION", "=" * 80)
+    for calibration in calibrations:
+        family = CALIBRATION_FAMILIES[calibration.family]
+        params = " || ".join(f"{name} = {value:.6f}" for name, value in calibration.params.items())
+        report.text(
+            "",
+            f"{calibration.family.upper()} ({len(calibration.points)} control points):",
+            "-" * 50,
+            f"Formula: P = MIN + (MAX - MIN) * f(x) || {family.formula} || x = OFERTA / REF_PRICE",
+            f"Parameters: {params}",
+            f"Residuals: RMS = {calibration.rms:.6f} pts || max |r| = {calibration.max_abs:.6f} pts || "
+            f"{'converged' if calibration.converged else 'NOT converged'} in {calibration.iterations} iteration(s)",
+            "",
+        )
+        report.table(RESIDUAL_COLUMNS, [
+            (x, x * ref_price, score, score + residual, residual)
+            for (x, score), residual in zip(calibration.points, calibration.residuals)
+        ], title=calibration.family)
+    report.text("", "=" * 80)
+    return report
+
+
+def run_calibration(family_names, points, skip=()):
+    """Calibrate each family to the control points, print the report and save it."""
+    timestamp = datetime.now().strftime("%y%m%d-%H%M")
+    output_folder = "data/output"
+    os.makedirs(output_folder, exist_ok=True)
+
+    calibrations = [calibrate(family_name, points, MAX_SCORE, UPPER_THRESHOLD) for family_name in family_names]
+    report = calibration_report(calibrations)
+
+    report_base = os.path.join(output_folder, f"{timestamp}_{'_'.join(family_names)}_CalibracaoPreco")
+    with ArtifactWriter(skip) as writer:
+        report.write(report_base, REPORT_FORMATS, writer)
+    for filename in writer.written:
+        print(f"\nCalibration report saved to: {filename}")
+    return calibrations
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Fit price-curve parameters to N control points.')
+    parser.add_argument('--families', '-f', type=str, nargs='+', choices=list(CALIBRATION_FAMILIES), default=['sigmoid'],
+                        help='Curve families to calibrate (default: sigmoid).')
+    parser.add_argument('--points', '-p', type=str, nargs='+',
+                        default=[f"{LOWER_THRESHOLD}:{SCORE_AT_LOWER}", f"{UPPER_THRESHOLD}:{SCORE_AT_UPPER}"],
+                        help='Control points x:score, x as a fraction of REF_PRICE '
+                             f'(default: {LOWER_THRESHOLD}:{SCORE_AT_LOWER} {UPPER_THRESHOLD}:{SCORE_AT_UPPER}).')
+    parser.add_argument('--skip', type=str, nargs='+', choices=[a for a in ARTIFACTS if a != 'png'], default=['csv', 'pdf'],
+                        help='Report files not to write (default: csv pdf).')
+
+    args = parser.parse_args()
+
+    try:
+        run_calibration(list(dict.fromkeys(args.families)), parse_points(args.points), skip=args.skip)
+    except ValueError as e:
+        parser.error(str(e))
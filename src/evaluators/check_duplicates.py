@@ -0,0 +1,89 @@
+import argparse
+from datetime import datetime
+import os
+
+from src.config.config_linear import DUPLICATE_SIMILARITY
+from src.utils.artifacts import ArtifactWriter, ARTIFACTS
+from src.utils.excel_handler import read_excel_folder
+from src.utils.project_index import ProjectIndex
+from src.utils.report import Column, Report, REPORT_FORMATS
+
+DUPLICATE_COLUMNS = [
+    Column("Sim.", 7, ".2f"),
+    Column("Conc.", 7),
+    Column("Local", 18),
+    Column("Projeto", 40),
+    Column("Valor (€)", 18, ",.2f"),
+    Column("Data", 12),
+    Column("Conc.", 7),
+    Column("Local", 18),
+    Column("Projeto", 40),
+    Column("Valor (€)", 18, ",.2f"),
+    Column("Data", 12),
+    Column("Divergências", 14),
+]
+
+
+def _date_text(date):
+    return date.strftime("%d/%m/%Y") if date is not None else "-"
+
+
+def duplicates_report(matches, n_projects, threshold):
+    """Report with one row per pair of (probably) equal projects declared by different competitors."""
+    report = Report()
+    report.text(
+        "=" * 80,
+        "PROJETOS REPETIDOS ENTRE CONCORRENTES",
+        "=" * 80,
+        f"{n_projects} projetos declarados || semelhança mínima dos nomes: {threshold:.2f} "
+        f"(Jaccard de trigramas, nomes normalizados, mesmos números e letra final)",
+        f"{len(matches)} pares encontrados, "
+        f"{sum(1 for m in matches if m.cost_differs)} com valores diferentes, "
+        f"{sum(1 for m in matches if m.date_differs)} com datas diferentes",
+        "",
+    )
+    report.table(DUPLICATE_COLUMNS, [
+        (m.similarity,
+         m.first.competitor_id, m.first.location, m.first.name, m.first.cost, _date_text(m.first.date),
+         m.second.competitor_id, m.second.location, m.second.name, m.second.cost, _date_text(m.second.date),
+         ", ".join(m.disagreements()) or "-")
+        for m in matches
+    ], title="duplicados")
+    return report
+
+
+def check_duplicates(input_dir="data/input", threshold=DUPLICATE_SIMILARITY, skip=(), workers=1):
+    """Read the competitor workbooks, flag projects declared by several competitors and save the report."""
+    timestamp = datetime.now().strftime("%y%m%d-%H%M")
+    output_folder = "data/output"
+    os.makedirs(output_folder, exist_ok=True)
+
+    competitors = read_excel_folder(input_dir, workers=workers)
+    index = ProjectIndex.from_competitors(competitors)
+    matches = index.duplicates(threshold)
+    report = duplicates_report(matches, len(index.entries), threshold)
+
+    report_base = os.path.join(output_folder, f"{timestamp}_ProjetosRepetidos")
+    with ArtifactWriter(skip) as writer:
+        report.write(report_base, REPORT_FORMATS, writer, page_size="A3", landscape_mode=True)
+    for filename in writer.written:
+        print(f"\nDuplicates report saved to: {filename}")
+    return matches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Flag projects declared by several competitors under similar names.')
+    parser.add_argument('--input-dir', type=str, default="data/input",
+                        help='Directory with the Excel input files (default: data/input).')
+    parser.add_argument('--threshold', '-t', type=float, default=DUPLICATE_SIMILARITY,
+                        help=f'Minimum name similarity, 0 to 1 (default: {DUPLICATE_SIMILARITY}).')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Worker processes parsing the Excel workbooks (default: 1 = no pool, 0 = all cores).')
+    parser.add_argument('--skip', type=str, nargs='+', choices=[a for a in ARTIFACTS if a != 'png'], default=['pdf'],
+                        help='Report files not to write (default: pdf).')
+
+    args = parser.parse_args()
+
+    if not 0 < args.threshold <= 1:
+        parser.error("--threshold must be in (0, 1]")
+    check_duplicates(args.input_dir, args.threshold, skip=args.skip, workers=args.workers or None)
@@ -1,250 +1,329 @@
+import argparse
 from datetime import datetime
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 import numpy as np
 import os
 
-from src.config.config_linear import FACTOR_THRESHOLDS, FACTOR_WEIGHTS, MAX_PROJECTS_PER_DISCIPLINA, MIN_SCORE_PER_PROJECT, MAX_SCORE_PER_PROJECT
+from src.config.scoring_context import DEFAULT_CONTEXT, ScoringContext
+from src.models.columnar import ProjectTable
 from src.utils.curves import linear_abs
-from src.utils.excel_handler import read_excel_folder
+from src.utils.date_validation import parse_date
+from src.utils.excel_handler import read_excel_table
+from src.utils.fixed_point import MICRO_POINTS, to_fixed, linear_abs_micropoints, weighted_total, tie_groups
+from src.utils.artifacts import ArtifactWriter, ARTIFACTS
+from src.utils.report import Column, Report, REPORT_FORMATS
 
-def evaluate_linear_abs(use_excel: bool = False, excel_dir: str = "data/input"):
+# Columns of the factor A table (rows, subtotals and totals share them)
+LINEAR_COLUMNS = [
+    Column("Concorrente", 15),
+    Column("f.ID", 9),
+    Column("Factor", 54),
+    Column("Disciplina", 18),
+    Column("Projeto", 76),
+    Column("Custo (€)", 21, ",.2f"),
+    Column("Pontuação", 12, ".4f"),
+    Column("Status", 9),
+    Column("Observações", 36),
+]
+
+
+def grouped_rows(results, disciplina_scores, factor_scores, final_scores, sep):
+    """
+    Table rows of the factor A report: every result row followed by the
+    disciplina subtotal, factor subtotal and concorrente total rows whenever
+    the group changes (None = blank cell, plain strings = separator lines).
+    """
+    rows = []
+
+    def close_disciplina(cid, fid, disciplina):
+        rows.extend([(cid, fid, None, disciplina, None, None, disciplina_scores[cid][fid][disciplina], None, None), ""])
+
+    def close_factor(cid, fid):
+        rows.extend([sep, (cid, fid, "SUBTOTAL", None, None, None, factor_scores[cid][fid], None, None)])
+
+    def close_concorrente(cid):
+        rows.extend([
+            sep,
+            (cid, "TOTAL", "*Pontuação do Factor A com ponderação por subfator", None, None, None, final_scores[cid], None, None),
+            sep,
+            "",
+            sep,
+        ])
+
+    last_cid = last_fid = last_disciplina = None
+    for row in results:
+        cid, fid, _, disciplina = row[:4]
+
+        if last_cid is not None and cid != last_cid:
+            # When concorrente changes, close all previous groups
+            close_disciplina(last_cid, last_fid, last_disciplina)
+            close_factor(last_cid, last_fid)
+            close_concorrente(last_cid)
+        elif last_cid is not None and fid != last_fid:
+            # When factor changes within same concorrente
+            close_disciplina(last_cid, last_fid, last_disciplina)
+            close_factor(last_cid, last_fid)
+            rows.append(sep)
+        elif last_disciplina is not None and disciplina != last_disciplina:
+            # When only disciplina changes
+            close_disciplina(cid, fid, last_disciplina)
+
+        rows.append(row)
+        last_cid, last_fid, last_disciplina = cid, fid, disciplina
+
+    # Final subtotals for last concorrente
+    if last_cid is not None:
+        close_disciplina(last_cid, last_fid, last_disciplina)
+        close_factor(last_cid, last_fid)
+        close_concorrente(last_cid)
+    return rows
+
+
+def _abs_limits(context: ScoringContext, fid: str, disciplina: str):
+    """ABS_MIN / ABS_MAX of a factor disciplina (A5: the "formação BIM" thresholds)."""
+    if fid == "A5":
+        abs_min_max = context.factor_thresholds[fid]["formação BIM"]
+    else:
+        abs_min_max = context.factor_thresholds[fid].get(disciplina, context.factor_thresholds[fid]["default"])
+    return abs_min_max["ABS_MIN"], abs_min_max["ABS_MAX"]
+
+
+def linear_rows(table: ProjectTable, context: ScoringContext = DEFAULT_CONTEXT):
+    """
+    Scoring rows of a ProjectTable in report order: one per projeto of A1-A4 and
+    one per A5 disciplina with the summed hours of its valid formações. The
+    thresholds are looked up once per factor/disciplina pair and spread to the rows.
+
+    Returns:
+        Dict of per-row columns: group (disciplina entry), value, abs_min, abs_max,
+        descl (projeto with a status), label (projeto name or formação count),
+        value_cells (report values) and observations
+    """
+    n_groups = len(table.disciplina_code)
+    n_names = len(table.disciplina_names)
+    group_factor = table.factor_code[np.repeat(np.arange(len(table.factor_code)), np.diff(table.disciplina_offsets))]
+    is_a5 = np.array([fid == "A5" for fid in table.factor_ids], dtype=bool)
+    has_status = np.array([bool(status) for status in table.statuses], dtype=bool)[table.status_code]
+
+    # A1-A4: every projeto is a row (a status disqualifies it)
+    projetos = np.flatnonzero(~table.is_formacao & ~is_a5[table.factor])
+    # A5: one row per disciplina, hours of the formações without status summed in sheet order
+    a5_groups = np.flatnonzero(is_a5[group_factor])
+    valid_formacoes = table.is_formacao & is_a5[table.factor] & ~has_status
+    hours = np.bincount(table.group[valid_formacoes], weights=table.value[valid_formacoes], minlength=n_groups)[a5_groups]
+    counts = np.bincount(table.group[valid_formacoes], minlength=n_groups)[a5_groups]
+
+    # Thresholds per distinct (factor, disciplina) pair
+    pairs, pair_index = np.unique(group_factor.astype(np.int64) * n_names + table.disciplina_code, return_inverse=True)
+    limits = np.array([_abs_limits(context, table.factor_ids[pair // n_names], table.disciplina_names[pair % n_names])
+                       for pair in pairs.tolist()], dtype=float).reshape(-1, 2)[pair_index]
+
+    group = np.concatenate((table.group[projetos], a5_groups)).astype(np.int64)
+    order = np.argsort(group, kind="stable")
+    names = np.array(table.names, dtype=object)
+    observations = np.array(table.observations, dtype=object)
+    columns = {
+        "group": group,
+        "value": np.concatenate((table.value[projetos], hours)),
+        "descl": np.concatenate((has_status[projetos], np.zeros(len(a5_groups), dtype=bool))),
+        "label": np.concatenate((names[table.name_code[projetos]],
+                                 np.array([f"{n} formações válidas" for n in counts.tolist()], dtype=object))),
+        # No valid formação: the empty sum (0), as in the report so far
+        "value_cells": np.array(table.value[projetos].tolist() + [h if n else 0 for h, n in zip(hours.tolist(), counts.tolist())],
+                                dtype=object),
+        "observations": np.concatenate((observations[table.observation_code[projetos]],
+                                        np.full(len(a5_groups), "", dtype=object))),
+    }
+    rows = {key: column[order] for key, column in columns.items()}
+    rows["abs_min"], rows["abs_max"] = limits[rows["group"], 0], limits[rows["group"], 1]
+    for key in ("label", "value_cells", "observations"):
+        rows[key] = rows[key].tolist()
+    return rows
+
+
+def evaluate_linear_abs(use_excel: bool = False, excel_dir: str = "data/input", exact: bool = False,
+                        context: ScoringContext = DEFAULT_CONTEXT, skip=(), workers=1):
     """
     Evaluate competitors using linear absolute scoring
     
     Args:
         use_excel: If True, read data from Excel files
         excel_dir: Directory containing Excel input files
+        exact: If True, costs/hours are scored as int64 cents and the sums kept in
+               int64 micro-points, so totals are independent of summation order and
+               equal totals are exact ties
+        context: Scoring settings (factor weights/thresholds, project scores, dates)
+        skip: Report files not to write (txt, csv, pdf); the others are written
+              concurrently, each atomically (temp file + rename)
+        workers: Processes parsing the competitor workbooks (None = all cores, 1 = no pool)
     """
     if use_excel:
-        competitors = read_excel_folder(excel_dir)
+        table = read_excel_table(excel_dir, context, workers=workers)
     else:
         from src.models.bids_linear_restelo import competitors
+        table = ProjectTable.from_competitors(competitors)
     
     # Marca temporal y carpeta de salida
     timestamp = datetime.now().strftime("%y%m%d-%H%M")
     out_dir = "data/output"
     os.makedirs(out_dir, exist_ok=True)
     
-    # Calcular puntos de los trabajos
-    results = []
-    
-    factor_ids = [factor.id for factor in competitors[0].factors]
-    factor_disciplinas = {factor.id: len(factor.disciplinas) for factor in competitors[0].factors}
+    # Factor ids and maxima from the first concorrente
+    first_factors = range(table.factor_offsets[0], table.factor_offsets[1])
+    factor_ids = [table.factor_ids[table.factor_code[f]] for f in first_factors]
+    factor_disciplinas = {table.factor_ids[table.factor_code[f]]: int(table.disciplina_offsets[f + 1] - table.disciplina_offsets[f])
+                          for f in first_factors}
     factor_max_score = {}
     for fid in factor_disciplinas:
         if fid == "A5":
             # A5: only 1 disciplina ("formação BIM")
-            factor_max_score[fid] = 1 * MAX_SCORE_PER_PROJECT
+            factor_max_score[fid] = 1 * context.max_score_per_project
         else:
             # A1 to A4: limit by MAX_PROJECTS_PER_DISCIPLINA per disciplina
-            factor_max_score[fid] = factor_disciplinas[fid] * MAX_PROJECTS_PER_DISCIPLINA * MAX_SCORE_PER_PROJECT
-         
-    concorrente_factor_scores = {}  # {cid: {fid: sum}}
-    for comp in competitors:
-        concorrente_factor_scores[comp.id] = {fid: 0.0 for fid in factor_ids}
-    
-    concorrente_disciplina_scores = {}  # {cid: {fid: {did: sum}}}
-    for comp in competitors:
-        concorrente_disciplina_scores[comp.id] = {}
-        for factor in comp.factors:
-            concorrente_disciplina_scores[comp.id][factor.id] = {}
-            for disciplina in factor.disciplinas:
-                concorrente_disciplina_scores[comp.id][factor.id][disciplina.name] = 0.0
-
-    for comp in competitors: 
-        for factor in comp.factors:
-            for disciplina in factor.disciplinas:
-
-                if factor.id == "A5":
-                    # A5: Sum hours instead of evaluating projects individually
-                    abs_min_max = FACTOR_THRESHOLDS[factor.id]["formação BIM"]
-                    abs_min = abs_min_max["ABS_MIN"]
-                    abs_max = abs_min_max["ABS_MAX"]
-                    
-                    # Filter out disqualified formações and sum valid hours
-                    valid_formacoes = [f for f in disciplina.formacoes if not f.status]
-                    total_hours = sum(f.hours for f in valid_formacoes)
-                    num_valid = len(valid_formacoes)
-
-                    if total_hours < abs_min:
-                        score = 0
-                        status = "ABAIXO"
-                    elif total_hours > abs_max:
-                        score = MAX_SCORE_PER_PROJECT
-                        status = "ACIMA"
-                    else:
-                        score = linear_abs(total_hours, abs_min, abs_max)
-                        status = "-"
-                    
-                    results.append((
-                        comp.id,
-                        factor.id,
-                        factor.name,
-                        disciplina.name,
-                        f"{num_valid} formações válidas",  # show count of valid ones
-                        total_hours,
-                        score,
-                        status,
-                        ""
-                    ))
-                    concorrente_disciplina_scores[comp.id][factor.id][disciplina.name] += score
-                    concorrente_factor_scores[comp.id][factor.id] += score
-
-                else:
-                    abs_min_max = FACTOR_THRESHOLDS[factor.id].get(
-                    disciplina.name,
-                    FACTOR_THRESHOLDS[factor.id]["default"]
-                    )
-                    abs_min = abs_min_max["ABS_MIN"]
-                    abs_max = abs_min_max["ABS_MAX"]
-
-                    disciplina_score = 0.0
-                    for projeto in disciplina.projetos:
-                        cost = projeto.cost
-                        
-                        # Check if project is disqualified
-                        if projeto.status:
-                            score = 0
-                            status = "DESCL"
-                        else:
-                            # Evaluate price if project is not disqualified
-                            cost = projeto.cost
-                            if cost < abs_min:
-                                score = 0
-                                status = "ABAIXO"
-                            elif cost > abs_max:
-                                score = MAX_SCORE_PER_PROJECT
-                                status = "ACIMA"
-                            else:
-                                score = linear_abs(cost, abs_min, abs_max)
-                                status = "-"
-                        
-                        results.append((
-                            comp.id,
-                            factor.id,
-                            factor.name,
-                            disciplina.name,
-                            projeto.name,
-                            cost,
-                            score,
-                            status,
-                            projeto.observations
-                        ))
-                        concorrente_disciplina_scores[comp.id][factor.id][disciplina.name] += score
-                        concorrente_factor_scores[comp.id][factor.id] += score
-    
-    concorrente_final_scores = {}
-    for cid, factor_scores in concorrente_factor_scores.items():
-        total = 0.0
-        for fid in factor_ids:
-            w = FACTOR_WEIGHTS[fid]
-            Pk = factor_scores[fid]
-            Pk_max = factor_max_score[fid]
-            norm = Pk / Pk_max if Pk_max else 0
-            total += w * norm
-        concorrente_final_scores[cid] = round(total, 4)
-
-
-    # Print to console. REDUX.
-    titulo_factor = "FACTOR A. QUALIDADE DA EQUIPA TÉCNICA"
-    print("\n" + titulo_factor + "\n")
-    for cid, fid, factor, disciplina, projeto, cost, score, st, _ in results:
-        print(f"{cid:<15}"
-              f"{fid:<9}"
-              f"{factor:<54}"
-              f"{disciplina:<18}"
-              f"{projeto:<76}"
-              f"{cost:<21,.2f}"
-              f"{score:<12.4f}"
-              f"{st:<9}"
-            )
-      
-    # Write to .txt
-    txt_file = os.path.join(out_dir, f"{timestamp}_linearFCT.txt")
-    with open(txt_file, "w", encoding="utf-8") as f:
-        f.write(f"{titulo_factor}\n")
-        f.write("EvaluaçãoLinearProjeto: P = MIN_SCORE_PER_PROJECT + ((ValorOBRA - ABS_MIN)*(MAX_SCORE_PER_PROJECT - MIN_SCORE_PER_PROJECT) / (ABS_MAX - ABS_MIN))\n\n")
-        # f.write(f"EvaluaçãoLinearProjeto: P = {MIN_SCORE_PER_PROJECT} + (ValorOBRA - {ABS_MIN}) * (({MAX_SCORE_PER_PROJECT} - {MIN_SCORE_PER_PROJECT}) / ({ABS_MAX} - {ABS_MIN}))\n\n")
-        header = (
-            f"{'Concorrente':<15}"
-            f"{'f.ID':<9}"
-            f"{'Factor':<54}"
-            f"{'Disciplina':<18}"
-            f"{'Projeto':<76}"
-            f"{'Custo (€)':<21}"
-            f"{'Pontuação':<12}"
-            f"{'Status':<9}"
-            f"{'Observações':<36}"
+            factor_max_score[fid] = factor_disciplinas[fid] * context.max_projects_per_disciplina * context.max_score_per_project
+
+    # Calcular puntos de los trabajos: una fila por projeto (A1-A4) o por disciplina (A5, horas sumadas)
+    rows = linear_rows(table, context)
+    values = rows["value"]
+    below = values < rows["abs_min"]
+    above = values > rows["abs_max"]
+    descl = rows["descl"]
+    status = np.select([descl, below, above], ["DESCL", "ABAIXO", "ACIMA"], default="-")
+    inside = ~(descl | below | above)
+
+    # Todas las filas interpoladas en una sola llamada vectorizada (umbrales por fila)
+    if exact:
+        interpolated = linear_abs_micropoints(to_fixed(values), to_fixed(rows["abs_min"]), to_fixed(rows["abs_max"]),
+                                              context.min_score_per_project, context.max_score_per_project)
+        max_points = int(round(context.max_score_per_project * MICRO_POINTS))
+        points = np.where(inside, interpolated, np.where(above & ~descl, max_points, 0)).astype(np.int64)
+        row_scores = (points / MICRO_POINTS).tolist()
+    else:
+        interpolated = linear_abs(values, rows["abs_min"], rows["abs_max"],
+                                  context.min_score_per_project, context.max_score_per_project)
+        points = np.where(inside, interpolated, np.where(above & ~descl, float(context.max_score_per_project), 0.0))
+        # Report cells keep the config values (0 / MAX_SCORE_PER_PROJECT) outside the interpolation
+        row_scores = [score if is_inside else (context.max_score_per_project if st == "ACIMA" else 0)
+                      for score, is_inside, st in zip(interpolated.tolist(), inside.tolist(), status.tolist())]
+
+    # Sumar por disciplina y factor con reducciones agrupadas (en el orden de las filas, como la suma secuencial;
+    # micro-puntos enteros en modo exacto)
+    n_groups = len(table.disciplina_code)
+    n_factor_entries = len(table.factor_code)
+    group_factor_entry = np.repeat(np.arange(n_factor_entries), np.diff(table.disciplina_offsets))
+    if exact:
+        disciplina_sums = np.zeros(n_groups, dtype=np.int64)
+        np.add.at(disciplina_sums, rows["group"], points)
+        factor_sums = np.zeros(n_factor_entries, dtype=np.int64)
+        np.add.at(factor_sums, group_factor_entry[rows["group"]], points)
+    else:
+        disciplina_sums = np.bincount(rows["group"], weights=points, minlength=n_groups)
+        factor_sums = np.bincount(group_factor_entry[rows["group"]], weights=points, minlength=n_factor_entries)
+
+    cids = table.competitor_ids.tolist()
+    zero = 0 if exact else 0.0
+    concorrente_factor_scores = {cid: {fid: zero for fid in factor_ids} for cid in cids}  # {cid: {fid: sum}}
+    concorrente_disciplina_scores = {cid: {} for cid in cids}  # {cid: {fid: {did: sum}}}
+    disciplina_sums = disciplina_sums.tolist()
+    factor_sums = factor_sums.tolist()
+    for c, cid in enumerate(cids):
+        for f in range(table.factor_offsets[c], table.factor_offsets[c + 1]):
+            fid = table.factor_ids[table.factor_code[f]]
+            concorrente_factor_scores[cid][fid] = factor_sums[f]
+            sums = concorrente_disciplina_scores[cid].setdefault(fid, {})
+            for d in range(table.disciplina_offsets[f], table.disciplina_offsets[f + 1]):
+                did = table.disciplina_names[table.disciplina_code[d]]
+                sums[did] = sums.get(did, zero) + disciplina_sums[d]
+
+    # Filas del informe
+    factor_labels = list(zip(table.factor_ids, table.factor_names))
+    group_competitor = np.repeat(np.arange(len(cids)), np.diff(table.factor_offsets))[group_factor_entry]
+    group_factor = table.factor_code[group_factor_entry]
+    results = [
+        (cids[c], *factor_labels[f], table.disciplina_names[d], label, value, score, st, obs)
+        for c, f, d, label, value, score, st, obs in zip(
+            group_competitor[rows["group"]].tolist(), group_factor[rows["group"]].tolist(),
+            table.disciplina_code[rows["group"]].tolist(), rows["label"], rows["value_cells"],
+            row_scores, status.tolist(), rows["observations"])
+    ]
+
+    # Total ponderado por factor (FACTOR_WEIGHTS), vectorizado sobre los concorrentes
+    factor_matrix = np.array([[concorrente_factor_scores[cid][fid] for fid in factor_ids] for cid in cids])
+    if exact:
+        # Total ponderado como fracción exacta con denominador común
+        numerators, denominator = weighted_total(
+            factor_matrix,
+            [factor_max_score[fid] for fid in factor_ids],
+            [context.factor_weights[fid] for fid in factor_ids],
         )
-        sep = "-" * len(header)
-        f.write(header + "\n" + sep + "\n")
-        
-        last_cid = None
-        last_fid = None
-        last_disciplina = None
-
-        for row in results:
-            cid,fid, factor, disciplina, projeto, cost, score, st, obs = row
-
-            # When concorrente changes, print all previous totals
-            if last_cid is not None and cid != last_cid:
-                # Print last discipline subtotal
-                f.write(f"{last_cid:<15}{last_fid:<9}{'':<54}{last_disciplina:<18}{'':<76}{'':<21}{concorrente_disciplina_scores[last_cid][last_fid][last_disciplina]:<12.4f}{'':<9}{'':<36}\n")
-                f.write("\n")
-
-                # Print last factor subtotal
-                f.write(sep + "\n")
-                f.write(f"{last_cid:<15}{last_fid:<9}{'SUBTOTAL':<54}{'':<18}{'':<76}{'':<21}{concorrente_factor_scores[last_cid][last_fid]:<12.4f}{'':<9}{'':<36}\n")
-                
-                # Print final total for this concorrente
-                f.write(sep + "\n")
-                f.write(f"{last_cid:<15}{'TOTAL':<9}{'*Pontuação do Factor A com ponderação por subfator':<54}{'':<18}{'':<76}{'':<21}{concorrente_final_scores[last_cid]:<12.4f}{'':<9}{'':<36}\n")
-                f.write(sep + "\n")
-                f.write("\n")
-                f.write(sep + "\n")
+        concorrente_final_scores = {cid: num / denominator / MICRO_POINTS for cid, num in zip(cids, numerators)}
+        final_ties = [[cids[j] for j in group] for group in tie_groups(numerators)]
+        for sums in concorrente_disciplina_scores.values():
+            for fid in sums:
+                sums[fid] = {did: points / MICRO_POINTS for did, points in sums[fid].items()}
+        for sums in concorrente_factor_scores.values():
+            for fid in sums:
+                sums[fid] = sums[fid] / MICRO_POINTS
+    else:
+        maxima = np.array([factor_max_score[fid] for fid in factor_ids], dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            norm = np.where(maxima > 0, factor_matrix.reshape(len(cids), len(factor_ids)) / maxima, 0.0)
+        # Factor by factor, in the order of the sequential sum
+        total = np.zeros(len(cids))
+        for j, fid in enumerate(factor_ids):
+            total = total + context.factor_weights[fid] * norm[:, j]
+        concorrente_final_scores = {cid: round(t, 4) for cid, t in zip(cids, total.tolist())}
 
-            # When factor changes within same concorrente
-            elif last_cid is not None and fid != last_fid:
-                # Print last disciplina sub-total
-                f.write(f"{last_cid:<15}{last_fid:<9}{'':<54}{last_disciplina:<18}{'':<76}{'':<21}{concorrente_disciplina_scores[last_cid][last_fid][last_disciplina]:<12.4f}{'':<9}{'':<36}\n")
-                f.write("\n")
-
-                # Print factor sub-total
-                f.write(sep + "\n")
-                f.write(f"{last_cid:<15}{last_fid:<9}{'SUBTOTAL':<54}{'':<18}{'':<76}{'':<21}{concorrente_factor_scores[last_cid][last_fid]:<12.4f}{'':<9}{'':<36}\n")
-                f.write(sep + "\n")
-            
-            # When only disciplina changes
-            elif last_disciplina is not None and disciplina != last_disciplina:
-                f.write(f"{cid:<15}{fid:<9}{'':<54}{last_disciplina:<18}{'':<76}{'':<21}{concorrente_disciplina_scores[cid][fid][last_disciplina]:<12.4f}{'':<9}{'':<36}\n")
-                f.write("\n")
-
-            # Write current row
-            f.write(f"{cid:<15}{fid:<9}{factor:<54}{disciplina:<18}{projeto:<76}{cost:<21,.2f}{score:<12.4f}{st:<9}{obs:<36}\n")
-                
-            last_cid = cid
-            last_fid = fid
-            last_disciplina = disciplina
-
-        # Print final subtotals for last concorrente
-        if last_cid is not None:
-            # Print last discipline subtotal
-            f.write(f"{last_cid:<15}{last_fid:<9}{'':<54}{last_disciplina:<18}{'':<76}{'':<21}{concorrente_disciplina_scores[last_cid][last_fid][last_disciplina]:<12.4f}{'':<9}{'':<36}\n")
-            f.write("\n")
-
-            # Print last factor subtotal
-            f.write(sep + "\n")
-            f.write(f"{last_cid:<15}{last_fid:<9}{'SUBTOTAL':<54}{'':<18}{'':<76}{'':<21}{concorrente_factor_scores[last_cid][last_fid]:<12.4f}{'':<9}{'':<36}\n")
-
-            # Print final total for last concorrente
-            f.write(sep + "\n")
-            f.write(f"{last_cid:<15}{'TOTAL':<9}{'*Pontuação do Factor A com ponderação por subfator':<54}{'':<18}{'':<76}{'':<21}{concorrente_final_scores[last_cid]:<12.4f}{'':<9}{'':<36}\n")
-            f.write(sep + "\n")
-            f.write("\n")
-            f.write(sep + "\n")
-
-    print(f"\nTable saved to: {txt_file}")
+
+    # Report model: rows and subtotals built once, rendered to every selected sink
+    titulo_factor = "FACTOR A. QUALIDADE DA EQUIPA TÉCNICA"
+    report = Report()
+    report.text(
+        titulo_factor,
+        "EvaluaçãoLinearProjeto: P = MIN_SCORE_PER_PROJECT + ((ValorOBRA - ABS_MIN)*(MAX_SCORE_PER_PROJECT - MIN_SCORE_PER_PROJECT) / (ABS_MAX - ABS_MIN))",
+        "",
+    )
+    # report.text(f"EvaluaçãoLinearProjeto: P = {MIN_SCORE_PER_PROJECT} + (ValorOBRA - {ABS_MIN}) * (({MAX_SCORE_PER_PROJECT} - {MIN_SCORE_PER_PROJECT}) / ({ABS_MAX} - {ABS_MIN}))", "")
+    table = report.table(LINEAR_COLUMNS, title=titulo_factor)
+    table.rows = grouped_rows(results, concorrente_disciplina_scores, concorrente_factor_scores,
+                              concorrente_final_scores, table.separator())
+
+    if exact:
+        tie_text = "; ".join(" = ".join(str(cid) for cid in group) for group in final_ties) or "nenhum"
+        report.text(f"Empates exatos (total): {tie_text}")
+
+    report_base = os.path.join(out_dir, f"{timestamp}_linearFCT")
+    with ArtifactWriter(skip) as writer:
+        report.write(report_base, REPORT_FORMATS, writer, page_size="A3", landscape_mode=True)
+    for filename in writer.written:
+        print(f"\nTable saved to: {filename}")
 
 if __name__ == "__main__":
-    evaluate_linear_abs()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Evaluate competitors using linear absolute scoring.')
+    parser.add_argument('--excel', '-e', action='store_true',
+                        help='Read the competitors from the Excel files in --input-dir.')
+    parser.add_argument('--input-dir', type=str, default="data/input",
+                        help='Directory with the Excel input files (default: data/input).')
+    parser.add_argument('--exact', action='store_true',
+                        help='Score in fixed point (int64 cents / micro-points) with exact tie detection.')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Worker processes parsing the Excel workbooks (default: 1 = no pool, 0 = all cores).')
+    parser.add_argument('--reference-date', type=str, default=None,
+                        help='Tender reference date (dd/mm/yyyy) that project and formação ages are counted back from '
+                             '(default: today).')
+
+    parser.add_argument('--skip', type=str, nargs='+', choices=[a for a in ARTIFACTS if a != 'png'], default=[],
+                        help='Report files not to write (default: write txt, csv and pdf).')
+
+    args = parser.parse_args()
+
+    context = DEFAULT_CONTEXT
+    if args.reference_date:
+        reference_date, is_valid, note = parse_date(args.reference_date)
+        if not is_valid:
+            parser.error(f"--reference-date: {note}")
+        context = context.replace(current_date=reference_date)
+
+    evaluate_linear_abs(use_excel=args.excel, excel_dir=args.input_dir, exact=args.exact, context=context,
+                        skip=args.skip, workers=args.workers or None)
\ No newline at end of file
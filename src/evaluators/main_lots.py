@@ -0,0 +1,169 @@
+import argparse
+from datetime import datetime
+import os
+
+import numpy as np
+
+from src.config.scoring_context import DEFAULT_CONTEXT, ScoringContext
+from src.models.bids_price import generate_test_lots
+from src.utils.abnormal_low import abnormal_low_threshold, add_detector_arguments, detector_settings, describe_detector, pad_groups
+from src.utils.artifacts import ArtifactWriter, ARTIFACTS
+from src.utils.curves import PRICE_CURVES, bid_statistics, curve_kwargs
+from src.utils.excel_handler import read_lots_from_registry
+from src.utils.ranking import rank_scores_grouped
+from src.utils.report import Column, Report
+
+
+def score_lots(lot_codes, prices, base_prices, curve_functions, pab_detector=None,
+               context: ScoringContext = DEFAULT_CONTEXT):
+    """
+    Score the bids of all lots in one vectorized pass.
+
+    Args:
+        lot_codes: (N,) lot index of each bid
+        prices: (N,) bid prices
+        base_prices: (L,) base price (MAX_PRICE) of each lot
+        curve_functions: curves to apply
+        pab_detector: abnormally-low detector settings applied to each lot's accepted bids
+                      (default: mean × 0.8)
+        context: scoring settings (score range, calibration); each lot replaces its
+                 max_price and REF_PRICE (= base price / upper_threshold)
+
+    Returns:
+        Dict with accepted/pab masks, per-lot anorm thresholds and, per curve,
+        scores and within-lot ranks
+    """
+    n_lots = len(base_prices)
+    max_price = base_prices[lot_codes]
+    accepted = prices <= max_price
+
+    # Per-lot abnormally-low thresholds: accepted bids packed as one NaN-padded row per lot
+    if pab_detector is None:
+        pab_detector = {"method": "mean", "factor": 0.8}
+    lot_prices = pad_groups(prices[accepted], lot_codes[accepted], n_lots)
+    anorm_x = abnormal_low_threshold(lot_prices, **pab_detector)
+    pab = accepted & (prices <= anorm_x[lot_codes])
+
+    # Per-lot statistics of the accepted bids (bid-relative curves), one reduction for all curves
+    bid_stats = bid_statistics(prices, accepted, groups=lot_codes, n_groups=n_lots).take(lot_codes)
+
+    scores = []
+    ranks = []
+    for curve_function in curve_functions:
+        kwargs = dict(curve_kwargs(curve_function, context, bid_stats), max_price=max_price)
+        if "ref_price" in kwargs:
+            kwargs["ref_price"] = max_price / context.upper_threshold
+        curve_scores = np.where(accepted, curve_function(prices, **kwargs), 0.0)
+        scores.append(curve_scores)
+        ranks.append(rank_scores_grouped(curve_scores, lot_codes, accepted))
+
+    return {"accepted": accepted, "pab": pab, "anorm_x": anorm_x, "scores": scores, "ranks": ranks}
+
+
+def lot_columns(curve_names):
+    """Columns of the per-lot tables: bid, score and rank per curve, status."""
+    curve_columns = [column for name in curve_names for column in (Column(name[:12], 14, ".6f"), Column("Rank", 6))]
+    return [Column("ID", 12), Column("Nome", 24), Column("Preço (€)", 24, ",.2f"), *curve_columns,
+            Column("Status", 12), Column("PAB", 6)]
+
+
+def evaluate_lots(curve_functions=None, curve_names=None, test_mode=False, pab_detector=None,
+                  context: ScoringContext = DEFAULT_CONTEXT, skip=()):
+    """
+    Evaluates every lot of a multi-lot tender and writes one combined report.
+
+    Parameters:
+        curve_functions: List of curve functions to use
+        curve_names: Names of the curves for display purposes
+        test_mode: If True, uses generated test lots instead of lots.xlsx
+        pab_detector: abnormally-low detector settings (default: mean × 0.8)
+        context: scoring settings shared by every lot (the base prices come from the lots)
+        skip: report files not to write (txt, csv, pdf); the others are written
+              concurrently, each atomically
+    """
+    timestamp = datetime.now().strftime("%y%m%d-%H%M")
+    output_folder = "data/output"
+    os.makedirs(output_folder, exist_ok=True)
+
+    if curve_functions is None:
+        curve_functions = [PRICE_CURVES["sigmoid"]]
+    if curve_names is None:
+        curve_names = ["sigmoid"]
+    if pab_detector is None:
+        pab_detector = {"method": "mean", "factor": 0.8}
+
+    lots = generate_test_lots() if test_mode else read_lots_from_registry()
+    if not lots:
+        print("No lots found in lots.xlsx. Skipping evaluation.")
+        return None
+    print(f"Loaded {len(lots)} lots with {sum(len(lot.bids) for lot in lots)} bids")
+
+    # Flatten all lots into grouped arrays
+    base_prices = np.array([lot.base_price for lot in lots], dtype=float)
+    lot_codes = np.repeat(np.arange(len(lots)), [len(lot.bids) for lot in lots])
+    bid_ids = [bid.id for lot in lots for bid in lot.bids]
+    bid_names = [bid.name for lot in lots for bid in lot.bids]
+    prices = np.array([bid.price for lot in lots for bid in lot.bids], dtype=float)
+
+    result = score_lots(lot_codes, prices, base_prices, curve_functions, pab_detector=pab_detector, context=context)
+    accepted, pab = result["accepted"], result["pab"]
+
+    # One combined report for all lots, one table per lot
+    columns = lot_columns(curve_names)
+    report = Report()
+    report.text("=" * 80, "MULTI-LOT CURVE EVALUATION RESULTS", f"Curves: {', '.join(curve_names)}",
+                f"PAB: {describe_detector(**pab_detector)}", "=" * 80)
+    # Plain Python values for the report rows
+    score_lists = [curve_scores.tolist() for curve_scores in result["scores"]]
+    rank_lists = [curve_ranks.tolist() for curve_ranks in result["ranks"]]
+    price_list = prices.tolist()
+    summary = [f"\n{'Lote':<10}" + "".join(f"{f'Vencedor {name}':<24}" for name in curve_names)]
+    bounds = np.concatenate([[0], np.cumsum([len(lot.bids) for lot in lots])])
+
+    for code, lot in enumerate(lots):
+        start, end = bounds[code], bounds[code + 1]
+        report.text(
+            "",
+            f"LOTE {lot.id} || Preço base: {lot.base_price:,.2f} € || Preço anorm. baixo: {result['anorm_x'][code]:,.2f} €",
+        )
+        report.table(columns, [
+            (bid_ids[i], bid_names[i], price_list[i],
+             *(value for curve_scores, curve_ranks in zip(score_lists, rank_lists)
+               for value in ((curve_scores[i], curve_ranks[i]) if accepted[i] else (None, None))),
+             "OK" if accepted[i] else "FORA", "x" if pab[i] else "")
+            for i in range(start, end)
+        ], title=f"Lote {lot.id}")
+
+        winners = []
+        for ranks in result["ranks"]:
+            first = np.flatnonzero(ranks[start:end] == 1)
+            winners.append(", ".join(str(bid_ids[start + j]) for j in first) or "—")
+        summary.append(f"{lot.id:<10}" + "".join(f"{w:<24}" for w in winners))
+
+    report.text("", "=" * 80)
+
+    print("\n".join(summary))
+
+    report_base = os.path.join(output_folder, f"{timestamp}_{'_'.join(curve_names)}_EvaluacaoLotes")
+    with ArtifactWriter(skip) as writer:
+        report.write(report_base, ("txt", "csv", "pdf"), writer, page_size="A3", landscape_mode=True)
+    for filename in writer.written:
+        print(f"\nCombined lots table saved to: {filename}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Evaluate the bids of every lot of a multi-lot tender.')
+    parser.add_argument('--curves', '-c', type=str, nargs='+', choices=list(PRICE_CURVES), default=['sigmoid'],
+                        help='Curve type(s) for evaluation (default: sigmoid).')
+    parser.add_argument('--test', '-t', action='store_true',
+                        help='Run in test mode with auto-generated lots.')
+    add_detector_arguments(parser)
+    parser.add_argument('--skip', type=str, nargs='+', choices=[a for a in ARTIFACTS if a != 'png'], default=[],
+                        help='Report files not to write (default: write txt, csv and pdf).')
+
+    args = parser.parse_args()
+
+    unique_curves = list(dict.fromkeys(args.curves))
+    evaluate_lots([PRICE_CURVES[c] for c in unique_curves], unique_curves,
+                  test_mode=args.test, pab_detector=detector_settings(args), skip=args.skip)
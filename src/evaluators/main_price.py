@@ -2,16 +2,119 @@ import argparse
 from datetime import datetime
 import math
 import matplotlib.pyplot as plt
+from matplotlib.colors import to_hex
+from matplotlib.lines import Line2D
 import numpy as np
 import os
+import pandas as pd
 
-from src.config.config_price import MAX_SCORE, MIN_SCORE, MAX_PRICE, REF_PRICE, LOWER_THRESHOLD, UPPER_THRESHOLD, SCORE_AT_LOWER, SCORE_AT_UPPER, SIGMOID_K, SIGMOID_X0
+from src.config.scoring_context import DEFAULT_CONTEXT, ScoringContext
 from src.models.bids_price import bids, calc_abnormally_low_bid, generate_test_bids
-from src.utils.curves import sigmoid, linear, semicircle, inverse_proportional, exponential
+from src.utils.abnormal_low import add_detector_arguments, detector_settings, describe_detector
+from src.utils.curves import sigmoid, linear, semicircle, inverse_proportional, exponential, PRICE_CURVES, INVERSE_CURVES, curve_kwargs
+from src.utils.curves import lowest_ratio, lowest_proportional, mean_distance, BID_RELATIVE_CURVES, BidStats, bid_statistics
 from src.utils.excel_handler import read_bids_from_registry
+from src.utils.fixed_point import CENTS, MICRO_POINTS, to_fixed, from_fixed, score_micropoints, tie_groups
+from src.utils.incremental import IncrementalPriceEvaluation
+from src.utils.rank_flip import rank_flip_margins, format_rank_flip_table
+from src.utils.artifacts import ArtifactWriter, ARTIFACTS
+from src.utils.report import Column, Report, REPORT_FORMATS
 
 
-def evaluate_bids(curve_functions=None, curve_names=None, test_mode=False):
+def curve_formula(curve_function, context: ScoringContext = DEFAULT_CONTEXT, bid_stats: BidStats = None):
+    """
+    Returns (formula, constants) text describing a curve for the reports.
+    Curves compiled from config_curves.py carry their own text.
+    """
+    if hasattr(curve_function, "formula"):
+        return curve_function.formula, curve_function.constants
+    if curve_function == sigmoid:
+        #               score = 1 / (1 + eᵏ⁽ˣʳᵉˡ ⁻ ˣ⁰⁾)
+        return ("P = 1 / (1 + e^(k * (x_rel - x0)))",
+                f"k = {context.sigmoid_k:.4f} || x0 = {context.sigmoid_x0:.4f} || x_rel = ((OFERTA/ref_price) - 1)")
+    if curve_function == linear:
+        return ("P = 100 * (UPPER_THRESHOLD - (price/REF_PRICE)) / (UPPER_THRESHOLD - LOWER_THRESHOLD)",
+                f"LOWER_THRESHOLD = {context.lower_threshold:.2f} || UPPER_THRESHOLD = {context.upper_threshold:.2f}")
+    if curve_function == semicircle:
+        return "P = 100 * sqrt(1 - x²)", "x = price / (MAX_PRICE)"
+    if curve_function == exponential:
+        return "P = 100 * e^(-x)", "x = price / (MAX_PRICE)"
+    if curve_function in BID_RELATIVE_CURVES:
+        stats = (f"Pmin = {bid_stats.min:,.2f} € || Pmédio = {bid_stats.mean:,.2f} € || n = {bid_stats.count}"
+                 if bid_stats is not None else "")
+        if curve_function == lowest_ratio:
+            return "P = 100 * Pmin / price", stats
+        if curve_function == lowest_proportional:
+            return "P = 100 * (1 - (price - Pmin) / Pmin)", stats
+        if curve_function == mean_distance:
+            return "P = 100 * (1 - |price - Pmédio| / Pmédio)", stats
+    return "Custom curve", ""
+
+
+def load_bids(test_mode=False):
+    """
+    Returns the bids to evaluate: generated test bids, the competitors.xlsx
+    registry or, if the registry is empty, the built-in bids list.
+    """
+    if test_mode:
+        return generate_test_bids()
+
+    registry_bids = read_bids_from_registry()
+    if registry_bids:
+        print(f"Loaded {len(registry_bids)} bids from competitors.xlsx")
+        return registry_bids
+
+    print("No bids found in competitors.xlsx — using fallback built-in bids list")
+    return bids
+
+
+# Columns of the per-curve bid tables
+BID_COLUMNS = [
+    Column("ID", 12),
+    Column("Nome", 24),
+    Column("Preço (€)", 24, ",.2f"),
+    Column("Pontuação", 14, ".6f"),
+    Column("Status", 12),
+    Column("PAB", 6),
+]
+
+
+def format_ties(ties, bid_ids, scores):
+    """Report lines for the groups of exactly tied bids of one curve."""
+    if not ties:
+        return ["Empates exatos: nenhum"]
+    return ["Empates exatos:"] + [
+        f"  {scores[group[0]]:.6f}: " + " = ".join(str(bid_ids[j]) for j in group) for group in ties
+    ]
+
+
+def write_lines(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def print_saved(writer, saved):
+    """Wait for the artifacts of a run, then report where each one was saved."""
+    writer.wait()
+    for label, filename in saved:
+        print(f"\n{label}: {filename}")
+
+
+def bid_palette(n):
+    """
+    RGBA colours for n bids: tab10/tab20 while they suffice, then evenly
+    spaced samples of a continuous colormap (no wrap-around).
+    """
+    if n <= 10:
+        return plt.colormaps['tab10'](np.arange(n))
+    if n <= 20:
+        return plt.colormaps['tab20'](np.arange(n))
+    return plt.colormaps['turbo'](np.linspace(0, 1, n))
+
+
+def evaluate_bids(curve_functions=None, curve_names=None, test_mode=False, flip_analysis=False, legend_limit=40,
+                  pab_detector=None, exact=False, context: ScoringContext = DEFAULT_CONTEXT,
+                  skip=()):
     """
     Evaluates bids using the specified curve function(s).
     
@@ -19,355 +122,475 @@ def evaluate_bids(curve_functions=None, curve_names=None, test_mode=False):
         curve_functions: List of curve functions to use
         curve_names: Names of the curves for display purposes
         test_mode: If True, uses generated test bids instead of competition bids
+        flip_analysis: If True, also reports the rank-flip margins of adjacent bids
+        legend_limit: Above this many bids the plot gets an aggregated legend and
+                      the per-bid key is saved as a separate CSV table
+        pab_detector: Abnormally-low detector settings (method, factor, ...);
+                      default: mean × 0.8
+        exact: If True, prices are taken as int64 cents and scores as int64
+               micro-points, so equal scores are exact ties (listed in the report)
+        context: Scoring settings (base price, score range, sigmoid calibration);
+                 one process can evaluate several tenders with different contexts
+        skip: Artifacts not to write (txt, csv, pdf, png); the others are written
+              concurrently, each atomically (temp file + rename)
     """
     # Generar marca temporal
     timestamp = datetime.now().strftime("%y%m%d-%H%M")
     # Definir carpeta de salida
     output_folder = "data/output"
     os.makedirs(output_folder, exist_ok=True)
+    # Ficheiros de saída escritos em paralelo; mensagens impressas quando estiverem prontos
+    with ArtifactWriter(skip) as writer:
+        saved = []
     
-    if curve_functions is None:
-        curve_functions = [semicircle]
-    if curve_names is None:
-        curve_names = ["semicircle"]
-
-    is_multi_curve = len(curve_functions) > 1
+        if curve_functions is None:
+            curve_functions = [semicircle]
+        if curve_names is None:
+            curve_names = ["semicircle"]
+        if pab_detector is None:
+            pab_detector = {"method": "mean", "factor": 0.8}
+
+        is_multi_curve = len(curve_functions) > 1
     
-    # Calcular preço base
-    max_price = MAX_PRICE
-
-    # Determinar bids para evaluar
-    if test_mode:
-        evaluation_bids = generate_test_bids()
-    else:
-        registry_bids = read_bids_from_registry()
-        if registry_bids:
-            evaluation_bids = registry_bids
-            print(f"Loaded {len(registry_bids)} bids from competitors.xlsx")
+        # Calcular preço base
+        max_price = context.max_price
+
+        # Determinar bids para evaluar
+        evaluation_bids = load_bids(test_mode)
+
+        # Pre-determine which bids are accepted and calculate anorm_x once
+        bid_ids = [b.id for b in evaluation_bids]
+        bid_names = [b.name for b in evaluation_bids]
+        prices = np.array([b.price for b in evaluation_bids], dtype=float)
+        if exact:
+            # Preços em cêntimos inteiros: comparações e empates sem ruído de vírgula flutuante
+            cents = to_fixed(prices, CENTS)
+            prices = from_fixed(cents, CENTS)
+            accepted = cents <= to_fixed(max_price, CENTS)
         else:
-            evaluation_bids = bids
-            print("No bids found in competitors.xlsx — using fallback built-in bids list")
-
-    # Pre-determine which bids are accepted and calculate anorm_x once
-    bid_statuses = [(b.id, b.name, b.price, "OK" if b.price <= max_price else "FORA") for b in evaluation_bids]
-    accepted_prices = [price for _, _, price, status in bid_statuses if status == "OK"]
-    anorm_x = calc_abnormally_low_bid(accepted_prices)
-
-    # Preparar los resultados de CADA curva
-    all_results = []
-
-    for i, curve_function in enumerate(curve_functions):
-        # Calcular puntuación de las ofertas usando cada curva
-        results = []
-        for bid_id, name, price, status in bid_statuses:
-            if status == "FORA":
-                score = 0
+            accepted = prices <= max_price
+        statuses = np.where(accepted, "OK", "FORA")
+        anorm_x = calc_abnormally_low_bid(prices[accepted], **pab_detector)
+        pabs = np.where(accepted & (prices <= anorm_x), "x", "")
+        # Estatísticas das propostas aceites (curvas relativas), calculadas uma vez para todas as curvas
+        bid_stats = bid_statistics(prices, accepted)
+
+        # Preparar los resultados de CADA curva
+        all_results = []
+        curve_scores = []
+        curve_ties = []
+
+        for i, curve_function in enumerate(curve_functions):
+            # Calcular puntuación de las ofertas aceptadas en una sola llamada vectorizada
+            scores = np.zeros_like(prices)
+            if exact:
+                micropoints = np.zeros(len(prices), dtype=np.int64)
+                micropoints[accepted] = score_micropoints(cents[accepted], curve_function,
+                                                         **curve_kwargs(curve_function, context, bid_stats))
+                scores = from_fixed(micropoints, MICRO_POINTS)
+                curve_ties.append(tie_groups(micropoints, accepted))
             else:
-                score = curve_function(price, min_score=MIN_SCORE, max_score=MAX_SCORE)
-            # Mark abnormally low bids
-            pab = "x" if (status == "OK" and price <= anorm_x) else ""
-            results.append((bid_id, name, price, score, status, pab))
-
-        all_results.append((results, curve_names[i], curve_function))
-
-    # Print to console
-    for results, curve_name, curve_function in all_results:
-        print("\n")
-        print(f"\n{curve_name.upper()} CURVE EVALUATION:")
-        header = f"{'ID':<12}{'Nome':<24}{'Preço (€)':<24}{'Pontuação':<14}{'Status':<12}{'PAB':<6}"
-        sep = "-" * len(header)
-        print(header)
-        print(sep)
-        for bid_id, name, price, score, status, pab in results:
-            pontos_str = f"{score:<14.6f}" if status == "OK" else " " * 14
-            print(f"{bid_id:<12}{name:<24}{price:<24,.2f}{pontos_str}{status:<12}{pab:<6}")
-
-    # Print to .txt file with timestamp
-    if bids:
-        curve_names_str = "_".join(curve_names)
-        txt_filename = os.path.join(output_folder, f"{timestamp}_{curve_names_str}_EvaluacaoPreco.txt")
-        
-        with open(txt_filename, "w", encoding="utf-8") as f:
-            f.write("=" * 80 + "\n")
-            f.write("CURVE EVALUATION RESULTS\n")
-            f.write("=" * 80 + "\n\n")
-
-            for results, curve_name, curve_function in all_results:
-                f.write(f"\n{curve_name.upper()} CURVE EVALUATION:\n")
-                f.write("-" * 50 + "\n")
-
-                # Write formula and constants
-                if curve_function == sigmoid:
-                    formula_str = "P = 1 / (1 + e^(k * (x_rel - x0)))"
-                    #               score = 1 / (1 + eᵏ⁽ˣʳᵉˡ ⁻ ˣ⁰⁾)
-                    constants_str = f"k = {SIGMOID_K:.4f} || x0 = {SIGMOID_X0:.4f} || x_rel = ((OFERTA/ref_price) - 1)"
-                elif curve_function == linear:
-                    formula_str = "P = 100 * (UPPER_THRESHOLD - (price/REF_PRICE)) / (UPPER_THRESHOLD - LOWER_THRESHOLD)"
-                    constants_str = f"LOWER_THRESHOLD = {LOWER_THRESHOLD:.2f} || UPPER_THRESHOLD = {UPPER_THRESHOLD:.2f}"
-                elif curve_function == semicircle:
-                    formula_str = "P = 100 * sqrt(1 - x²)"
-                    constants_str = f"x = price / (MAX_PRICE)"
-                elif curve_function == exponential:
-                    formula_str = "P = 100 * e^(-x)"
-                    constants_str = f"x = price / (MAX_PRICE)"
-                else:
-                    formula_str = "Custom curve"
-                    constants_str = ""
-                
-                f.write(f"Formula: {formula_str}\n")
-                f.write(f"Constants: {constants_str}\n\n")
-
-                # Write table header
-                header = f"{'ID':<12}{'Nome':<24}{'Preço (€)':<24}{'Pontuação':<14}{'Status':<12}{'PAB':<6}"
-                sep = "-" * len(header)
-                f.write(header + "\n")
-                f.write(sep + "\n")
-
-                # Write bid results
-                for bid_id, name, price, score, status, pab in results:
-                    pontos_str = f"{score:<14.6f}" if status == "OK" else " " * 14
-                    f.write(f"{bid_id:<12}{name:<24}{price:<24,.2f}{pontos_str}{status:<12}{pab:<6}\n")
-
-            f.write("\n" + "=" * 80 + "\n")
-
-        print(f"\nCombined table saved to: {txt_filename}")
-    else:
-        print("\nNo bids to evaluate. Skipping file creation.")
-
-    # Create plot
-    plt.figure(figsize=(16, 10))
-
-    # x-axis data
-    xs = np.linspace(0, MAX_PRICE, 1000)
-    
-    # Plot curves
-    colors = ['blue', 'green', 'orange', 'purple', 'pink']
-    
-    for i, (results, curve_name, curve_function) in enumerate(all_results):
-        ys = [curve_function(x, min_score=MIN_SCORE, max_score=MAX_SCORE) for x in xs]
-        if curve_function == sigmoid:
-            plt.plot(xs, ys, label=f"Curva {curve_name.capitalize()}"
-                     f"({LOWER_THRESHOLD:.2f}_{SCORE_AT_LOWER:.4f} <----> {UPPER_THRESHOLD:.2f}_{SCORE_AT_UPPER:.4f})",
-                 color=colors[i % len(colors)], linewidth=1.5)
+                scores[accepted] = curve_function(prices[accepted], **curve_kwargs(curve_function, context, bid_stats))
+            results = list(zip(bid_ids, bid_names, prices.tolist(), scores.tolist(), statuses.tolist(), pabs.tolist()))
+
+            all_results.append((results, curve_names[i], curve_function))
+            curve_scores.append(scores)
+
+        # Empates exatos (modo exato): uma linha por grupo de propostas com a mesma pontuação
+        tie_lines = [format_ties(ties, bid_ids, scores) for ties, scores in zip(curve_ties, curve_scores)]
+
+        # Report model: formatted once, then written to every selected sink
+        report = Report()
+        report.text("=" * 80, "CURVE EVALUATION RESULTS", "=" * 80,
+                    f"Preço anorm. baixo: {anorm_x:,.2f} € ({describe_detector(**pab_detector)})", "")
+        for i, (results, curve_name, curve_function) in enumerate(all_results):
+            formula_str, constants_str = curve_formula(curve_function, context, bid_stats)
+            report.text("", f"{curve_name.upper()} CURVE EVALUATION:", "-" * 50,
+                        f"Formula: {formula_str}", f"Constants: {constants_str}", "")
+            report.table(BID_COLUMNS, [
+                (bid_id, name, price, score if status == "OK" else None, status, pab)
+                for bid_id, name, price, score, status, pab in results
+            ], title=curve_name)
+            if exact:
+                report.text(*tie_lines[i])
+        report.text("", "=" * 80)
+
+        if bids:
+            report_base = os.path.join(output_folder, f"{timestamp}_{'_'.join(curve_names)}_EvaluacaoPreco")
+            for filename in report.write(report_base, REPORT_FORMATS, writer,
+                                         page_size="A3", landscape_mode=True):
+                saved.append(("Combined table saved to", filename))
         else:
-            plt.plot(xs, ys, label=f"Curva {curve_name.capitalize()}",
-                    color=colors[i % len(colors)], linewidth=1.5)
-
-    # Líneas verticales (BASE e ANORM. BAIXO)
-    upper_x = MAX_PRICE
-    plt.axvline(upper_x, color='red', linestyle='--', linewidth=1)
+            print("\nNo bids to evaluate. Skipping file creation.")
+
+        # Margens de inversão de ranking entre propostas adjacentes
+        if flip_analysis:
+            flip_lines = []
+            for curve_name, curve_function, scores in zip(curve_names, curve_functions, curve_scores):
+                if curve_function in BID_RELATIVE_CURVES:
+                    # Moving one bid also moves Pmin/Pmédio: no single-bid margin to report
+                    flip_lines.append(f"\n{curve_name.upper()} RANK-FLIP MARGINS: n/a (curva relativa às propostas)")
+                    continue
+                margins = rank_flip_margins(prices, scores, accepted, curve_function,
+                                            **curve_kwargs(curve_function, context))
+                flip_lines.append(f"\n{curve_name.upper()} RANK-FLIP MARGINS:")
+                flip_lines.extend(format_rank_flip_table(margins, bid_ids, prices))
+
+            print("\n".join(flip_lines))
+            flip_filename = os.path.join(output_folder, f"{timestamp}_{'_'.join(curve_names)}_MargensInversao.txt")
+            if writer.submit("txt", flip_filename, write_lines, flip_lines):
+                saved.append(("Rank-flip margins saved to", flip_filename))
+
+        # Sem PNG não há gráfico (nem tabela de legenda) a construir
+        if not writer.wants("png"):
+            print_saved(writer, saved)
+            return
+
+        # Create plot
+        plt.figure(figsize=(16, 10))
+
+        # x-axis data
+        xs = np.linspace(0, max_price, 1000)
     
-    if anorm_x and anorm_x > 0:
-        plt.axvline(anorm_x, color='brown', linestyle='--', linewidth=0.5)
-
-    # Personalizar ticks en el eje x
-    ticks = list(plt.xticks()[0])
-    if upper_x not in ticks:
-        ticks.append(upper_x)
-    if anorm_x > 0:
-        if anorm_x not in ticks:
-            ticks.append(anorm_x)
+        # Plot curves
+        colors = ['blue', 'green', 'orange', 'purple', 'pink']
     
-    ticks = sorted(ticks)
-
-    def format_milions(x, pos=None):
-        if abs(x - upper_x) < 1e-6:
-            val = f"{x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            return f"{val} M€\nPREÇO BASE"
-        elif anorm_x > 0 and abs(x - anorm_x) < 1e-6:
-            val = f"{x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            return f"\n\n{val} M€\nPREÇO ANORM. BAIXO"
-        else:
-            return f"{x/1e6:.1f}M€"
-    
-    plt.xticks(ticks, [format_milions(t) for t in ticks], fontsize = 8, rotation = 0)
-
-    ax = plt.gca()
-    labels = ax.get_xticklabels()
-    for i, t in enumerate(ticks):
-        if abs(t - upper_x) < 1e-6:
-            labels[i].set_color('red')
-            labels[i].set_ha('left')
-        elif anorm_x > 0 and abs(t - anorm_x) < 1e-6:
-            labels[i].set_color('brown')
-            # labels[i].set_rotation(45)
-            labels[i].set_ha('center')
-    ax.set_xticklabels(labels)
-
-    # Assign colors to unique bids (by bid_id)
-    bid_colors = {}
-    bid_markers = {}
-    unique_bids = set()
-
-    for results, _, _ in all_results:
-        for bid_id, _, _, _, status, pab in results:
-            unique_bids.add(bid_id)
-
-            # Assign markers
-            if status == "FORA":
-                bid_markers[bid_id] = ("x", 15, 'red')
-            elif pab == "x":
-                bid_markers[bid_id] = ("x", 15, None)
+        for i, (results, curve_name, curve_function) in enumerate(all_results):
+            ys = curve_function(xs, **curve_kwargs(curve_function, context, bid_stats))
+            if curve_function == sigmoid:
+                plt.plot(xs, ys, label=f"Curva {curve_name.capitalize()}"
+                         f"({context.lower_threshold:.2f}_{context.score_at_lower:.4f} <----> {context.upper_threshold:.2f}_{context.score_at_upper:.4f})",
+                     color=colors[i % len(colors)], linewidth=1.5)
             else:
-                bid_markers[bid_id] = ("o", 25, None)
-    
-    # Assign colors to each bid
-    bid_palette = plt.colormaps['tab10']
-    for i, bid_id in enumerate(sorted(unique_bids)):
-        bid_colors[bid_id] = bid_palette(i)
-
-    # Mark bids on the plot
-    for curve_idx, (results, curve_name, _) in enumerate(all_results):
-        for bid_id, name, price, score, status, pab in results:
-            marker, size, color = bid_markers[bid_id]
-            if color is None:
-                color = bid_colors[bid_id]
-            
-            # Include curve name in the label.
-            if status == "FORA":
-                label = f"{name} ({bid_id}) - {price:,.2f}€ - FORA ({curve_name})"
-            else:
-                label = f"{name} ({bid_id}) - {price:,.2f}€ - {score:.6f} pts ({curve_name})"
-                if pab == "x":
-                    label += " - (PAB)"
-            
-            plt.scatter(price, score, s=size, marker=marker, color=color, label=label, alpha=0.8)
-
-    
-    # Format plot
-    plt.xlabel("PREÇO (€)")
-    plt.ylabel("PONTUAÇÃO (0–100)")
+                plt.plot(xs, ys, label=f"Curva {curve_name.capitalize()}",
+                        color=colors[i % len(colors)], linewidth=1.5)
 
-    if is_multi_curve:
-        title = f"COMPARAÇÃO DE CURVAS DE AVALIAÇÃO DE PREÇO ({' - '.join(curve_names)})"
-    else:
-        title = f"CURVA DE AVALIAÇÃO DE PREÇO ({curve_names[0]})"
-    
-    plt.title(title, pad=40)
+        # Líneas verticales (BASE e ANORM. BAIXO)
+        upper_x = max_price
+        plt.axvline(upper_x, color='red', linestyle='--', linewidth=1)
     
-    plt.xlim(0, MAX_PRICE * 1.1)  # X axis from 0 to max + 10% margin to the left
-    # plt.xticks(ticks, rotation=45)  # Rotate x-ticks for better visibility
-    plt.ylim(-5, 105) # Y axis from 0 to 100 + 5% margin
-    plt.yticks(np.arange(0, 101, 10))  # Tick every 10 points
-    plt.grid(True)
-
-    # Visualización de ejes
-    for spine in plt.gca().spines.values():
-        # spine.set_color('#cccccc')
-        spine.set_linewidth(0.5)
-
-    plt.tight_layout()
+        if anorm_x and anorm_x > 0:
+            plt.axvline(anorm_x, color='brown', linestyle='--', linewidth=0.5)
+
+        # Personalizar ticks en el eje x
+        ticks = list(plt.xticks()[0])
+        if upper_x not in ticks:
+            ticks.append(upper_x)
+        if anorm_x > 0:
+            if anorm_x not in ticks:
+                ticks.append(anorm_x)
     
-    # Add legends
-    # Create two separate legends: one for curves, one for bids
-    
-    # 1. Create curve legend first (at the usual position)
-    curve_handles = []
-    curve_labels = []
+        ticks = sorted(ticks)
+
+        def format_milions(x, pos=None):
+            if abs(x - upper_x) < 1e-6:
+                val = f"{x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+                return f"{val} M€\nPREÇO BASE"
+            elif anorm_x > 0 and abs(x - anorm_x) < 1e-6:
+                val = f"{x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+                return f"\n\n{val} M€\nPREÇO ANORM. BAIXO"
+            else:
+                return f"{x/1e6:.1f}M€"
     
-    # Get line objects for curves
-    for i, (results, curve_name, curve_function) in enumerate(all_results):
-        line = plt.gca().get_lines()[i]  # Get the line for this curve
-        curve_handles.append(line)
-        
-        # Create appropriate label based on curve type
-        if curve_function == sigmoid:
-            curve_labels.append(f"Curva {curve_name.capitalize()} ({LOWER_THRESHOLD:.2f}_{SCORE_AT_LOWER:.1f} <-> {UPPER_THRESHOLD:.2f}_{SCORE_AT_UPPER:.1f})")
+        plt.xticks(ticks, [format_milions(t) for t in ticks], fontsize = 8, rotation = 0)
+
+        ax = plt.gca()
+        labels = ax.get_xticklabels()
+        for i, t in enumerate(ticks):
+            if abs(t - upper_x) < 1e-6:
+                labels[i].set_color('red')
+                labels[i].set_ha('left')
+            elif anorm_x > 0 and abs(t - anorm_x) < 1e-6:
+                labels[i].set_color('brown')
+                # labels[i].set_rotation(45)
+                labels[i].set_ha('center')
+        ax.set_xticklabels(labels)
+
+        # Assign colors to unique bids (by bid_id) and markers by status
+        unique_ids, color_index = np.unique(np.asarray(bid_ids), return_inverse=True)
+        bid_colors = bid_palette(len(unique_ids))[color_index]
+        is_pab = pabs == "x"
+        marker_groups = [
+            # (mask, marker, size, fixed color, aggregated legend label)
+            (~accepted, "x", 15, 'red', "FORA"),
+            (accepted & is_pab, "x", 15, None, "PAB"),
+            (accepted & ~is_pab, "o", 25, None, "OK"),
+        ]
+
+        # Mark bids on the plot: one scatter call per curve and marker type
+        for scores in curve_scores:
+            for mask, marker, size, color, _ in marker_groups:
+                if mask.any():
+                    plt.scatter(prices[mask], scores[mask], s=size, marker=marker,
+                                c=color if color else bid_colors[mask], alpha=0.8)
+
+        # Format plot
+        plt.xlabel("PREÇO (€)")
+        plt.ylabel("PONTUAÇÃO (0–100)")
+
+        if is_multi_curve:
+            title = f"COMPARAÇÃO DE CURVAS DE AVALIAÇÃO DE PREÇO ({' - '.join(curve_names)})"
         else:
-            curve_labels.append(f"Curva {curve_name.capitalize()}")
+            title = f"CURVA DE AVALIAÇÃO DE PREÇO ({curve_names[0]})"
     
-    # Place curves legend at lower left (original position)
-    first_legend = plt.legend(
-        curve_handles, curve_labels,
-        loc='lower left',
-        bbox_to_anchor=(0, -0.5, 1, 1),
-        ncol=1,  # Only one column
-        frameon=False,
-        fontsize='small'
-    )
+        plt.title(title, pad=40)
     
-    # Add the first legend manually to keep it
-    plt.gca().add_artist(first_legend)
+        plt.xlim(0, max_price * 1.1)  # X axis from 0 to max + 10% margin to the left
+        # plt.xticks(ticks, rotation=45)  # Rotate x-ticks for better visibility
+        plt.ylim(-5, 105) # Y axis from 0 to 100 + 5% margin
+        plt.yticks(np.arange(0, 101, 10))  # Tick every 10 points
+        plt.grid(True)
+
+        # Visualización de ejes
+        for spine in plt.gca().spines.values():
+            # spine.set_color('#cccccc')
+            spine.set_linewidth(0.5)
+
+        plt.tight_layout()
     
-    # 2. Create bids legend second (at the bottom)
-    bid_handles = []
-    bid_labels = []
+        # Add legends
+        # Create two separate legends: one for curves, one for bids
     
-    # Process and group bid markers
-    handles, labels = [], []
-    for curve_idx, (results, curve_name, _) in enumerate(all_results):
-        for bid_id, name, price, score, status, pab in results:
-            # Get scatter point object
-            scatter_idx = curve_idx * len(results) + results.index((bid_id, name, price, score, status, pab))
-            scatter = plt.gca().collections[scatter_idx]
-            handles.append(scatter)
-            
-            # Format label
-            if status == "FORA":
-                label = f"{name} {bid_id} - {price:,.2f}€ - FORA ({curve_name})"
+        # 1. Create curve legend first (at the usual position)
+        curve_handles = []
+        curve_labels = []
+    
+        # Get line objects for curves
+        for i, (results, curve_name, curve_function) in enumerate(all_results):
+            line = plt.gca().get_lines()[i]  # Get the line for this curve
+            curve_handles.append(line)
+        
+            # Create appropriate label based on curve type
+            if curve_function == sigmoid:
+                curve_labels.append(f"Curva {curve_name.capitalize()} ({context.lower_threshold:.2f}_{context.score_at_lower:.1f} <-> {context.upper_threshold:.2f}_{context.score_at_upper:.1f})")
             else:
-                label = f"{name} {bid_id} - {price:,.2f}€ - {score:.2f} pts ({curve_name})"
-                if pab == "x":
-                    label += " - (PAB)"
-            labels.append(label)
+                curve_labels.append(f"Curva {curve_name.capitalize()}")
     
-    # Group by bid_id
-    by_bid = {}
-    for h, l in zip(handles, labels):
-        bid_id = int(l.split()[1])  # Convert to integer for proper numeric sorting
-        if bid_id not in by_bid:
-            by_bid[bid_id] = []
-        by_bid[bid_id].append((h, l))
+        # Place curves legend at lower left (original position)
+        first_legend = plt.legend(
+            curve_handles, curve_labels,
+            loc='lower left',
+            bbox_to_anchor=(0, -0.5, 1, 1),
+            ncol=1,  # Only one column
+            frameon=False,
+            fontsize='small'
+        )
     
-    # Flatten the grouped bids
-    for bid_id in sorted(by_bid.keys()):  # Now sorted numerically
-        for h, l in by_bid[bid_id]:
-            bid_handles.append(h)
-            bid_labels.append(l)
+        # Add the first legend manually to keep it
+        plt.gca().add_artist(first_legend)
     
-    # Place bids legend
-    second_legend = plt.legend(
-        bid_handles, bid_labels,
-        loc='upper left',
-        bbox_to_anchor=(0, -0.6),
-        ncol=4,
-        borderaxespad=0,
-        frameon=True,
-        fontsize='small'
-    )
-
-    plt.subplots_adjust(bottom=0.3)  # Adjust bottom margin for legend
-
-    # Formula y constantes en debajo del título
-    # plt.figtext(0.53, 0.9, formula_str + "\n" + constants_str, wrap=True, ha='center', fontsize=9)
-
-    # Save to PNG with timestamp
-    curve_names_str = "_".join(curve_names)
-    png_filename = os.path.join(output_folder, f"{timestamp}_{curve_names_str}Evaluation.png")
-    plt.savefig(png_filename, bbox_inches='tight')
-    plt.close()
-    print(f"\nPlot saved as: {png_filename}")
-    print("\n")
+        # 2. Create bids legend second (at the bottom)
+        bid_handles = []
+        bid_labels = []
+
+        if len(unique_ids) <= legend_limit:
+            # One entry per bid and curve, grouped by bid_id (numeric order)
+            for i in np.argsort(np.asarray(bid_ids), kind="stable"):
+                group = 0 if not accepted[i] else (1 if is_pab[i] else 2)
+                _, marker, size, color, _ = marker_groups[group]
+                handle = Line2D([], [], linestyle='None', marker=marker, markersize=np.sqrt(size),
+                                color=color if color else bid_colors[i], alpha=0.8)
+                for curve_name, scores in zip(curve_names, curve_scores):
+                    if not accepted[i]:
+                        label = f"{bid_names[i]} {bid_ids[i]} - {prices[i]:,.2f}€ - FORA ({curve_name})"
+                    else:
+                        label = f"{bid_names[i]} {bid_ids[i]} - {prices[i]:,.2f}€ - {scores[i]:.2f} pts ({curve_name})"
+                        if is_pab[i]:
+                            label += " - (PAB)"
+                    bid_handles.append(handle)
+                    bid_labels.append(label)
+        else:
+            # Too many bids for a readable legend: one entry per marker type + separate key table
+            for mask, marker, size, color, label in marker_groups:
+                bid_handles.append(Line2D([], [], linestyle='None', marker=marker, markersize=np.sqrt(size),
+                                          color=color if color else 'grey', alpha=0.8))
+                bid_labels.append(f"{label} ({int(mask.sum())} propostas)")
+
+            key_table = pd.DataFrame({
+                "ID": bid_ids,
+                "Nome": bid_names,
+                "Preço": prices,
+                "Cor": [to_hex(c) for c in bid_colors],
+                "Status": statuses,
+                "PAB": pabs,
+            })
+            for curve_name, scores in zip(curve_names, curve_scores):
+                key_table[curve_name] = scores
+            key_filename = os.path.join(output_folder, f"{timestamp}_{'_'.join(curve_names)}_LegendaPropostas.csv")
+            key_table = key_table.sort_values("ID", kind="stable")
+            if writer.submit("csv", key_filename, key_table.to_csv, index=False, float_format="%.6f"):
+                saved.append((f"Bid key table ({len(unique_ids)} bids) saved to", key_filename))
+    
+        # Place bids legend
+        second_legend = plt.legend(
+            bid_handles, bid_labels,
+            loc='upper left',
+            bbox_to_anchor=(0, -0.6),
+            ncol=4,
+            borderaxespad=0,
+            frameon=True,
+            fontsize='small'
+        )
+
+        plt.subplots_adjust(bottom=0.3)  # Adjust bottom margin for legend
+
+        # Formula y constantes en debajo del título
+        # plt.figtext(0.53, 0.9, formula_str + "\n" + constants_str, wrap=True, ha='center', fontsize=9)
+
+        # Save to PNG with timestamp
+        curve_names_str = "_".join(curve_names)
+        png_filename = os.path.join(output_folder, f"{timestamp}_{curve_names_str}Evaluation.png")
+        figure = plt.gcf()
+        writer.submit("png", png_filename, figure.savefig, bbox_inches='tight')
+        saved.append(("Plot saved as", png_filename))
+        print_saved(writer, saved)
+        plt.close(figure)
+        print("\n")
+
+def evaluate_bids_incremental(curve_functions, curve_names, test_mode=False,
+                              state_file="data/output/price_state.json", pab_detector=None, skip=(),
+                              context: ScoringContext = DEFAULT_CONTEXT):
+    """
+    Re-evaluates only what changed since the last incremental run: bids added,
+    removed or corrected in the registry are applied as deltas to the saved
+    running aggregates, only those bids are re-scored and only the PAB flags
+    that actually change are reported.
+
+    Parameters:
+        curve_functions: List of curve functions to use
+        curve_names: Names of the curves for display purposes
+        test_mode: If True, uses generated test bids instead of competition bids
+        state_file: JSON state kept between runs
+        pab_detector: Abnormally-low detector settings (method, factor, ...)
+        skip: Artifacts not to write (only txt applies here); the state is always saved
+        context: Scoring settings (a state saved under other settings is not reused)
+    """
+    timestamp = datetime.now().strftime("%y%m%d-%H%M")
+    output_folder = "data/output"
+    os.makedirs(output_folder, exist_ok=True)
+
+    evaluation = IncrementalPriceEvaluation.load(state_file, curve_functions, curve_names, pab_detector=pab_detector,
+                                                 context=context)
+    if evaluation is None:
+        print("No compatible saved state — starting incremental evaluation from scratch")
+        evaluation = IncrementalPriceEvaluation(curve_functions, curve_names, pab_detector=pab_detector, context=context)
+
+    additions, removals, corrections = evaluation.diff(load_bids(test_mode))
+    delta = evaluation.apply(additions, removals, corrections)
+
+    lines = [
+        "=" * 80,
+        "INCREMENTAL PRICE EVALUATION",
+        "=" * 80,
+        f"Added: {len(additions)} || Removed: {len(removals)} || Corrected: {len(corrections)} || Total: {len(evaluation.bids)}",
+        f"Preço anorm. baixo: {delta['old_threshold']:,.2f} € -> {delta['new_threshold']:,.2f} €",
+    ]
+    if delta["rescored_all"]:
+        lines.append(f"Bid statistics changed (bid-relative curves): all {len(evaluation.bids)} bids re-scored")
+
+    changed = [("NOVA", b) for b in additions] + [("CORR", b) for b in corrections]
+    if changed:
+        curve_headers = "".join(f"{name[:12]:<14}" for name in curve_names)
+        header = f"{'Δ':<6}{'ID':<12}{'Nome':<24}{'Preço (€)':<24}{curve_headers}{'Status':<12}{'PAB':<6}"
+        lines += ["", header, "-" * len(header)]
+        for kind, bid in changed:
+            accepted = evaluation.is_accepted(bid)
+            curve_cols = "".join(f"{score:<14.6f}" if accepted else " " * 14 for score in evaluation.scores[bid.id])
+            pab = "x" if bid.id in evaluation.pab else ""
+            lines.append(f"{kind:<6}{bid.id:<12}{bid.name:<24}{bid.price:<24,.2f}{curve_cols}{'OK' if accepted else 'FORA':<12}{pab:<6}")
+
+    if removals:
+        lines += ["", "Removed: " + ", ".join(str(bid_id) for bid_id in removals)]
+
+    lines += ["", "PAB changes:" if delta["pab_flips"] else "PAB changes: none"]
+    for bid_id, old_flag, new_flag in delta["pab_flips"]:
+        bid = evaluation.bids[bid_id]
+        lines.append(f"  {bid_id:<12}{bid.name:<24}{bid.price:<24,.2f}{'x' if old_flag else '-'} -> {'x' if new_flag else '-'}")
+    lines.append("=" * 80)
+
+    print("\n".join(lines))
+
+    txt_filename = os.path.join(output_folder, f"{timestamp}_{'_'.join(curve_names)}_DeltaPreco.txt")
+    with ArtifactWriter(skip) as writer:
+        writer.submit("txt", txt_filename, write_lines, lines)
+    evaluation.save(state_file)
+    for filename in writer.written:
+        print(f"\nDelta report saved to: {filename}")
+    print(f"State saved to: {state_file}")
+    return delta
+
+
+def write_inverse_table(curve_functions, curve_names, step=1.0, print_limit=200, context: ScoringContext = DEFAULT_CONTEXT,
+                        skip=(), test_mode=False):
+    """
+    Builds the "points vs required price" table: for every target score from
+    MIN_SCORE to MAX_SCORE (every `step` points), the highest price that still
+    earns it under each curve (NaN, an empty CSV cell, where the curve never reaches it).
+    Bid-relative curves are inverted against the accepted bids of load_bids(test_mode).
+    Prints it (if short) and saves it as CSV (unless csv is in skip).
+    """
+    timestamp = datetime.now().strftime("%y%m%d-%H%M")
+    output_folder = "data/output"
+    os.makedirs(output_folder, exist_ok=True)
+
+    target_scores = np.arange(context.min_score, context.max_score + step / 2, step)
+    target_scores = target_scores[target_scores <= context.max_score]
+
+    bid_stats = None
+    if any(curve_function in BID_RELATIVE_CURVES for curve_function in curve_functions):
+        prices = np.array([b.price for b in load_bids(test_mode)], dtype=float)
+        bid_stats = bid_statistics(prices, prices <= context.max_price)
+        print(f"Bid-relative curves: Pmin = {bid_stats.min:,.2f} € || Pmédio = {bid_stats.mean:,.2f} € || n = {bid_stats.count}")
+
+    table = {"Pontuação": target_scores}
+    for curve_function, curve_name in zip(curve_functions, curve_names):
+        inverse_function = INVERSE_CURVES[curve_function]
+        table[curve_name] = inverse_function(target_scores, **curve_kwargs(curve_function, context, bid_stats))
+    table = pd.DataFrame(table)
+
+    if len(table) <= print_limit:
+        print("\nREQUIRED PRICE PER SCORE (€):")
+        header = f"{'Pontuação':<14}" + "".join(f"{name:<24}" for name in table.columns[1:])
+        print(header)
+        print("-" * len(header))
+        for row in table.itertuples(index=False):
+            print(f"{row[0]:<14.4f}" + "".join(f"{price:<24,.2f}" for price in row[1:]))
+    else:
+        print(f"\nPrice table has {len(table):,} rows — not printed")
+
+    csv_filename = os.path.join(output_folder, f"{timestamp}_{'_'.join(curve_names)}_PrecoPorPontuacao.csv")
+    with ArtifactWriter(skip) as writer:
+        writer.submit("csv", csv_filename, table.to_csv, index=False, float_format="%.6f")
+    for filename in writer.written:
+        print(f"\nPrice table saved to: {filename}")
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Evaluate bids using different curves.')
     parser.add_argument('--curves', '-c', type=str, nargs='+',
-                        choices=['sigmoid', 'linear', 'semicircle', 'inverse', 'exponential'],
+                        choices=list(PRICE_CURVES),
                         default=['sigmoid'],
                         help='Curve type(s) for evaluation (default: sigmoid). Multiple curves can be specified.')
     parser.add_argument('--test', '-t',action='store_true',
                         help='Run in test mode with auto-generated bids.')
+    parser.add_argument('--flips', action='store_true',
+                        help='Report how far prices must move to flip adjacent-ranked bids.')
+    parser.add_argument('--incremental', '-i', action='store_true',
+                        help='Apply registry changes since the last incremental run as deltas (state in data/output).')
+    add_detector_arguments(parser)
+    parser.add_argument('--exact', action='store_true',
+                        help='Score in fixed point (int64 cents / micro-points) with exact tie detection.')
+    parser.add_argument('--skip', type=str, nargs='+', choices=ARTIFACTS, default=[],
+                        help='Output artifacts not to write (default: write txt, csv, pdf and png).')
+    parser.add_argument('--legend-limit', type=int, default=40,
+                        help='Max bids listed in the plot legend; above it a separate key table is saved (default: 40).')
+    parser.add_argument('--inverse-table', type=float, nargs='?', const=1.0, default=None, metavar='STEP',
+                        help='Print/export the required price for each score (every STEP points, default 1) and exit.')
 
     args = parser.parse_args()
 
     # Map curve names to functions
-    curve_map = {
-        'sigmoid': sigmoid,
-        'linear': linear,
-        'semicircle': semicircle,
-        'inverse': inverse_proportional,
-        'exponential': exponential
-    }
+    curve_map = PRICE_CURVES
 
     if len(args.curves) == 0:
         print("No curves specified. Using sigmoid as default.")
@@ -380,6 +603,18 @@ if __name__ == "__main__":
             unique_curves.append(curve)
     
     curve_functions = [curve_map[c] for c in unique_curves]
+    pab_detector = detector_settings(args)
     print(f"\nUsing {', '.join(unique_curves)} curve(s) for evaluation.")
 
-    evaluate_bids(curve_functions, unique_curves, test_mode=args.test)
\ No newline at end of file
+    if args.inverse_table is not None:
+        if args.inverse_table <= 0:
+            parser.error("--inverse-table STEP must be positive")
+        write_inverse_table(curve_functions, unique_curves, step=args.inverse_table, skip=args.skip,
+                            test_mode=args.test)
+    elif args.incremental:
+        evaluate_bids_incremental(curve_functions, unique_curves, test_mode=args.test, pab_detector=pab_detector,
+                                  skip=args.skip)
+    else:
+        evaluate_bids(curve_functions, unique_curves, test_mode=args.test, flip_analysis=args.flips,
+                      legend_limit=args.legend_limit, pab_detector=pab_detector, exact=args.exact,
+                      skip=args.skip)
\ No newline at end of file
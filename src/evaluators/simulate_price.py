@@ -0,0 +1,257 @@
+import argparse
+from datetime import datetime
+import os
+
+import numpy as np
+
+from src.config.config_price import MAX_PRICE
+from src.config.scoring_context import DEFAULT_CONTEXT, ScoringContext
+from src.models.bids_price import calc_abnormally_low_bid
+from src.utils.abnormal_low import add_detector_arguments, detector_settings, describe_detector
+from src.utils.artifacts import ArtifactWriter, ARTIFACTS
+from src.utils.curves import PRICE_CURVES, bid_statistics, curve_kwargs
+from src.utils.ranking import rank_scores
+from src.utils.report import Column, Report, REPORT_FORMATS
+
+DISTRIBUTIONS = ["normal", "uniform", "lognormal"]
+
+MARGIN_PERCENTILES = [5, 25, 50, 75, 95]
+
+SIMULATION_COLUMNS = [
+    Column("Curva", 14),
+    Column("Margem média", 14, ".6f"),
+    *(Column(f"P{p}", 12, ".6f") for p in MARGIN_PERCENTILES),
+    Column("Venc. PAB", 12, ".4%"),
+    Column("Δ rank", 12, ".4%"),
+    Column("Δ venc. preço", 16, ".4%"),
+    Column("Δ venc. ref.", 14, ".4%"),
+]
+
+
+def draw_bid_sets(rng, n_sims, min_bidders, max_bidders, distribution="normal", mean=0.85, spread=0.12,
+                  max_price=MAX_PRICE):
+    """
+    Draw synthetic bid sets around max_price.
+
+    Args:
+        rng: numpy Generator
+        n_sims: number of bid sets (rows)
+        min_bidders, max_bidders: bidder count per set, drawn uniformly in [min, max]
+        distribution: "normal" (mean ± spread sd), "uniform" (mean ± spread)
+                      or "lognormal" (median mean, log-sd spread)
+        mean, spread: as fractions of max_price
+
+    Returns:
+        (n_sims, max_bidders) array of prices, NaN where the set has fewer bidders
+    """
+    shape = (n_sims, max_bidders)
+    if distribution == "normal":
+        fractions = rng.normal(mean, spread, shape)
+    elif distribution == "uniform":
+        fractions = rng.uniform(mean - spread, mean + spread, shape)
+    elif distribution == "lognormal":
+        fractions = mean * rng.lognormal(0.0, spread, shape)
+    else:
+        raise ValueError(f"Unknown distribution '{distribution}' (expected one of {DISTRIBUTIONS})")
+
+    prices = np.maximum(fractions, 0.0) * max_price
+
+    n_bidders = rng.integers(min_bidders, max_bidders + 1, size=n_sims)
+    prices[np.arange(max_bidders) >= n_bidders[:, None]] = np.nan
+    return prices
+
+
+def top_two(scores, accepted):
+    """
+    Best and second-best score per row among accepted bids (-inf if missing).
+    """
+    masked = np.where(accepted, scores, -np.inf)
+    if masked.shape[-1] < 2:
+        return masked.max(axis=-1), np.full(masked.shape[0], -np.inf)
+    best_two = -np.partition(-masked, 1, axis=-1)[:, :2]
+    return best_two[:, 0], best_two[:, 1]
+
+
+def simulate_bid_sets(curve_names, n_sims=1_000_000, batch_size=100_000, min_bidders=5, max_bidders=15,
+                      distribution="normal", mean=0.85, spread=0.12, pab_detector=None, seed=None,
+                      context: ScoringContext = DEFAULT_CONTEXT):
+    """
+    Score simulated bid sets as simulations × bidders arrays, batch by batch.
+
+    For each curve collects the winner margins (best − second score) and, against
+    the lowest-price ranking, the rank changes and winner changes; also the rate
+    at which the winner is flagged abnormally low (PAB), with the pab_detector
+    settings (default: mean × 0.8) applied to every bid set at once. Bids are
+    drawn around context.max_price and scored with the context's settings.
+
+    Returns:
+        Dict with per-curve statistics and overall PAB/acceptance counters
+    """
+    rng = np.random.default_rng(seed)
+    if pab_detector is None:
+        pab_detector = {"method": "mean", "factor": 0.8}
+
+    totals = {"sims": 0, "accepted": 0, "pab": 0, "sims_with_pab": 0, "sims_without_bids": 0}
+    margins = {name: [] for name in curve_names}
+    counters = {name: {"contested": 0, "winner_pab": 0, "rank_changes": 0,
+                       "winner_vs_price": 0, "winner_vs_ref": 0} for name in curve_names}
+
+    done = 0
+    while done < n_sims:
+        batch = min(batch_size, n_sims - done)
+        prices = draw_bid_sets(rng, batch, min_bidders, max_bidders, distribution, mean, spread, context.max_price)
+
+        accepted = ~np.isnan(prices) & (prices <= context.max_price)
+        has_bids = accepted.any(axis=1)
+        anorm_x = calc_abnormally_low_bid(np.where(accepted, prices, np.nan), **pab_detector)
+        pab = accepted & (prices <= anorm_x[:, None])
+
+        totals["sims"] += batch
+        totals["accepted"] += int(accepted.sum())
+        totals["pab"] += int(pab.sum())
+        totals["sims_with_pab"] += int(pab.any(axis=1).sum())
+        totals["sims_without_bids"] += int((~has_bids).sum())
+
+        # Reference ranking: lowest accepted price first
+        safe_prices = np.where(accepted, prices, 0.0)
+        price_ranks = rank_scores(-safe_prices, accepted)
+        price_winner = np.argmin(np.where(accepted, prices, np.inf), axis=1)
+
+        # Per-tender statistics of the accepted bids (bid-relative curves), shared by all curves
+        bid_stats = bid_statistics(prices, accepted)
+
+        rows = np.arange(batch)
+        ref_winner = None
+        for curve_name in curve_names:
+            curve_function = PRICE_CURVES[curve_name]
+            scores = np.where(accepted, curve_function(safe_prices, **curve_kwargs(curve_function, context, bid_stats)), 0.0)
+            ranks = rank_scores(scores, accepted)
+            winner = np.argmax(np.where(accepted, scores, -np.inf), axis=1)
+            if ref_winner is None:
+                ref_winner = winner
+
+            best, second = top_two(scores, accepted)
+            contested = has_bids & np.isfinite(second)
+            margins[curve_name].append((best - second)[contested].astype(np.float32))
+
+            counter = counters[curve_name]
+            counter["contested"] += int(contested.sum())
+            counter["winner_pab"] += int((pab[rows, winner] & has_bids).sum())
+            counter["rank_changes"] += int((ranks != price_ranks).sum())
+            counter["winner_vs_price"] += int(((winner != price_winner) & has_bids).sum())
+            counter["winner_vs_ref"] += int(((winner != ref_winner) & has_bids).sum())
+
+        done += batch
+
+    stats = {"totals": totals, "curves": {}}
+    sims_with_bids = max(totals["sims"] - totals["sims_without_bids"], 1)
+    for curve_name in curve_names:
+        curve_margins = np.concatenate(margins[curve_name]) if margins[curve_name] else np.empty(0)
+        counter = counters[curve_name]
+        stats["curves"][curve_name] = {
+            "margin_mean": float(curve_margins.mean()) if curve_margins.size else float("nan"),
+            "margin_percentiles": (np.percentile(curve_margins, MARGIN_PERCENTILES).tolist()
+                                   if curve_margins.size else [float("nan")] * len(MARGIN_PERCENTILES)),
+            "contested": counter["contested"],
+            "winner_pab_rate": counter["winner_pab"] / sims_with_bids,
+            "rank_change_rate": counter["rank_changes"] / max(totals["accepted"], 1),
+            "winner_vs_price_rate": counter["winner_vs_price"] / sims_with_bids,
+            "winner_vs_ref_rate": counter["winner_vs_ref"] / sims_with_bids,
+        }
+    return stats
+
+
+def simulation_report(stats, curve_names, settings):
+    """Report with the simulation totals and one row of winner margins and rank changes per curve."""
+    totals = stats["totals"]
+    report = Report()
+    report.text(
+        "=" * 80,
+        "MONTE CARLO PRICE EVALUATION",
+        "=" * 80,
+        "",
+        "Settings: " + " || ".join(
+            f"{key} = {describe_detector(**value) if key == 'pab_detector' else value}" for key, value in settings.items()
+        ),
+        "",
+        f"Simulated tenders:          {totals['sims']:,}",
+        f"Tenders without valid bids: {totals['sims_without_bids']:,}",
+        f"Accepted bids:              {totals['accepted']:,}",
+        f"PAB flag rate (bids):       {totals['pab'] / max(totals['accepted'], 1):.4%}",
+        f"Tenders with ≥1 PAB:        {totals['sims_with_pab'] / max(totals['sims'], 1):.4%}",
+        "",
+        "WINNER MARGINS (points) AND RANK CHANGES",
+    )
+    report.table(SIMULATION_COLUMNS, [
+        (curve_name, curve["margin_mean"], *curve["margin_percentiles"], curve["winner_pab_rate"],
+         curve["rank_change_rate"], curve["winner_vs_price_rate"], curve["winner_vs_ref_rate"])
+        for curve_name, curve in ((name, stats["curves"][name]) for name in curve_names)
+    ], title="simulação")
+    report.text(
+        "",
+        "Venc. PAB: winner flagged abnormally low || Δ rank: bids ranked differently than by lowest price",
+        f"Δ venc. preço: winner is not the lowest price || Δ venc. ref.: winner differs from '{curve_names[0]}' curve",
+        "=" * 80,
+    )
+    return report
+
+
+def run_simulation(curve_names, context: ScoringContext = DEFAULT_CONTEXT, skip=(), **settings):
+    """
+    Run the simulation under context, print the report and save it (txt, csv
+    and pdf, except the kinds in skip).
+    """
+    timestamp = datetime.now().strftime("%y%m%d-%H%M")
+    output_folder = "data/output"
+    os.makedirs(output_folder, exist_ok=True)
+
+    stats = simulate_bid_sets(curve_names, context=context, **settings)
+    report = simulation_report(stats, curve_names, settings)
+
+    report_base = os.path.join(output_folder, f"{timestamp}_{'_'.join(curve_names)}_SimulacaoPreco")
+    with ArtifactWriter(skip) as writer:
+        report.write(report_base, REPORT_FORMATS, writer, page_size="A3", landscape_mode=True)
+    for filename in writer.written:
+        print(f"\nSimulation report saved to: {filename}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Monte Carlo simulation of bid sets for price-curve studies.')
+    parser.add_argument('--curves', '-c', type=str, nargs='+', choices=list(PRICE_CURVES), default=['sigmoid'],
+                        help='Curve type(s) to compare (default: sigmoid). The first one is the reference.')
+    parser.add_argument('--sims', '-n', type=int, default=1_000_000,
+                        help='Number of simulated tenders (default: 1,000,000).')
+    parser.add_argument('--batch-size', type=int, default=100_000,
+                        help='Tenders scored per vectorized batch (default: 100,000).')
+    parser.add_argument('--min-bidders', type=int, default=5, help='Minimum bidders per tender (default: 5).')
+    parser.add_argument('--max-bidders', type=int, default=15, help='Maximum bidders per tender (default: 15).')
+    parser.add_argument('--distribution', '-d', type=str, choices=DISTRIBUTIONS, default='normal',
+                        help='Bid price distribution (default: normal).')
+    parser.add_argument('--mean', type=float, default=0.85,
+                        help='Mean bid (median for lognormal) as a fraction of MAX_PRICE (default: 0.85).')
+    parser.add_argument('--spread', type=float, default=0.12,
+                        help='Spread as a fraction of MAX_PRICE (sd, half-width or log-sd; default: 0.12).')
+    add_detector_arguments(parser)
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible runs.')
+    parser.add_argument('--skip', type=str, nargs='+', choices=[a for a in ARTIFACTS if a != 'png'], default=[],
+                        help='Report files not to write (default: write txt, csv and pdf).')
+
+    args = parser.parse_args()
+
+    if args.min_bidders < 1 or args.max_bidders < args.min_bidders:
+        parser.error("--min-bidders must be ≥ 1 and ≤ --max-bidders")
+
+    run_simulation(
+        list(dict.fromkeys(args.curves)),
+        n_sims=args.sims,
+        batch_size=args.batch_size,
+        min_bidders=args.min_bidders,
+        max_bidders=args.max_bidders,
+        distribution=args.distribution,
+        mean=args.mean,
+        spread=args.spread,
+        pab_detector=detector_settings(args),
+        seed=args.seed,
+        skip=args.skip,
+    )
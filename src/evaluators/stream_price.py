@@ -0,0 +1,171 @@
+import argparse
+from contextlib import nullcontext
+from datetime import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.config.config_price import MAX_PRICE
+from src.config.scoring_context import DEFAULT_CONTEXT, ScoringContext
+from src.utils.abnormal_low import abnormal_low_threshold, add_detector_arguments, detector_settings, describe_detector
+from src.utils.artifacts import atomic_path, atomic_write
+from src.utils.bid_stream import iter_bid_chunks, RunningStats
+from src.utils.curves import PRICE_CURVES, BidStats, curve_kwargs
+
+# Detectors computed from streamed aggregates; the others need the accepted price column
+STREAMING_DETECTORS = ("mean", "std")
+
+
+def stream_threshold(feed, max_price, pab_detector, chunk_size, sep=",", decimal="."):
+    """
+    First pass over the feed: abnormally-low threshold of the accepted bids.
+
+    mean and std detectors only keep running count/mean/variance; median, trimmed
+    and iterative detectors keep the accepted prices (one float per bid, no names).
+
+    Returns:
+        (threshold, running stats, rows read)
+    """
+    stats = RunningStats()
+    kept_prices = []
+    rows = 0
+    for chunk in iter_bid_chunks(feed, chunk_size, sep, decimal):
+        rows += len(chunk["prices"])
+        accepted_prices = chunk["prices"][chunk["prices"] <= max_price]
+        stats.update(accepted_prices)
+        if pab_detector["method"] not in STREAMING_DETECTORS:
+            kept_prices.append(accepted_prices)
+
+    method = pab_detector["method"]
+    if stats.count == 0:
+        threshold = 0.0
+    elif method == "mean":
+        threshold = stats.mean * pab_detector.get("factor", 0.8)
+    elif method == "std":
+        threshold = max(stats.mean - pab_detector.get("n_std", 1.0) * stats.std, 0.0)
+    else:
+        threshold = abnormal_low_threshold(np.concatenate(kept_prices), **pab_detector)
+    return threshold, stats, rows
+
+
+def score_chunk(chunk, curve_names, anorm_x, bid_stats=None, context: ScoringContext = DEFAULT_CONTEXT):
+    """
+    Score one chunk with every curve under context; returns the result table of the chunk.
+    bid_stats: statistics of the whole feed (first pass), for bid-relative curves.
+    """
+    prices = chunk["prices"]
+    accepted = prices <= context.max_price
+    table = {
+        "ID": chunk["ids"],
+        "Nome": chunk["names"],
+        "Preço": prices,
+        "Status": np.where(accepted, "OK", "FORA"),
+        "PAB": np.where(accepted & (prices <= anorm_x), "x", ""),
+    }
+    for curve_name in curve_names:
+        curve_function = PRICE_CURVES[curve_name]
+        scores = curve_function(prices, **curve_kwargs(curve_function, context, bid_stats))
+        table[curve_name] = np.where(accepted, scores, np.nan)
+    return pd.DataFrame(table)
+
+
+def stream_evaluate(feed, curve_names, chunk_size=500_000, max_price=None, pab_detector=None,
+                    sep=",", decimal=".", skip=(), context: ScoringContext = DEFAULT_CONTEXT):
+    """
+    Evaluate a large bid feed (CSV/Parquet) in two streaming passes: the
+    abnormally-low threshold first, then scoring chunk by chunk with the results
+    appended to a CSV as they are produced. Only the best bid per curve is kept
+    in memory for the summary. Both files are written atomically (the CSV grows
+    in a temporary file renamed at the end); kinds in skip (txt, csv) are not written.
+    Bids are scored with the context's settings; max_price, if given, replaces
+    the context's base price (and so its REF_PRICE).
+    """
+    timestamp = datetime.now().strftime("%y%m%d-%H%M")
+    output_folder = "data/output"
+    os.makedirs(output_folder, exist_ok=True)
+
+    if pab_detector is None:
+        pab_detector = {"method": "mean", "factor": 0.8}
+    if max_price is not None:
+        context = context.replace(max_price=max_price)
+
+    anorm_x, stats, rows = stream_threshold(feed, context.max_price, pab_detector, chunk_size, sep, decimal)
+    print(f"Pass 1: {rows:,} bids read, {stats.count:,} accepted || Preço anorm. baixo: {anorm_x:,.2f} €")
+
+    # Feed-wide statistics for bid-relative curves (not the chunk's own)
+    bid_stats = BidStats(stats.count, stats.min if stats.count else np.nan, stats.mean if stats.count else np.nan)
+
+    csv_filename = os.path.join(output_folder, f"{timestamp}_{'_'.join(curve_names)}_StreamPreco.csv")
+    best = {curve_name: (-np.inf, None, None, None) for curve_name in curve_names}
+    pab_count = 0
+
+    with atomic_path(csv_filename) if "csv" not in skip else nullcontext() as csv_tmp:
+        for i, chunk in enumerate(iter_bid_chunks(feed, chunk_size, sep, decimal)):
+            table = score_chunk(chunk, curve_names, anorm_x, bid_stats, context)
+            if csv_tmp:
+                table.to_csv(csv_tmp, mode="w" if i == 0 else "a", header=(i == 0), index=False, float_format="%.6f")
+            pab_count += int((table["PAB"] == "x").sum())
+
+            for curve_name in curve_names:
+                scores = table[curve_name].to_numpy()
+                if np.isnan(scores).all():
+                    continue
+                j = int(np.nanargmax(scores))
+                if scores[j] > best[curve_name][0]:
+                    best[curve_name] = (scores[j], chunk["ids"][j], chunk["names"][j], chunk["prices"][j])
+
+    lines = [
+        "=" * 80,
+        "STREAMING PRICE EVALUATION",
+        "=" * 80,
+        f"Feed: {feed}",
+        f"Bids: {rows:,} || Accepted: {stats.count:,} || PAB: {pab_count:,}",
+        f"Preço médio aceite: {stats.mean:,.2f} € || Desvio padrão: {stats.std:,.2f} €",
+        f"Preço anorm. baixo: {anorm_x:,.2f} € ({describe_detector(**pab_detector)})",
+        "",
+        f"{'Curva':<14}{'Vencedor':<12}{'Nome':<24}{'Preço (€)':<24}{'Pontuação':<14}",
+        "-" * 88,
+    ]
+    for curve_name, (score, bid_id, name, price) in best.items():
+        if bid_id is None:
+            lines.append(f"{curve_name:<14}—")
+        else:
+            lines.append(f"{curve_name:<14}{bid_id:<12}{name:<24}{price:<24,.2f}{score:<14.6f}")
+    lines.append("=" * 80)
+
+    print("\n".join(lines))
+    txt_filename = os.path.join(output_folder, f"{timestamp}_{'_'.join(curve_names)}_StreamPreco.txt")
+    if "txt" not in skip:
+        with atomic_write(txt_filename) as f:
+            f.write("\n".join(lines) + "\n")
+    if "csv" not in skip:
+        print(f"\nScores saved to: {csv_filename}")
+    if "txt" not in skip:
+        print(f"Summary saved to: {txt_filename}")
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Evaluate a large CSV/Parquet bid feed in streaming chunks.')
+    parser.add_argument('feed', type=str, help='Bid feed (.csv or .parquet) with columns ID, Nome, Preço.')
+    parser.add_argument('--curves', '-c', type=str, nargs='+', choices=list(PRICE_CURVES), default=['sigmoid'],
+                        help='Curve type(s) for evaluation (default: sigmoid).')
+    parser.add_argument('--chunk-size', type=int, default=500_000,
+                        help='Rows read and scored per chunk (default: 500,000).')
+    parser.add_argument('--max-price', type=float, default=MAX_PRICE,
+                        help=f'Base price; bids above it are excluded (default: {MAX_PRICE:,.2f}).')
+    parser.add_argument('--sep', type=str, default=',', help="CSV field separator (default: ',').")
+    parser.add_argument('--decimal', type=str, default='.', help="CSV decimal separator (default: '.').")
+    add_detector_arguments(parser)
+    parser.add_argument('--skip', type=str, nargs='+', choices=['txt', 'csv'], default=[],
+                        help='Output artifacts not to write (default: write txt and csv).')
+
+    args = parser.parse_args()
+
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+
+    stream_evaluate(args.feed, list(dict.fromkeys(args.curves)), chunk_size=args.chunk_size,
+                    max_price=args.max_price, pab_detector=detector_settings(args),
+                    sep=args.sep, decimal=args.decimal, skip=args.skip)
@@ -0,0 +1,263 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import itertools
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from src.config.config_price import MAX_SCORE, LOWER_THRESHOLD, UPPER_THRESHOLD, SCORE_AT_LOWER, SCORE_AT_UPPER, calc_sigmoid_params
+from src.config.scoring_context import DEFAULT_CONTEXT, ScoringContext
+from src.evaluators.main_price import load_bids
+from src.utils.artifacts import ArtifactWriter
+from src.utils.curves import PRICE_CURVES, bid_statistics, curve_kwargs
+from src.utils.frame_renderer import FrameRenderer
+from src.utils.ranking import rank_scores
+
+GRID_COLUMNS = ["score_at_lower", "score_at_upper", "lower_threshold", "upper_threshold"]
+
+
+def parse_grid_values(values):
+    """
+    Parse CLI grid values. Each token is either a number ("0.8") or an
+    inclusive range "start:stop:step" ("0.75:0.90:0.05").
+    """
+    grid = []
+    for token in values:
+        if ":" in token:
+            start, stop, step = (float(v) for v in token.split(":"))
+            # Include stop (tolerate floating point drift of the last step)
+            grid.extend(np.arange(start, stop + step / 2, step).tolist())
+        else:
+            grid.append(float(token))
+    return sorted(set(grid))
+
+
+def build_grid(score_at_lower, score_at_upper, lower_threshold, upper_threshold, max_score=MAX_SCORE):
+    """
+    Cartesian product of the calibration grids as a (G, 4) array, keeping only
+    combinations that define a decreasing sigmoid (lower threshold/score pair
+    strictly below/above the upper pair, scores strictly inside (0, max_score)).
+    """
+    grid = np.array(list(itertools.product(score_at_lower, score_at_upper, lower_threshold, upper_threshold)), dtype=float)
+    if grid.size == 0:
+        return grid.reshape(0, 4)
+
+    s_low, s_up, t_low, t_up = grid.T
+    valid = (
+        (s_low > s_up) & (s_up > 0) & (s_low < max_score)
+        & (t_low < t_up) & (t_low > 0)
+    )
+    if not valid.all():
+        print(f"Skipping {int((~valid).sum())} invalid calibration(s) out of {len(grid)}")
+    return grid[valid]
+
+
+def grid_context(grid, context: ScoringContext = DEFAULT_CONTEXT) -> SimpleNamespace:
+    """
+    The grid's calibrations as the ScoringContext fields curve_kwargs reads, each
+    a (G, 1) column so every curve is evaluated for the whole grid at once:
+    MIN_SCORE follows SCORE_AT_UPPER and REF_PRICE = MAX_PRICE / UPPER_THRESHOLD
+    for every curve; max_price and max_score come from context.
+    """
+    s_low, s_up, t_low, t_up = (col[:, None] for col in grid.T)
+    k, x0 = calc_sigmoid_params(s_low, s_up, t_low, t_up, context.max_score)
+    return SimpleNamespace(min_score=s_up, max_score=context.max_score, max_price=context.max_price,
+                           sigmoid_k=k, sigmoid_x0=x0, ref_price=context.max_price / t_up)
+
+
+def score_grid(grid, prices, accepted, curve_names, bid_stats=None, context: ScoringContext = DEFAULT_CONTEXT):
+    """
+    Score every bid for every calibration in the grid.
+
+    Args:
+        grid: (G, 4) array of [score_at_lower, score_at_upper, lower_threshold, upper_threshold]
+        prices: (N,) bid prices
+        accepted: (N,) boolean mask (price <= context.max_price)
+        curve_names: names from PRICE_CURVES
+        bid_stats: statistics of the accepted bids for bid-relative curves
+                   (default: from prices/accepted)
+        context: tender settings the grid varies (max_price, max_score)
+
+    Returns:
+        (G, C, N) array of scores (0 for rejected bids)
+    """
+    calibrations = grid_context(grid, context)
+    if bid_stats is None:
+        bid_stats = bid_statistics(prices, accepted)
+
+    scores = np.zeros((len(grid), len(curve_names), len(prices)))
+    for c, curve_name in enumerate(curve_names):
+        curve_function = PRICE_CURVES[curve_name]
+        curve_scores = curve_function(prices, **curve_kwargs(curve_function, calibrations, bid_stats))
+        scores[:, c, :] = np.where(accepted, np.broadcast_to(curve_scores, (len(grid), len(prices))), 0.0)
+    return scores
+
+
+def _score_grid_chunk(args):
+    """Process-pool entry point (one chunk of grid points)."""
+    return score_grid(*args)
+
+
+def sweep_calibrations(prices, curve_names, grid, workers=None, chunk_size=256,
+                       context: ScoringContext = DEFAULT_CONTEXT):
+    """
+    Evaluate the bid set for every calibration of the grid, spreading grid
+    chunks across a process pool.
+
+    Args:
+        prices: bid prices
+        curve_names: names from PRICE_CURVES
+        grid: (G, 4) array from build_grid
+        workers: process count (None = all cores, 1 = run in this process)
+        chunk_size: grid points per task
+        context: tender settings (max_price, max_score) shared by the grid
+
+    Returns:
+        (scores, ranks): two (G, C, N) arrays
+    """
+    prices = np.asarray(prices, dtype=float)
+    accepted = prices <= context.max_price
+    bid_stats = bid_statistics(prices, accepted)
+    chunks = [(grid[i:i + chunk_size], prices, accepted, curve_names, bid_stats, context)
+              for i in range(0, len(grid), chunk_size)]
+
+    if workers == 1 or len(chunks) <= 1:
+        parts = [_score_grid_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_score_grid_chunk, chunks))
+
+    if parts:
+        scores = np.concatenate(parts, axis=0)
+    else:
+        scores = np.zeros((0, len(curve_names), len(prices)))
+    ranks = rank_scores(scores, accepted)
+    return scores, ranks
+
+
+def sweep_table(grid, curve_names, bid_ids, scores, ranks, context: ScoringContext = DEFAULT_CONTEXT):
+    """
+    Compact wide table: one row per (grid point, curve) with the calibration,
+    the derived sigmoid k/x0, and a score and rank column per bid.
+    """
+    n_grid, n_curves, n_bids = scores.shape
+    k, x0 = calc_sigmoid_params(*grid.T, context.max_score) if n_grid else (np.empty(0), np.empty(0))
+
+    grid_idx = np.repeat(np.arange(n_grid), n_curves)
+    table = pd.DataFrame({"grid_id": grid_idx})
+    for j, column in enumerate(GRID_COLUMNS):
+        table[column] = grid[grid_idx, j]
+    table["k"] = k[grid_idx]
+    table["x0"] = x0[grid_idx]
+    table["curve"] = np.tile(np.asarray(curve_names), n_grid)
+
+    flat_scores = scores.reshape(n_grid * n_curves, n_bids)
+    flat_ranks = ranks.reshape(n_grid * n_curves, n_bids)
+    score_columns = pd.DataFrame(flat_scores, columns=[f"score_{bid_id}" for bid_id in bid_ids])
+    rank_columns = pd.DataFrame(flat_ranks, columns=[f"rank_{bid_id}" for bid_id in bid_ids])
+    return pd.concat([table, score_columns, rank_columns], axis=1)
+
+
+def sweep_frames(grid, curve_names, xs, prices, scores, chunk_size=64, context: ScoringContext = DEFAULT_CONTEXT):
+    """
+    Frame data for every calibration: (curve values over xs, bid scores with
+    rejected bids hidden, title). Curves are evaluated chunk by chunk so only
+    chunk_size calibrations are held in memory at once.
+    """
+    accepted = prices <= context.max_price
+    # Curves over xs, scored against the bid set's own statistics
+    bid_stats = bid_statistics(prices, accepted)
+    everywhere = np.ones(len(xs), dtype=bool)
+    for start in range(0, len(grid), chunk_size):
+        chunk = grid[start:start + chunk_size]
+        curve_values = score_grid(chunk, xs, everywhere, curve_names, bid_stats, context)
+        for j, (s_low, s_up, t_low, t_up) in enumerate(chunk):
+            bid_scores = np.where(accepted, scores[start + j], np.nan)
+            title = (f"CALIBRAÇÃO {start + j + 1}/{len(grid)}: "
+                     f"{t_low:.2f}_{s_low:.1f} <-> {t_up:.2f}_{s_up:.1f}")
+            yield curve_values[j], bid_scores, title
+
+
+def run_sweep(curve_names, grid_values, test_mode=False, workers=None, chunk_size=256, frames_output=None, fps=5,
+              skip=(), context: ScoringContext = DEFAULT_CONTEXT):
+    """
+    Load the bid set, sweep all calibrations and save the score/rank table as CSV
+    (unless csv is in skip).
+    With frames_output (a directory or a .gif path) also renders one plot frame
+    per calibration on a single reused figure. The grid varies the sigmoid
+    calibration of context (its max_price and max_score are kept).
+    """
+    timestamp = datetime.now().strftime("%y%m%d-%H%M")
+    output_folder = "data/output"
+    os.makedirs(output_folder, exist_ok=True)
+
+    evaluation_bids = load_bids(test_mode)
+    bid_ids = np.array([b.id for b in evaluation_bids])
+    prices = np.array([b.price for b in evaluation_bids], dtype=float)
+
+    grid = build_grid(*grid_values, max_score=context.max_score)
+    print(f"\nSweeping {len(grid)} calibration(s) × {len(curve_names)} curve(s) × {len(prices)} bid(s)")
+
+    scores, ranks = sweep_calibrations(prices, curve_names, grid, workers=workers, chunk_size=chunk_size,
+                                       context=context)
+    table = sweep_table(grid, curve_names, bid_ids, scores, ranks, context)
+
+    # Winner frequency per curve (how many calibrations each bid wins)
+    for c, curve_name in enumerate(curve_names):
+        winners = bid_ids[np.argmax(scores[:, c, :], axis=1)] if len(grid) else np.array([])
+        ids, counts = np.unique(winners, return_counts=True)
+        print(f"\n{curve_name.upper()} — winners across {len(grid)} calibration(s):")
+        for bid_id, count in sorted(zip(ids.tolist(), counts.tolist()), key=lambda x: -x[1]):
+            print(f"  {bid_id:<12}{count:>8} ({count / len(grid):.1%})")
+
+    csv_filename = os.path.join(output_folder, f"{timestamp}_{'_'.join(curve_names)}_SweepPreco.csv")
+    with ArtifactWriter(skip) as writer:
+        writer.submit("csv", csv_filename, table.to_csv, index=False, float_format="%.6f")
+    for filename in writer.written:
+        print(f"\nSweep table saved to: {filename}")
+
+    if frames_output:
+        renderer = FrameRenderer(curve_names, prices, max_price=context.max_price,
+                                 dpi=60 if frames_output.lower().endswith(".gif") else 100)
+        frames = sweep_frames(grid, curve_names, renderer.xs, prices, scores, context=context)
+        count = renderer.render_frames(frames, frames_output, fps=fps)
+        renderer.close()
+        print(f"{count} frame(s) saved to: {frames_output}")
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Sweep price-curve calibrations over a parameter grid.')
+    parser.add_argument('--curves', '-c', type=str, nargs='+', choices=list(PRICE_CURVES), default=['sigmoid'],
+                        help='Curve type(s) to sweep (default: sigmoid).')
+    parser.add_argument('--score-at-lower', type=str, nargs='+', default=[str(SCORE_AT_LOWER)],
+                        help='SCORE_AT_LOWER values or start:stop:step ranges.')
+    parser.add_argument('--score-at-upper', type=str, nargs='+', default=[str(SCORE_AT_UPPER)],
+                        help='SCORE_AT_UPPER values or start:stop:step ranges.')
+    parser.add_argument('--lower-threshold', type=str, nargs='+', default=[str(LOWER_THRESHOLD)],
+                        help='LOWER_THRESHOLD values or start:stop:step ranges.')
+    parser.add_argument('--upper-threshold', type=str, nargs='+', default=[str(UPPER_THRESHOLD)],
+                        help='UPPER_THRESHOLD values or start:stop:step ranges.')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Worker processes (default: all cores, 1 = no pool).')
+    parser.add_argument('--chunk-size', type=int, default=256,
+                        help='Calibrations per worker task (default: 256).')
+    parser.add_argument('--test', '-t', action='store_true',
+                        help='Run in test mode with auto-generated bids.')
+    parser.add_argument('--frames', type=str, default=None, metavar='OUTPUT',
+                        help='Also render one plot frame per calibration: a directory (PNG sequence) or a .gif file.')
+    parser.add_argument('--fps', type=float, default=5, help='GIF frames per second (default: 5).')
+    parser.add_argument('--skip', type=str, nargs='+', choices=['csv'], default=[],
+                        help='Output artifacts not to write (default: write the csv table).')
+
+    args = parser.parse_args()
+
+    curve_names = list(dict.fromkeys(args.curves))
+    grid_values = [parse_grid_values(v) for v in (args.score_at_lower, args.score_at_upper,
+                                                  args.lower_threshold, args.upper_threshold)]
+
+    run_sweep(curve_names, grid_values, test_mode=args.test, workers=args.workers, chunk_size=args.chunk_size,
+              frames_output=args.frames, fps=args.fps, skip=args.skip)
@@ -3,7 +3,7 @@ from typing import List
 from datetime import datetime
 
 # --- DATA STRUCTURE ---
-@dataclass
+@dataclass(slots=True)
 class Projeto:
     name: str
     cost: float
@@ -11,7 +11,7 @@ class Projeto:
     observations: str = ""
     status: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class Formação:
     name: str
     hours: float
@@ -19,7 +19,7 @@ class Formação:
     observations: str = ""
     status: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class Disciplina:
     name: str
     projetos: List[Projeto] = None
@@ -31,13 +31,13 @@ class Disciplina:
         if self.formacoes is None:
             self.formacoes = []
 
-@dataclass
+@dataclass(slots=True)
 class Factor:
     id: str
     name: str
     disciplinas: List[Disciplina]
 
-@dataclass
+@dataclass(slots=True)
 class Concorrente:
     id: int
     factors: List[Factor]
@@ -1,7 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List
 import numpy as np
 from src.config.config_price import REF_PRICE, MAX_PRICE
+from src.utils.abnormal_low import abnormal_low_threshold
 
 # --- DATA STRUCTURE ---
 @dataclass
@@ -10,6 +11,12 @@ class Bid:
     name: str
     price: float  # in euros
 
+@dataclass
+class Lot:
+    id: str
+    base_price: float  # in euros (MAX_PRICE of the lot)
+    bids: List[Bid] = field(default_factory=list)
+
 def generate_test_bids() -> List[Bid]:
     """
     Generates test bids based on REF_PRICE and MAX_PRICE with predefined reductions
@@ -33,6 +40,25 @@ def generate_test_bids() -> List[Bid]:
     return test_bids
 
 
+def generate_test_lots(n_lots: int = 20, seed: int = 0) -> List[Lot]:
+    """
+    Generates test lots: base prices spread around MAX_PRICE, each with the
+    test bids of generate_test_bids scaled to the lot's base price and jittered.
+    """
+    rng = np.random.default_rng(seed)
+    template = generate_test_bids()
+    lots = []
+    for i in range(n_lots):
+        base_price = round(MAX_PRICE * rng.uniform(0.5, 2.0), 2)
+        jitter = rng.uniform(0.97, 1.03, len(template))
+        lot_bids = [
+            Bid(bid.id, bid.name, round(bid.price / MAX_PRICE * base_price * j, 2))
+            for bid, j in zip(template, jitter)
+        ]
+        lots.append(Lot(f"L{i + 1:02d}", base_price, lot_bids))
+    return lots
+
+
 # --- COMPETITION DATA ---
 # bids: List[Bid] = []
 
@@ -56,22 +82,25 @@ bids: List[Bid] = [
 ]
 
 
-def calc_abnormally_low_bid(bid_prices=None, factor=0.8):
+def calc_abnormally_low_bid(bid_prices=None, factor=0.8, method="mean", **params):
     """
     Calculate the abnormally low price threshold.
     
     Args:
-        bid_prices: Optional list of prices. If None, uses all bids in the module.
+        bid_prices: Optional list or ndarray of prices. If None, uses all bids in the module.
+                    A 2-D array (bid sets × bidders, NaN for missing/rejected bids)
+                    returns one threshold per row.
         factor: Factor to multiply the average by (default: 0.8 - 20% below average)
+        method: Detector from src.utils.abnormal_low (mean, median, trimmed, iterative, std)
+        params: Detector-specific settings (trim, n_std, max_iter)
     
     Returns:
         The abnormally low price threshold, or 0 if no prices provided
     """
     if bid_prices is None:
         bid_prices = [bid.price for bid in bids]
-    
-    if not bid_prices: # Empty list
+
+    if np.ndim(bid_prices) == 1 and len(bid_prices) == 0: # Empty list
         return 0
-    
-    avg = np.mean(bid_prices)
-    return avg * factor
\ No newline at end of file
+
+    return abnormal_low_threshold(bid_prices, method=method, factor=factor, **params)
@@ -0,0 +1,327 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from src.models import bids_linear
+
+# --- COLUMNAR STORE ---
+# One array per attribute instead of one object per projeto / formação. Strings
+# (factor, disciplina, project names, statuses, observations) are stored once in
+# a category tuple and referenced by integer codes; the tree (competitor ->
+# factor -> disciplina -> items) is kept as CSR offsets, so empty factors and
+# disciplinas survive. Views with the model class names read straight from it.
+
+DATE_DTYPE = "datetime64[s]"
+
+
+class _Categories:
+    """Distinct values in order of first appearance, with their integer codes."""
+
+    def __init__(self):
+        self.values: List = []
+        self._codes: Dict = {}
+
+    def code(self, value) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def codes(self, values: Iterable, dtype=np.int32) -> np.ndarray:
+        return np.array([self.code(value) for value in values], dtype=dtype)
+
+
+def _offsets(parents: Sequence[int], n_parents: int) -> np.ndarray:
+    """CSR offsets (n_parents + 1) of children appended in parent order."""
+    counts = np.bincount(np.asarray(parents, dtype=np.int64), minlength=n_parents)
+    return np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+
+@dataclass(eq=False)
+class ProjectTable:
+    """
+    Every projeto and formação of a tender in typed arrays.
+
+    Hierarchy (CSR): competitor_ids[c] owns factor entries
+    factor_offsets[c]:factor_offsets[c + 1], factor entry f owns disciplina entries
+    disciplina_offsets[f]:disciplina_offsets[f + 1] and disciplina entry d owns
+    items item_offsets[d]:item_offsets[d + 1].
+
+    Item columns (one value per projeto / formação): name_code, value (cost, or
+    hours for formações), date (NaT if none), status_code, observation_code,
+    is_formacao, plus the categorical codes competitor (index into
+    competitor_ids), factor (into factor_ids), disciplina (into
+    disciplina_names) and group (disciplina entry), ready for np.bincount.
+    """
+    competitor_ids: np.ndarray
+    factor_ids: Tuple[str, ...]
+    factor_names: Tuple[str, ...]
+    disciplina_names: Tuple[str, ...]
+    names: Tuple[str, ...]
+    statuses: Tuple[str, ...]
+    observations: Tuple[str, ...]
+    # hierarchy
+    factor_offsets: np.ndarray
+    factor_code: np.ndarray
+    disciplina_offsets: np.ndarray
+    disciplina_code: np.ndarray
+    item_offsets: np.ndarray
+    # items
+    name_code: np.ndarray
+    value: np.ndarray
+    date: np.ndarray
+    status_code: np.ndarray
+    observation_code: np.ndarray
+    is_formacao: np.ndarray
+
+    def __post_init__(self):
+        # Per-item categorical codes, expanded from the CSR offsets
+        self.group = np.repeat(np.arange(len(self.disciplina_code), dtype=np.int32), np.diff(self.item_offsets))
+        item_factor_entry = np.repeat(np.arange(len(self.factor_code), dtype=np.int32),
+                                      np.diff(self.disciplina_offsets))[self.group]
+        self.competitor = np.repeat(np.arange(len(self.competitor_ids), dtype=np.int32),
+                                    np.diff(self.factor_offsets))[item_factor_entry]
+        self.factor = self.factor_code[item_factor_entry]
+        self.disciplina = self.disciplina_code[self.group]
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays (category strings not included)."""
+        return sum(value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray))
+
+    def concorrentes(self) -> List["Concorrente"]:
+        """Competitors as views (same attributes as the bids_linear dataclasses)."""
+        return [Concorrente(self, c) for c in range(len(self.competitor_ids))]
+
+    @classmethod
+    def from_competitors(cls, competitors: Iterable[bids_linear.Concorrente]) -> "ProjectTable":
+        """Columnar copy of a tree of bids_linear objects (or of views)."""
+        builder = ProjectTableBuilder()
+        for concorrente in competitors:
+            builder.add_competitor(concorrente.id)
+            for factor in concorrente.factors:
+                builder.add_factor(factor.id, factor.name)
+                for disciplina in factor.disciplinas:
+                    items = list(disciplina.projetos) + list(disciplina.formacoes)
+                    builder.add_disciplina(
+                        disciplina.name,
+                        [item.name for item in items],
+                        [item.cost for item in disciplina.projetos] + [item.hours for item in disciplina.formacoes],
+                        [item.date for item in items],
+                        [item.status for item in items],
+                        [item.observations for item in items],
+                        is_formacao=[False] * len(disciplina.projetos) + [True] * len(disciplina.formacoes),
+                    )
+        return builder.build()
+
+    @classmethod
+    def concat(cls, tables: Iterable["ProjectTable"]) -> "ProjectTable":
+        """One table with the competitors of several (e.g. one per workbook), categories merged."""
+        builder = ProjectTableBuilder()
+        for table in tables:
+            builder.extend(table)
+        return builder.build()
+
+
+class ProjectTableBuilder:
+    """Appends competitors, factors and disciplinas (with their items as columns) in tree order."""
+
+    def __init__(self):
+        self._competitor_ids = []
+        self._factor_competitor = []
+        self._factor_code = []
+        self._disciplina_factor = []
+        self._disciplina_code = []
+        self._item_counts = []
+        self._factors = _Categories()
+        self._factor_names: Dict[str, str] = {}
+        self._disciplinas = _Categories()
+        self._names = _Categories()
+        self._statuses = _Categories()
+        self._observations = _Categories()
+        self._columns = {key: [] for key in ("name_code", "value", "date", "status_code", "observation_code",
+                                              "is_formacao")}
+
+    def add_competitor(self, competitor_id):
+        self._competitor_ids.append(competitor_id)
+
+    def add_factor(self, factor_id: str, name: str):
+        self._factor_competitor.append(len(self._competitor_ids) - 1)
+        self._factor_code.append(self._factors.code(factor_id))
+        self._factor_names.setdefault(factor_id, name)
+
+    def add_disciplina(self, name: str, names=(), values=(), dates=(), statuses=(), observations=(),
+                       is_formacao=False):
+        """Disciplina of the last factor added, with its items (is_formacao: one flag for all, or one per item)."""
+        n = len(names)
+        self._disciplina_factor.append(len(self._factor_code) - 1)
+        self._disciplina_code.append(self._disciplinas.code(name))
+        self._item_counts.append(n)
+        self._columns["name_code"].append(self._names.codes(names))
+        self._columns["value"].append(np.asarray(values, dtype=float).reshape(n))
+        self._columns["date"].append(np.array([None if d is None else np.datetime64(d, "s") for d in dates],
+                                              dtype=DATE_DTYPE).reshape(n))
+        self._columns["status_code"].append(self._statuses.codes(statuses, dtype=np.int8))
+        self._columns["observation_code"].append(self._observations.codes(observations))
+        self._columns["is_formacao"].append(np.broadcast_to(np.asarray(is_formacao, dtype=bool), (n,)))
+
+    def extend(self, table: ProjectTable):
+        """Append every competitor of a table."""
+        names = np.array(table.names, dtype=object)
+        statuses = np.array(table.statuses, dtype=object)
+        observations = np.array(table.observations, dtype=object)
+        for c, competitor_id in enumerate(table.competitor_ids.tolist()):
+            self.add_competitor(competitor_id)
+            for f in range(table.factor_offsets[c], table.factor_offsets[c + 1]):
+                factor_code = table.factor_code[f]
+                self.add_factor(table.factor_ids[factor_code], table.factor_names[factor_code])
+                for d in range(table.disciplina_offsets[f], table.disciplina_offsets[f + 1]):
+                    items = slice(table.item_offsets[d], table.item_offsets[d + 1])
+                    n = items.stop - items.start
+                    self._disciplina_factor.append(len(self._factor_code) - 1)
+                    self._disciplina_code.append(self._disciplinas.code(table.disciplina_names[table.disciplina_code[d]]))
+                    self._item_counts.append(n)
+                    self._columns["name_code"].append(self._names.codes(names[table.name_code[items]]))
+                    self._columns["value"].append(table.value[items])
+                    self._columns["date"].append(table.date[items])
+                    self._columns["status_code"].append(
+                        self._statuses.codes(statuses[table.status_code[items]], dtype=np.int8))
+                    self._columns["observation_code"].append(
+                        self._observations.codes(observations[table.observation_code[items]]))
+                    self._columns["is_formacao"].append(table.is_formacao[items])
+
+    def build(self) -> ProjectTable:
+        dtypes = {"name_code": np.int32, "value": float, "date": DATE_DTYPE, "status_code": np.int8,
+                  "observation_code": np.int32, "is_formacao": bool}
+        columns = {key: np.concatenate(chunks).astype(dtypes[key]) if chunks else np.zeros(0, dtype=dtypes[key])
+                   for key, chunks in self._columns.items()}
+        factor_ids = tuple(self._factors.values)
+        return ProjectTable(
+            competitor_ids=np.array(self._competitor_ids),
+            factor_ids=factor_ids,
+            factor_names=tuple(self._factor_names[factor_id] for factor_id in factor_ids),
+            disciplina_names=tuple(self._disciplinas.values),
+            names=tuple(self._names.values),
+            statuses=tuple(self._statuses.values),
+            observations=tuple(self._observations.values),
+            factor_offsets=_offsets(self._factor_competitor, len(self._competitor_ids)),
+            factor_code=np.array(self._factor_code, dtype=np.int16),
+            disciplina_offsets=_offsets(self._disciplina_factor, len(self._factor_code)),
+            disciplina_code=np.array(self._disciplina_code, dtype=np.int32),
+            item_offsets=np.concatenate(([0], np.cumsum(self._item_counts, dtype=np.int64))),
+            **columns,
+        )
+
+
+# --- VIEWS ---
+# Same class and attribute names as the bids_linear dataclasses, so code reading
+# the tree works on either; each view is only (table, index), read-only.
+
+class _View:
+    __slots__ = ("_table", "_index")
+    _fields: Tuple[str, ...] = ()
+
+    def __init__(self, table: ProjectTable, index: int):
+        self._table = table
+        self._index = index
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)})"
+
+
+class _Item(_View):
+    __slots__ = ()
+
+    @property
+    def name(self) -> str:
+        return self._table.names[self._table.name_code[self._index]]
+
+    @property
+    def date(self) -> datetime:
+        # NaT -> None
+        return self._table.date[self._index].item()
+
+    @property
+    def observations(self) -> str:
+        return self._table.observations[self._table.observation_code[self._index]]
+
+    @property
+    def status(self) -> str:
+        return self._table.statuses[self._table.status_code[self._index]]
+
+
+class Projeto(_Item):
+    __slots__ = ()
+    _fields = ("name", "cost", "date", "observations", "status")
+
+    @property
+    def cost(self) -> float:
+        return float(self._table.value[self._index])
+
+
+class Formação(_Item):
+    __slots__ = ()
+    _fields = ("name", "hours", "date", "observations", "status")
+
+    @property
+    def hours(self) -> float:
+        return float(self._table.value[self._index])
+
+
+class Disciplina(_View):
+    __slots__ = ()
+    _fields = ("name", "projetos", "formacoes")
+
+    @property
+    def name(self) -> str:
+        return self._table.disciplina_names[self._table.disciplina_code[self._index]]
+
+    def _items(self, formacoes: bool):
+        start, stop = self._table.item_offsets[self._index], self._table.item_offsets[self._index + 1]
+        return [i for i in range(start, stop) if self._table.is_formacao[i] == formacoes]
+
+    @property
+    def projetos(self) -> List[Projeto]:
+        return [Projeto(self._table, i) for i in self._items(False)]
+
+    @property
+    def formacoes(self) -> List[Formação]:
+        return [Formação(self._table, i) for i in self._items(True)]
+
+
+class Factor(_View):
+    __slots__ = ()
+    _fields = ("id", "name", "disciplinas")
+
+    @property
+    def id(self) -> str:
+        return self._table.factor_ids[self._table.factor_code[self._index]]
+
+    @property
+    def name(self) -> str:
+        return self._table.factor_names[self._table.factor_code[self._index]]
+
+    @property
+    def disciplinas(self) -> List[Disciplina]:
+        offsets = self._table.disciplina_offsets
+        return [Disciplina(self._table, d) for d in range(offsets[self._index], offsets[self._index + 1])]
+
+
+class Concorrente(_View):
+    __slots__ = ()
+    _fields = ("id", "factors")
+
+    @property
+    def id(self) -> int:
+        return self._table.competitor_ids[self._index].item()
+
+    @property
+    def factors(self) -> List[Factor]:
+        offsets = self._table.factor_offsets
+        return [Factor(self._table, f) for f in range(offsets[self._index], offsets[self._index + 1])]
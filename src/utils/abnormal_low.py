@@ -0,0 +1,166 @@
+import numpy as np
+
+# Detectors work on bid sets as rows of ascending prices, NaN-padded at the end
+# (sorted_prices: (rows, n), counts: (rows,) valid prices per row, prefix: (rows, n + 1)
+# cumulative sums with a leading 0, so the sum of sorted_prices[r, i:j] is
+# prefix[r, j] - prefix[r, i]). Each returns one threshold per row; a bid is
+# abnormally low when its price is <= the threshold.
+
+
+def _take(values, index):
+    return np.take_along_axis(values, index[:, None], axis=1)[:, 0]
+
+
+def mean_detector(sorted_prices, counts, prefix, factor=0.8):
+    """factor × mean of the bids."""
+    total = _take(prefix, counts)
+    return np.divide(total, counts, out=np.zeros(len(counts)), where=counts > 0) * factor
+
+
+def median_detector(sorted_prices, counts, prefix, factor=0.8):
+    """factor × median of the bids."""
+    safe = np.maximum(counts, 1)
+    lo = _take(sorted_prices, (safe - 1) // 2)
+    hi = _take(sorted_prices, safe // 2)
+    return np.where(counts > 0, 0.5 * (lo + hi) * factor, 0.0)
+
+
+def trimmed_mean_detector(sorted_prices, counts, prefix, factor=0.8, trim=0.1):
+    """factor × mean after dropping the lowest and highest `trim` fraction of the bids."""
+    if not 0.0 <= trim < 0.5:
+        raise ValueError(f"trim must be in [0, 0.5), got {trim}")
+    cut = np.floor(counts * trim).astype(int)
+    kept = counts - 2 * cut
+    total = _take(prefix, counts - cut) - _take(prefix, cut)
+    return np.divide(total, kept, out=np.zeros(len(counts)), where=kept > 0) * factor
+
+
+def iterative_detector(sorted_prices, counts, prefix, factor=0.8, max_iter=None):
+    """
+    Exclude-and-recompute: the bids at or below factor × mean are excluded and the
+    mean is recomputed over the remaining ones, until no further bid is excluded.
+
+    Excluding low bids only raises the mean, so the remaining bids are always the
+    upper part of the sorted row: each round is a count plus two prefix-sum lookups,
+    and only the rows that are still moving are iterated.
+    """
+    n_rows = len(counts)
+    thresholds = mean_detector(sorted_prices, counts, prefix, factor)
+    excluded = np.zeros(n_rows, dtype=int)
+    active = np.flatnonzero(counts > 0)
+    max_iter = int(counts.max(initial=0)) if max_iter is None else max_iter
+
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        rows = sorted_prices[active]
+        # NaN compares False, so padding is never counted
+        below = np.sum(rows <= thresholds[active, None], axis=1)
+        # The highest bid always stays (factor × mean of the rest is below it for factor ≤ 1)
+        below = np.minimum(below, counts[active] - 1)
+        moving = below > excluded[active]
+        active = active[moving]
+        below = below[moving]
+        excluded[active] = below
+        remaining = counts[active] - below
+        total = _take(prefix[active], counts[active]) - _take(prefix[active], below)
+        thresholds[active] = total / remaining * factor
+
+    return thresholds
+
+
+def std_band_detector(sorted_prices, counts, prefix, factor=0.8, n_std=1.0):
+    """mean − n_std × standard deviation of the bids (`factor` is not used)."""
+    safe = np.maximum(counts, 1)
+    mean = _take(prefix, counts) / safe
+    deviations = np.where(np.isnan(sorted_prices), 0.0, sorted_prices - mean[:, None])
+    std = np.sqrt(np.sum(deviations ** 2, axis=1) / safe)
+    return np.where(counts > 0, np.maximum(mean - n_std * std, 0.0), 0.0)
+
+
+ABNORMAL_LOW_DETECTORS = {
+    "mean": mean_detector,
+    "median": median_detector,
+    "trimmed": trimmed_mean_detector,
+    "iterative": iterative_detector,
+    "std": std_band_detector,
+}
+
+
+def abnormal_low_threshold(bid_prices, method="mean", factor=0.8, **params):
+    """
+    Abnormally-low price threshold with the selected detector.
+
+    Args:
+        bid_prices: 1-D prices, or a 2-D array (bid sets × bidders) with NaN for
+                    missing/rejected bids
+        method: key of ABNORMAL_LOW_DETECTORS
+        factor: factor applied to the central value (mean, median, ...)
+        params: detector-specific settings (trim, n_std, max_iter)
+
+    Returns:
+        Threshold (float) for 1-D input, or one threshold per row; 0 for empty sets
+    """
+    if method not in ABNORMAL_LOW_DETECTORS:
+        raise ValueError(f"Unknown abnormally-low method '{method}' (expected one of {list(ABNORMAL_LOW_DETECTORS)})")
+
+    prices = np.asarray(bid_prices, dtype=float)
+    single = prices.ndim == 1
+    prices = np.atleast_2d(prices)
+
+    sorted_prices = np.sort(prices, axis=1)  # NaN sorts to the end
+    counts = np.sum(~np.isnan(sorted_prices), axis=1)
+    prefix = np.zeros((prices.shape[0], prices.shape[1] + 1))
+    np.cumsum(np.nan_to_num(sorted_prices), axis=1, out=prefix[:, 1:])
+
+    thresholds = ABNORMAL_LOW_DETECTORS[method](sorted_prices, counts, prefix, factor=factor, **params)
+    return float(thresholds[0]) if single else thresholds
+
+
+def pad_groups(values, groups, n_groups):
+    """
+    Pack grouped 1-D values into a (n_groups, max group size) array padded with
+    NaN, so grouped data can go through the row-wise detectors.
+    """
+    values = np.asarray(values, dtype=float)
+    groups = np.asarray(groups)
+    sizes = np.bincount(groups, minlength=n_groups)
+    order = np.argsort(groups, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    columns = np.arange(len(values)) - np.repeat(starts, sizes)
+
+    padded = np.full((n_groups, sizes.max(initial=0)), np.nan)
+    padded[groups[order], columns] = values[order]
+    return padded
+
+
+def add_detector_arguments(parser):
+    """Add the abnormally-low detector options to an argparse parser."""
+    parser.add_argument('--pab-method', type=str, choices=list(ABNORMAL_LOW_DETECTORS), default='mean',
+                        help='Abnormally-low detector (default: mean).')
+    parser.add_argument('--pab-factor', type=float, default=0.8,
+                        help='Factor applied to the mean/median/trimmed mean (default: 0.8).')
+    parser.add_argument('--pab-trim', type=float, default=0.1,
+                        help='Fraction trimmed at each end by the trimmed detector (default: 0.1).')
+    parser.add_argument('--pab-std', type=float, default=1.0,
+                        help='Standard deviations below the mean for the std detector (default: 1.0).')
+
+
+def detector_settings(args):
+    """Detector keyword arguments (method, factor and its own params) from parsed CLI args."""
+    settings = {"method": args.pab_method, "factor": args.pab_factor}
+    if args.pab_method == "trimmed":
+        settings["trim"] = args.pab_trim
+    elif args.pab_method == "std":
+        settings["n_std"] = args.pab_std
+    return settings
+
+
+def describe_detector(method="mean", factor=0.8, **params):
+    """Short text of a detector configuration for the reports."""
+    if method == "std":
+        return f"std (média − {params.get('n_std', 1.0):g}σ)"
+    text = f"{method} × {factor:g}"
+    if method == "trimmed":
+        text += f" (trim {params.get('trim', 0.1):g})"
+    return text
@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import os
+import tempfile
+from typing import Iterable, List
+
+# Output files an evaluator can produce (--skip chooses the ones not written)
+ARTIFACTS = ["txt", "csv", "pdf", "png"]
+# Permissions of the files written (mkstemp creates them 0600)
+ARTIFACT_MODE = 0o644
+
+
+@contextmanager
+def atomic_path(path: str, mode: int = ARTIFACT_MODE):
+    """
+    Temporary path next to `path` (same directory and extension, so writers that
+    infer the format from the name still work), renamed over `path` with
+    permissions `mode` only when the block completes. A failed or interrupted
+    write never leaves a partial file.
+    """
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=f".{name}.", suffix=os.path.splitext(name)[1])
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w", encoding="utf-8", newline=None):
+    """Open `path` for writing through atomic_path (text mode by default)."""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, mode, encoding=None if "b" in mode else encoding, newline=newline) as f:
+            yield f
+
+
+class ArtifactWriter:
+    """
+    Writes output artifacts concurrently on a thread pool, each one atomically.
+
+    submit(kind, path, write_function, *args) runs write_function(tmp_path, *args)
+    on a worker thread and renames the result to `path`; artifacts whose kind is
+    in `skip` are not written at all. Leaving the `with` block waits for every
+    write (re-raising the first error) and fills `written` in submission order.
+
+    Threads rather than processes: the artifacts are built from in-memory objects
+    (report lines, matplotlib figures) that would otherwise have to be pickled,
+    and the slow parts (PNG/zlib compression, file I/O) release the GIL.
+    """
+
+    def __init__(self, skip: Iterable[str] = (), workers: int = 4):
+        self.skip = set(skip)
+        self.written: List[str] = []
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._pending = []
+
+    def wants(self, kind: str) -> bool:
+        return kind not in self.skip
+
+    def submit(self, kind: str, path: str, write_function, *args, **kwargs):
+        if not self.wants(kind):
+            return None
+
+        def run():
+            with atomic_path(path) as tmp_path:
+                write_function(tmp_path, *args, **kwargs)
+            return path
+
+        future = self._pool.submit(run)
+        self._pending.append(future)
+        return future
+
+    def wait(self) -> List[str]:
+        """Wait for the submitted artifacts; returns the paths written so far."""
+        try:
+            for future in self._pending:
+                self.written.append(future.result())
+        finally:
+            self._pending = []
+        return self.written
+
+    def close(self) -> List[str]:
+        """Wait for every artifact and release the worker threads; returns the paths written."""
+        try:
+            return self.wait()
+        finally:
+            self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._pool.shutdown(wait=True)
+        return False
@@ -0,0 +1,103 @@
+import os
+from typing import Dict, Iterator
+
+import numpy as np
+import pandas as pd
+
+# Same columns as the competitors.xlsx registry
+ID_COLUMN = "ID"
+NAME_COLUMN = "Nome"
+PRICE_COLUMN = "Preço"
+
+
+def _chunk_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Columnar arrays of one chunk, dropping rows without a price or ID."""
+    prices = pd.to_numeric(df[PRICE_COLUMN], errors="coerce").to_numpy(dtype=float)
+    ids = pd.to_numeric(df[ID_COLUMN], errors="coerce").to_numpy(dtype=float)
+    valid = ~np.isnan(prices) & ~np.isnan(ids)
+    names = (df[NAME_COLUMN].astype(str).to_numpy()[valid] if NAME_COLUMN in df.columns
+             else np.char.add("bid", ids[valid].astype(np.int64).astype(str)))
+    return {"ids": ids[valid].astype(np.int64), "names": names, "prices": prices[valid]}
+
+
+def _csv_chunks(path, chunk_size, sep, decimal):
+    reader = pd.read_csv(
+        path,
+        sep=sep,
+        decimal=decimal,
+        usecols=lambda column: column in (ID_COLUMN, NAME_COLUMN, PRICE_COLUMN),
+        dtype={NAME_COLUMN: str},
+        chunksize=chunk_size,
+    )
+    with reader:
+        for df in reader:
+            yield df
+
+
+def _parquet_chunks(path, chunk_size):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Reading Parquet feeds requires pyarrow (pip install pyarrow)") from exc
+
+    parquet_file = pq.ParquetFile(path)
+    columns = [c for c in (ID_COLUMN, NAME_COLUMN, PRICE_COLUMN) if c in parquet_file.schema_arrow.names]
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+        yield batch.to_pandas()
+
+
+def iter_bid_chunks(path: str, chunk_size: int = 500_000, sep: str = ",", decimal: str = ".") -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Stream a bid feed (CSV or Parquet, columns ID, Nome, Preço) chunk by chunk
+    as columnar arrays {"ids", "names", "prices"}, without building Bid objects.
+    Memory is bounded by chunk_size rows. Rows without ID or price are skipped.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Bid feed not found: {path}")
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".parquet", ".pq"):
+        chunks = _parquet_chunks(path, chunk_size)
+    elif extension in (".csv", ".txt", ".gz"):
+        chunks = _csv_chunks(path, chunk_size, sep, decimal)
+    else:
+        raise ValueError(f"Unsupported bid feed format '{extension}' (expected .csv or .parquet)")
+
+    for df in chunks:
+        missing = {ID_COLUMN, PRICE_COLUMN} - set(df.columns)
+        if missing:
+            raise ValueError(f"Bid feed {path} is missing column(s): {', '.join(sorted(missing))}")
+        arrays = _chunk_arrays(df)
+        if len(arrays["prices"]):
+            yield arrays
+
+
+class RunningStats:
+    """
+    Count, minimum, mean and variance merged chunk by chunk (Chan et al. pairwise
+    update), so the statistics of a feed can be computed in one streaming pass.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.min = float("inf")
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray):
+        n = len(values)
+        if n == 0:
+            return
+        chunk_mean = float(np.mean(values))
+        chunk_m2 = float(np.sum((values - chunk_mean) ** 2))
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta ** 2 * self.count * n / total
+        self.min = min(self.min, float(np.min(values)))
+        self.count = total
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation."""
+        return (self.m2 / self.count) ** 0.5 if self.count else 0.0
@@ -0,0 +1,254 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from src.config.config_price import MAX_SCORE, UPPER_THRESHOLD
+
+# Score fractions are clipped to (EPS, 1 - EPS) before the linearized first guess
+EPS = 1e-12
+
+
+@dataclass(frozen=True)
+class CurveFamily:
+    """
+    Curve shape with free parameters, fitted to control points.
+
+    shape(x, params) gives the score fraction f(x) for x = price / REF_PRICE
+    (x: (G, N), params: (G, P)); initial(x, frac) is a linearized least-squares
+    first guess (G, P) that Gauss-Newton then refines.
+    """
+    name: str
+    params: Tuple[str, ...]
+    shape: Callable
+    initial: Callable
+    formula: str
+
+
+def _sigmoid_shape(x, params, upper_threshold):
+    k, x0 = params[:, 0:1], params[:, 1:2]
+    with np.errstate(over="ignore"):
+        return 1.0 / (1.0 + np.exp(k * (x - 1.0 - x0)))
+
+
+def _sigmoid_initial(x, frac, upper_threshold):
+    # logit: ln(1/f - 1) = k * (x - 1) - k * x0, a straight line in x; weighted by
+    # (f (1 - f))², the slope of the logistic, so the fit approximates score-space errors
+    logit = np.log(1.0 / frac - 1.0)
+    slope, intercept = _line_fit(x - 1.0, logit, (frac * (1.0 - frac)) ** 2)
+    return np.column_stack((slope, -intercept / slope))
+
+
+def _exponential_shape(x, params, upper_threshold):
+    # exponential(): t = price / MAX_PRICE = x / UPPER_THRESHOLD, capped at 1
+    t = np.minimum(1.0, x / upper_threshold)
+    return np.exp(-params[:, 0:1] * t)
+
+
+def _exponential_initial(x, frac, upper_threshold):
+    # ln f = -alpha * t, a line through the origin
+    t = np.minimum(1.0, x / upper_threshold)
+    return (-(t * np.log(frac)).sum(axis=1) / np.maximum((t * t).sum(axis=1), EPS))[:, None]
+
+
+def _power_shape(x, params, upper_threshold):
+    # DSL {"power": {"exponent": p}} on base MAX_PRICE, clamped to [0, 1]
+    t = np.clip(x / upper_threshold, 0.0, 1.0)
+    return np.clip(1.0 - t ** params[:, 0:1], 0.0, 1.0)
+
+
+def _power_initial(x, frac, upper_threshold):
+    # ln(1 - f) = p * ln t, a line through the origin
+    log_t = np.log(np.clip(x / upper_threshold, EPS, 1.0 - EPS))
+    return ((log_t * np.log(1.0 - frac)).sum(axis=1) / np.maximum((log_t * log_t).sum(axis=1), EPS))[:, None]
+
+
+def _line_fit(x, y, weights):
+    """Weighted least-squares line y = slope * x + intercept per row of (G, N) arrays."""
+    weights = weights / weights.sum(axis=1, keepdims=True)
+    x_mean = (weights * x).sum(axis=1, keepdims=True)
+    y_mean = (weights * y).sum(axis=1, keepdims=True)
+    slope = (weights * (x - x_mean) * (y - y_mean)).sum(axis=1) / (weights * (x - x_mean) ** 2).sum(axis=1)
+    return slope, y_mean[:, 0] - slope * x_mean[:, 0]
+
+
+# Curves with shape parameters, selectable by name (the others have none to fit)
+CALIBRATION_FAMILIES: Dict[str, CurveFamily] = {
+    "sigmoid": CurveFamily("sigmoid", ("k", "x0"), _sigmoid_shape, _sigmoid_initial,
+                           "f(x) = 1 / (1 + exp(k * (x - 1 - x0)))"),
+    "exponential": CurveFamily("exponential", ("alpha",), _exponential_shape, _exponential_initial,
+                               "f(x) = exp(-alpha * min(1, x / UPPER_THRESHOLD))"),
+    "power": CurveFamily("power", ("exponent",), _power_shape, _power_initial,
+                         "f(x) = 1 - (x / UPPER_THRESHOLD)^exponent"),
+}
+
+
+@dataclass(frozen=True)
+class Calibration:
+    """
+    Fitted parameters of one curve family for one set of control points.
+
+    residuals are in score points (fitted - target), one per control point.
+    """
+    family: str
+    points: Tuple[Tuple[float, float], ...]
+    params: Mapping[str, float]
+    residuals: Tuple[float, ...]
+    rms: float
+    max_abs: float
+    iterations: int
+    converged: bool
+
+
+def solve_calibration(family: CurveFamily, x, frac, upper_threshold=UPPER_THRESHOLD, max_iter=200, tol=1e-12):
+    """
+    Fit a curve family to G sets of N control points at once.
+
+    Linearized least squares gives the first guess; damped Gauss-Newton
+    (Levenberg-Marquardt, finite-difference Jacobian) then minimizes the squared
+    score-fraction residuals of every set in the same vectorized iterations.
+    With as many points as parameters the fit is exact (zero residuals).
+
+    Args:
+        family: CurveFamily to fit
+        x: (G, N) control prices as fractions of REF_PRICE
+        frac: (G, N) target score fractions (score / MAX_SCORE)
+
+    Returns:
+        (params (G, P), residuals (G, N), iterations (G,), converged (G,))
+    """
+    x = np.asarray(x, dtype=float)
+    frac = np.asarray(frac, dtype=float)
+    n_sets, n_params = len(x), len(family.params)
+
+    def residuals(params):
+        return family.shape(x, params, upper_threshold) - frac
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        params = family.initial(x, np.clip(frac, EPS, 1.0 - EPS), upper_threshold)
+    params = np.where(np.isfinite(params), params, 1.0)
+
+    r = residuals(params)
+    sse = (r * r).sum(axis=1)
+    damping = np.full(n_sets, 1e-3)
+    converged = sse < tol
+    identity = np.eye(n_params)
+    iterations = np.zeros(n_sets, dtype=int)
+
+    for _ in range(max_iter):
+        if converged.all():
+            break
+        iterations[~converged] += 1
+
+        # Central-difference Jacobian (G, N, P)
+        jacobian = np.empty(r.shape + (n_params,))
+        for j in range(n_params):
+            h = 1e-7 * np.maximum(np.abs(params[:, j]), 1.0)
+            step = np.zeros_like(params)
+            step[:, j] = h
+            jacobian[:, :, j] = (residuals(params + step) - residuals(params - step)) / (2 * h[:, None])
+
+        jtj = np.einsum("gnp,gnq->gpq", jacobian, jacobian)
+        jtr = np.einsum("gnp,gn->gp", jacobian, r)
+        scale = np.einsum("gpp->gp", jtj)[:, :, None] * identity + identity * EPS
+        try:
+            delta = np.linalg.solve(jtj + damping[:, None, None] * scale, -jtr[:, :, None])[:, :, 0]
+        except np.linalg.LinAlgError:
+            delta = -jtr / np.maximum(np.einsum("gpp->gp", jtj), EPS)
+        delta[converged] = 0.0
+
+        trial = params + delta
+        trial_r = residuals(trial)
+        trial_sse = (trial_r * trial_r).sum(axis=1)
+
+        # Keep the steps that improve the fit, damp the others more
+        better = np.isfinite(trial_sse) & (trial_sse <= sse) & ~converged
+        small_step = np.abs(delta).max(axis=1) <= 1e-10 * (1.0 + np.abs(params).max(axis=1))
+        params = np.where(better[:, None], trial, params)
+        r = np.where(better[:, None], trial_r, r)
+        improvement = sse - np.where(better, trial_sse, sse)
+        sse = np.where(better, trial_sse, sse)
+        damping = np.where(better, damping / 3.0, damping * 4.0)
+
+        converged |= (sse < tol) | (better & (improvement <= tol * (1.0 + sse))) | small_step | (damping > 1e12)
+
+    return params, r, iterations, converged
+
+
+# Solutions memoized by (family, control points, max_score, upper_threshold)
+_SOLUTIONS: Dict[tuple, Calibration] = {}
+
+
+def _normalize_points(points) -> Tuple[Tuple[float, float], ...]:
+    """Control points as a sorted, hashable tuple of (price fraction, score) float pairs."""
+    return tuple(sorted((float(x), float(score)) for x, score in points))
+
+
+def _check_points(family: CurveFamily, points, max_score):
+    if len(points) < len(family.params):
+        raise ValueError(f"Calibrating '{family.name}' needs at least {len(family.params)} control points, "
+                         f"got {len(points)}")
+    if len({x for x, _ in points}) != len(points):
+        raise ValueError(f"Control points must have distinct price fractions: {points}")
+    if not all(0 < score < max_score for _, score in points):
+        raise ValueError(f"Control point scores must be strictly between 0 and {max_score:g}: {points}")
+
+
+def calibrate_grid(family_name: str, points_grid, max_score=MAX_SCORE, upper_threshold=UPPER_THRESHOLD):
+    """
+    Calibrate one family for many sets of control points (e.g. a sweep grid).
+
+    Sets already solved come from the cache; the others are solved together in
+    one vectorized call and cached.
+
+    Args:
+        points_grid: (G, N, 2) control points [price fraction, score]
+
+    Returns:
+        List of G Calibration results
+    """
+    family = CALIBRATION_FAMILIES[family_name]
+    point_sets = [_normalize_points(points) for points in points_grid]
+    keys = [(family_name, points, float(max_score), float(upper_threshold)) for points in point_sets]
+
+    missing = list(dict.fromkeys(key for key in keys if key not in _SOLUTIONS))
+    for n_points in sorted({len(key[1]) for key in missing}):
+        # Sets of the same size are solved in one batch
+        batch = [key for key in missing if len(key[1]) == n_points]
+        for key in batch:
+            _check_points(family, key[1], max_score)
+        arrays = np.array([key[1] for key in batch], dtype=float)
+        params, r, iterations, converged = solve_calibration(
+            family, arrays[:, :, 0], arrays[:, :, 1] / max_score, upper_threshold)
+
+        residuals = r * max_score
+        for i, key in enumerate(batch):
+            _SOLUTIONS[key] = Calibration(
+                family=family_name,
+                points=key[1],
+                params={name: float(value) for name, value in zip(family.params, params[i])},
+                residuals=tuple(float(v) for v in residuals[i]),
+                rms=float(np.sqrt(np.mean(residuals[i] ** 2))),
+                max_abs=float(np.abs(residuals[i]).max()),
+                iterations=int(iterations[i]),
+                converged=bool(converged[i]),
+            )
+    return [_SOLUTIONS[key] for key in keys]
+
+
+def calibrate(family_name: str, points: Sequence[Tuple[float, float]], max_score=MAX_SCORE,
+              upper_threshold=UPPER_THRESHOLD) -> Calibration:
+    """
+    Fit a curve family to N control points (price as a fraction of REF_PRICE → score).
+
+    Scores are taken as fractions of max_score, as in calc_sigmoid_params, so two
+    sigmoid points give the same k and x0. Results are memoized: calibrating the
+    same points again is a dictionary lookup.
+    """
+    if family_name not in CALIBRATION_FAMILIES:
+        raise ValueError(f"Unknown curve family '{family_name}' (expected one of {list(CALIBRATION_FAMILIES)})")
+    return calibrate_grid(family_name, [points], max_score, upper_threshold)[0]
+
+
+def clear_calibration_cache():
+    _SOLUTIONS.clear()
@@ -0,0 +1,139 @@
+from functools import lru_cache
+import json
+
+import numpy as np
+
+from src.config.config_price import MAX_SCORE, MIN_SCORE, MAX_PRICE, UPPER_THRESHOLD
+
+# Price bases a curve can normalize against (x = price / base), from the call's max_price and ref_price
+CURVE_BASES = {
+    "MAX_PRICE": lambda max_price, ref_price: max_price,
+    "REF_PRICE": lambda max_price, ref_price: ref_price,
+}
+
+
+class CompiledCurve:
+    """
+    Price curve compiled from a declarative definition (see config_curves.py).
+    Called like the hand-written curves: curve(price, min_score, max_score, max_price,
+    ref_price), with float or ndarray prices; ref_price defaults to max_price / UPPER_THRESHOLD
+    as in sigmoid (curves.curve_kwargs passes the ScoringContext's). Carries its formula text for the reports.
+    """
+
+    def __init__(self, name: str, base_name: str, evaluate, expr_text: str, constants: str):
+        self.__name__ = name
+        self.base_name = base_name
+        self._base = CURVE_BASES[base_name]
+        self._evaluate = evaluate
+        self.formula = f"P = MIN + (MAX - MIN) * f(x) || f(x) = {expr_text}"
+        self.constants = f"x = price / {base_name}" + (f" || {constants}" if constants else "")
+
+    def __call__(self, price, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, max_price: float = MAX_PRICE,
+                 ref_price: float = None):
+        if ref_price is None:
+            ref_price = max_price / UPPER_THRESHOLD
+        x = np.asarray(price, dtype=float) / self._base(max_price, ref_price)
+        frac = self._evaluate(x)
+        score = np.clip(min_score + frac * (max_score - min_score), min_score, max_score)
+        return float(score) if np.ndim(score) == 0 else score
+
+    def __repr__(self):
+        return f"CompiledCurve({self.__name__!r})"
+
+
+def _compile_expr(node):
+    """
+    Compile one expression node into (evaluate(x) -> frac, formula text, constants text).
+
+    Nodes are single-key dicts:
+        {"points": [[x, frac], ...]}                  piecewise-linear through control points
+        {"logistic": {"k": k, "x0": x0, "center": 1}} 1 / (1 + e^(k * (x - center - x0)))
+        {"power": {"exponent": p}}                     1 - x^p
+        {"clamp": {"expr": node, "min": a, "max": b}}  expression clipped to [a, b]
+        {"piecewise": [{"upto": x1, "expr": node}, ..., {"expr": node}]}
+        a number                                       constant fraction
+    """
+    if isinstance(node, (int, float)):
+        value = float(node)
+        return (lambda x: np.full_like(x, value)), f"{value:g}", ""
+
+    if not isinstance(node, dict) or len(node) != 1:
+        raise ValueError(f"Curve expression must be a number or a single-key dict, got: {node!r}")
+
+    (op, args), = node.items()
+
+    if op == "points":
+        points = sorted((float(px), float(py)) for px, py in args)
+        if len(points) < 2:
+            raise ValueError("'points' needs at least two control points")
+        xs = np.array([p[0] for p in points])
+        ys = np.array([p[1] for p in points])
+        text = "interp(x; " + ", ".join(f"({px:g}, {py:g})" for px, py in points) + ")"
+        return (lambda x: np.interp(x, xs, ys)), text, ""
+
+    if op == "logistic":
+        k = float(args["k"])
+        x0 = float(args["x0"])
+        center = float(args.get("center", 1.0))
+
+        def evaluate(x):
+            with np.errstate(over='ignore'):
+                return 1.0 / (1.0 + np.exp(k * (x - center - x0)))
+        return evaluate, f"1 / (1 + e^(k * (x - {center:g} - x0)))", f"k = {k:.4f} || x0 = {x0:.4f}"
+
+    if op == "power":
+        exponent = float(args["exponent"])
+        return (lambda x: 1.0 - np.power(np.clip(x, 0.0, None), exponent)), f"1 - x^{exponent:g}", ""
+
+    if op == "clamp":
+        inner, inner_text, inner_constants = _compile_expr(args["expr"])
+        lo = float(args.get("min", 0.0))
+        hi = float(args.get("max", 1.0))
+        return (lambda x: np.clip(inner(x), lo, hi)), f"clamp({inner_text}, {lo:g}, {hi:g})", inner_constants
+
+    if op == "piecewise":
+        if not args or "upto" in args[-1]:
+            raise ValueError("'piecewise' needs a final piece without 'upto'")
+        bounds = []
+        pieces = []
+        texts = []
+        constants = []
+        for piece in args:
+            evaluate, text, piece_constants = _compile_expr(piece["expr"])
+            pieces.append(evaluate)
+            if "upto" in piece:
+                bounds.append(float(piece["upto"]))
+                texts.append(f"{text} if x < {bounds[-1]:g}")
+            else:
+                texts.append(f"{text} otherwise")
+            if piece_constants:
+                constants.append(piece_constants)
+
+        def evaluate(x):
+            conditions = [x < bound for bound in bounds]
+            return np.select(conditions, [piece(x) for piece in pieces[:-1]], default=pieces[-1](x))
+        return evaluate, "; ".join(texts), " || ".join(constants)
+
+    raise ValueError(f"Unknown curve expression '{op}'")
+
+
+@lru_cache(maxsize=None)
+def _compile_cached(name: str, frozen_definition: str) -> CompiledCurve:
+    definition = json.loads(frozen_definition)
+    base_name = definition.get("base", "MAX_PRICE")
+    if base_name not in CURVE_BASES:
+        raise ValueError(f"Curve '{name}': unknown base '{base_name}' (expected one of {list(CURVE_BASES)})")
+    evaluate, text, constants = _compile_expr(definition["expr"])
+    return CompiledCurve(name, base_name, evaluate, text, constants)
+
+
+def compile_curve(name: str, definition: dict) -> CompiledCurve:
+    """
+    Compile a curve definition once; identical definitions return the cached curve.
+    """
+    return _compile_cached(name, json.dumps(definition, sort_keys=True))
+
+
+def compile_curves(definitions: dict) -> dict:
+    """Compile every definition of a {name: definition} mapping."""
+    return {name: compile_curve(name, definition) for name, definition in definitions.items()}
@@ -1,35 +1,53 @@
-import math
-from src.config.config_price import MAX_SCORE, MIN_SCORE, MAX_PRICE, REF_PRICE, SIGMOID_K, SIGMOID_X0, LOWER_THRESHOLD, UPPER_THRESHOLD
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from src.config.config_price import MAX_SCORE, MIN_SCORE, MAX_PRICE, SIGMOID_K, SIGMOID_X0, LOWER_THRESHOLD, UPPER_THRESHOLD
 from src.config.config_linear import MIN_SCORE_PER_PROJECT, MAX_SCORE_PER_PROJECT
+from src.config.config_curves import CURVE_DEFINITIONS
+from src.utils.curve_dsl import CompiledCurve, compile_curves
+from src.utils.rank_flip import bisect_price
+
+
+def _as_output(values):
+    """Return a float for scalar results and an ndarray for array results."""
+    return float(values) if np.ndim(values) == 0 else values
 
 
-def linear_abs(cost: float, abs_min: float, abs_max: float) -> float:
+def linear_abs(cost, abs_min, abs_max, min_score: float = MIN_SCORE_PER_PROJECT,
+               max_score: float = MAX_SCORE_PER_PROJECT):
     """
     PARA EVALUACIÓN DE PROYECTOS: MAX. PRICE -> MAX. POINTS
     Linear mapping from ABS_MIN→1 point up to ABS_MAX→100 points.
     Below ABS_MIN → 0; above ABS_MAX → 100.
+    Accepts floats or ndarrays (abs_min/abs_max may be arrays of per-row thresholds).
     """
-    if cost < abs_min:
-        return 0.0
-    if cost > abs_max:
-        return float(MAX_SCORE_PER_PROJECT)
+    c = np.asarray(cost, dtype=float)
+    abs_min = np.asarray(abs_min, dtype=float)
+    abs_max = np.asarray(abs_max, dtype=float)
     # interpolate so ABS_MIN => 1, ABS_MAX => 100
-    return MIN_SCORE_PER_PROJECT + (cost - abs_min) * ((MAX_SCORE_PER_PROJECT - MIN_SCORE_PER_PROJECT) / (abs_max - abs_min))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inside = min_score + (c - abs_min) * ((max_score - min_score) / (abs_max - abs_min))
+    score = np.select([c < abs_min, c > abs_max], [0.0, float(max_score)], default=inside)
+    return _as_output(score)
 
 
-def linear(price: float, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE) -> float:
+def linear(price, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, max_price: float = MAX_PRICE):
     """
     PARA EVALUACIÓN DE PRECIO: MAX. PRICE -> MIN. POINTS
     Linear mapping from 0 to MAX_PRICE.
     Higher price → lower score.
+    Accepts a float or an ndarray of prices; max_price may be an array (e.g. per-lot base prices).
     """
+    p = np.asarray(price, dtype=float)
     # Normalize price to [0,1] range, inverted
-    norm = 1.0 - min(1.0, price / MAX_PRICE)
+    norm = 1.0 - np.minimum(1.0, p / max_price)
     # Map to score range
-    return min_score + norm * (max_score - min_score)
+    return _as_output(min_score + norm * (max_score - min_score))
 
 
-def inverse_proportional(price: float, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, power: float = 1.0) -> float:
+def inverse_proportional(price, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, power: float = 1.0,
+                         max_price: float = MAX_PRICE):
     """
     Inverse‐proportional map: higher price → lower score.
 
@@ -40,82 +58,341 @@ def inverse_proportional(price: float, min_score: float = MIN_SCORE, max_score:
                - power=1: Standard hyperbola (1/x shape)
                - power=2: Quadratic fall-off
                - power=0.5: Square root fall-off (more gradual)
+    Accepts a float or an ndarray of prices; max_price may be an array (e.g. per-lot base prices).
     """
-    if price <= 0:
-        return max_score
-        
+    p = np.asarray(price, dtype=float)
+
     # Calculate inverse value with optional power for steepness control
-    inv_val = (MAX_PRICE / price) ** power
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_val = (max_price / p) ** power
     
     # Normalize between 1 and MAX_PRICE/epsilon
-    norm = (inv_val - 1) / ((MAX_PRICE / 0.001) - 1)
-    norm = max(0.0, min(1.0, norm))
+    norm = (inv_val - 1) / ((max_price / 0.001) - 1)
+    norm = np.clip(norm, 0.0, 1.0)
     
-    # Map to score range
-    return min_score + norm * (max_score - min_score)
+    # Map to score range (price <= 0 → max_score)
+    score = np.where(p <= 0, max_score, min_score + norm * (max_score - min_score))
+    return _as_output(score)
 
 
-def exponential(price: float, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, alpha: float = 4.0) -> float:
+def exponential(price, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, alpha: float = 4.0,
+                max_price: float = MAX_PRICE):
     """
     Exponential decay: score decays exponentially as price increases.
     Higher alpha = steeper curve.
+    Accepts a float or an ndarray of prices; max_price may be an array (e.g. per-lot base prices).
     """
     # Normalize price to [0,1] range
-    t = min(1.0, price / MAX_PRICE)
+    t = np.minimum(1.0, np.asarray(price, dtype=float) / max_price)
     
     # Exponential decay function
-    decay = math.exp(-alpha * t)
+    decay = np.exp(-alpha * t)
     
     # Map to score range
-    return min_score + decay * (max_score - min_score)
+    return _as_output(min_score + decay * (max_score - min_score))
 
 
-def sigmoid(price: float, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE) -> float:
+def sigmoid(price, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE,
+            k: float = SIGMOID_K, x0: float = SIGMOID_X0, ref_price: float = None, max_price: float = MAX_PRICE):
     """
     Calculates a score from 0 to 100 using a sigmoid function:
         P = 100 / (1 + exp(k * ((price / REF_PRICE) - 1 - x0)))
     where:
-        - price: the bid/proposal value
-        - REF_PRICE: reference price
-        - k, x0: sigmoid parameters
+        - price: the bid/proposal value (float or ndarray)
+        - REF_PRICE: reference price (ref_price, defaults to max_price / UPPER_THRESHOLD)
+        - k, x0: sigmoid parameters (default to config; arrays broadcast against price)
+        - max_price: base price (default MAX_PRICE; may be an array, e.g. per-lot base prices)
     Returns:
         Score in the range [min_score, max_score].
     """
+    if ref_price is None:
+        ref_price = max_price / UPPER_THRESHOLD
+
     # compute relative delta
-    x_rel = (price / REF_PRICE) - 1.0
+    x_rel = (np.asarray(price, dtype=float) / ref_price) - 1.0
     
-    # logistic with steepness K and center X0
-    frac = 1.0 / (1.0 + math.exp(SIGMOID_K * (x_rel - SIGMOID_X0)))
+    # logistic with steepness K and center X0 (overflow → exp = inf → frac = 0)
+    with np.errstate(over='ignore'):
+        frac = 1.0 / (1.0 + np.exp(k * (x_rel - x0)))
     
     # Map to the specified score range
     score = min_score + frac * (max_score - min_score)
     
-    return max(min_score, min(max_score, score))
+    return _as_output(np.clip(score, min_score, max_score))
 
 
-def semicircle(price: float, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE) -> float:
+def semicircle(price, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, max_price: float = MAX_PRICE):
     """
     Calculates a score from 0 to 100 using a semicircle function:
         C = 100 * sqrt(1 - x²)
     where:
         - x = price / max_price
         - max_price = REF_PRICE * UPPER_THRESHOLD
+    Accepts a float or an ndarray of prices; max_price may be an array (e.g. per-lot base prices).
     
     Returns:
         Score in the range [min_score, max_score, 100].
     """
-    x = price / MAX_PRICE
+    x = np.asarray(price, dtype=float) / max_price
     
     # Ensure x is in valid range for sqrt(1-x²)
-    x = max(0.0, min(1.0, x))
+    x = np.clip(x, 0.0, 1.0)
     
     # Semicircle equation: normalized to [0, 1]
-    frac = math.sqrt(1 - x * x)
+    frac = np.sqrt(1 - x * x)
 
     # Map to the specified score range
     score = min_score + frac * (max_score - min_score)
     
-    return max(min_score, min(max_score, score))
+    return _as_output(np.clip(score, min_score, max_score))
+
+
+# --- BID-RELATIVE CURVES ---
+# Scored against statistics of the accepted bids instead of MAX_PRICE/REF_PRICE.
+# bid_statistics() computes them once per bid set and every curve of a run
+# reuses the same BidStats (passed as bid_stats=...).
+
+@dataclass(frozen=True)
+class BidStats:
+    """Count, lowest and mean price of the accepted bids (floats, or arrays per lot / tender)."""
+    count: Any
+    min: Any
+    mean: Any
+
+    def take(self, indices) -> "BidStats":
+        """Per-group statistics expanded to one entry per bid (indices = group of each bid)."""
+        return BidStats(self.count[indices], self.min[indices], self.mean[indices])
+
+
+def bid_statistics(prices, accepted=None, groups=None, n_groups=None) -> BidStats:
+    """
+    Statistics of the accepted bids in one vectorized reduction.
+
+    prices may be 1-D (one bid set → floats), 2-D (one bid set per row → (G, 1)
+    arrays that broadcast against the rows) or 1-D with `groups` (group code per
+    bid → one entry per group, see BidStats.take). Sets without accepted bids
+    get count 0 and NaN min/mean.
+    """
+    p = np.asarray(prices, dtype=float)
+    accepted = np.ones(p.shape, dtype=bool) if accepted is None else np.asarray(accepted, dtype=bool)
+
+    if groups is not None:
+        groups = np.asarray(groups)
+        n_groups = int(groups.max()) + 1 if n_groups is None else n_groups
+        count = np.bincount(groups[accepted], minlength=n_groups)
+        total = np.bincount(groups[accepted], weights=p[accepted], minlength=n_groups)
+        lowest = np.full(n_groups, np.inf)
+        np.minimum.at(lowest, groups[accepted], p[accepted])
+    else:
+        keepdims = p.ndim > 1
+        count = accepted.sum(axis=-1, keepdims=keepdims)
+        total = np.where(accepted, p, 0.0).sum(axis=-1, keepdims=keepdims)
+        lowest = np.where(accepted, p, np.inf).min(axis=-1, keepdims=keepdims, initial=np.inf)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(count > 0, total / count, np.nan)
+    lowest = np.where(count > 0, lowest, np.nan)
+    if np.ndim(count) == 0:
+        return BidStats(int(count), float(lowest), float(mean))
+    return BidStats(count, lowest, mean)
+
+
+def _bid_stats_of(price, max_price, bid_stats):
+    """bid_stats, or (when not given) the statistics of the prices being scored."""
+    if bid_stats is not None:
+        return bid_stats
+    p = np.asarray(price, dtype=float)
+    return bid_statistics(p, p <= max_price)
+
+
+def lowest_ratio(price, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, max_price: float = MAX_PRICE,
+                 bid_stats: BidStats = None):
+    """
+    Proportional to the lowest bid: frac = Pmin / P
+    The lowest accepted bid gets max_score; twice its price gets half the range.
+    Accepts a float or an ndarray of prices.
+    """
+    stats = _bid_stats_of(price, max_price, bid_stats)
+    p = np.asarray(price, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = np.where(p <= 0, 1.0, np.clip(stats.min / p, 0.0, 1.0))
+    return _as_output(min_score + frac * (max_score - min_score))
+
+
+def lowest_proportional(price, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, max_price: float = MAX_PRICE,
+                        bid_stats: BidStats = None):
+    """
+    Linear deduction above the lowest bid: frac = 1 - (P - Pmin) / Pmin
+    Each 1% above the lowest accepted bid loses 1% of the score range (0 at 2 × Pmin).
+    Accepts a float or an ndarray of prices.
+    """
+    stats = _bid_stats_of(price, max_price, bid_stats)
+    p = np.asarray(price, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = np.clip(2.0 - p / stats.min, 0.0, 1.0)
+    return _as_output(min_score + frac * (max_score - min_score))
+
+
+def mean_distance(price, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, max_price: float = MAX_PRICE,
+                  bid_stats: BidStats = None):
+    """
+    Distance from the mean bid: frac = 1 - |P - Pmean| / Pmean
+    The mean of the accepted bids gets max_score; bids deviating from it by
+    x% (above or below) lose x% of the score range.
+    Accepts a float or an ndarray of prices.
+    """
+    stats = _bid_stats_of(price, max_price, bid_stats)
+    p = np.asarray(price, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = np.clip(1.0 - np.abs(p - stats.mean) / stats.mean, 0.0, 1.0)
+    return _as_output(min_score + frac * (max_score - min_score))
+
+
+# --- INVERSE CURVES (score → price) ---
+# Each inverse returns the highest price in [0, max_price] that still earns at
+# least the target score (NaN for targets outside [min_score, max_score]).
+
+def _score_fraction(score, min_score, max_score):
+    """Normalize target scores to [0, 1]; out-of-range targets become NaN."""
+    s = np.asarray(score, dtype=float)
+    frac = (s - min_score) / (max_score - min_score)
+    return np.where((s < min_score) | (s > max_score), np.nan, frac)
+
+
+def linear_inverse(score, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, max_price: float = MAX_PRICE):
+    """
+    Inverse of linear: price = MAX_PRICE * (1 - frac)
+    """
+    frac = _score_fraction(score, min_score, max_score)
+    return _as_output(max_price * (1.0 - frac))
+
+
+def inverse_proportional_inverse(score, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, power: float = 1.0,
+                                 max_price: float = MAX_PRICE):
+    """
+    Inverse of inverse_proportional: price = MAX_PRICE / (1 + frac * (MAX_PRICE/0.001 - 1))^(1/power)
+    """
+    frac = _score_fraction(score, min_score, max_score)
+    inv_val = 1.0 + frac * ((max_price / 0.001) - 1)
+    return _as_output(max_price / inv_val ** (1.0 / power))
+
+
+def exponential_inverse(score, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, alpha: float = 4.0,
+                        max_price: float = MAX_PRICE):
+    """
+    Inverse of exponential: price = MAX_PRICE * (ln(1/frac) / alpha)
+    Scores below the curve value at MAX_PRICE are reached by any admissible price → MAX_PRICE.
+    """
+    frac = _score_fraction(score, min_score, max_score)
+    with np.errstate(divide='ignore'):
+        t = np.log(1.0 / frac) / alpha
+    return _as_output(max_price * np.clip(t, 0.0, 1.0))
+
+
+def sigmoid_inverse(score, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE,
+                    k: float = SIGMOID_K, x0: float = SIGMOID_X0, ref_price: float = None, max_price: float = MAX_PRICE):
+    """
+    Inverse of sigmoid: price = REF_PRICE * (1 + x0 + ln(1/frac - 1) / k)
+    The sigmoid stays below max_score even at price 0: targets above sigmoid(0) → NaN.
+    """
+    if ref_price is None:
+        ref_price = max_price / UPPER_THRESHOLD
+
+    frac = _score_fraction(score, min_score, max_score)
+    with np.errstate(divide='ignore'):
+        x_rel = x0 + np.log(1.0 / frac - 1.0) / k
+    price = np.clip(ref_price * (1.0 + x_rel), 0.0, max_price)
+    reachable = np.asarray(score, dtype=float) <= sigmoid(0.0, min_score, max_score, k, x0, ref_price, max_price)
+    return _as_output(np.where(reachable, price, np.nan))
+
+
+def semicircle_inverse(score, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, max_price: float = MAX_PRICE):
+    """
+    Inverse of semicircle: price = MAX_PRICE * sqrt(1 - frac²)
+    """
+    frac = _score_fraction(score, min_score, max_score)
+    return _as_output(max_price * np.sqrt(1.0 - frac * frac))
+
+
+def numeric_inverse(curve_function, peak_price=None, iterations: int = 60):
+    """
+    Inverse of a curve without a closed form, by vectorized bisection over all
+    target scores at once (see rank_flip.bisect_price). The curve must not rise
+    with price above its peak: peak_price(curve_kwargs) gives the price of its
+    maximum (default 0, i.e. a non-increasing curve).
+    The returned inverse takes the target scores and the curve's own keyword
+    arguments; targets above the curve's maximum get NaN.
+    """
+    def inverse(score, min_score: float = MIN_SCORE, max_score: float = MAX_SCORE, max_price: float = MAX_PRICE,
+                **kwargs):
+        kwargs.update(min_score=min_score, max_score=max_score, max_price=max_price)
+        frac = _score_fraction(score, min_score, max_score)
+        peak = 0.0 if peak_price is None else np.minimum(peak_price(kwargs), max_price)
+        lo, hi, target = np.broadcast_arrays(np.asarray(peak, dtype=float), np.asarray(max_price, dtype=float),
+                                             np.asarray(score, dtype=float))
+
+        # Largest p in [peak, max_price] with curve(p) >= target
+        reachable = ~np.isnan(frac) & (curve_function(lo, **kwargs) >= target)
+        price, _ = bisect_price(curve_function, target, lo, hi, lambda s, t: s >= t, iterations, kwargs)
+        price = np.where(curve_function(hi, **kwargs) >= target, hi, price)
+        return _as_output(np.where(reachable, price, np.nan))
+
+    inverse.__name__ = f"{getattr(curve_function, '__name__', 'curve')}_inverse"
+    return inverse
+
+
+# Price curves selectable by name (CLI choices): hand-written + config_curves.py
+PRICE_CURVES = {
+    'sigmoid': sigmoid,
+    'linear': linear,
+    'semicircle': semicircle,
+    'inverse': inverse_proportional,
+    'exponential': exponential,
+    'lowest_ratio': lowest_ratio,
+    'lowest_proportional': lowest_proportional,
+    'mean_distance': mean_distance,
+}
+
+# Curves that need bid_stats (statistics of the bid set) besides the price
+BID_RELATIVE_CURVES = {lowest_ratio, lowest_proportional, mean_distance}
+
+for _name, _curve in compile_curves(CURVE_DEFINITIONS).items():
+    if _name in PRICE_CURVES:
+        raise ValueError(f"Curve '{_name}' in CURVE_DEFINITIONS clashes with a built-in curve")
+    PRICE_CURVES[_name] = _curve
+
+# Inverse of each price curve: closed form for the hand-written curves,
+# bisection for the declarative and bid-relative ones
+INVERSE_CURVES = {
+    sigmoid: sigmoid_inverse,
+    linear: linear_inverse,
+    semicircle: semicircle_inverse,
+    inverse_proportional: inverse_proportional_inverse,
+    exponential: exponential_inverse
+}
+
+# Price of the maximum of curves that are not non-increasing (mean_distance peaks at Pmédio)
+CURVE_PEAKS = {mean_distance: lambda kwargs: kwargs["bid_stats"].mean}
+
+for _curve in PRICE_CURVES.values():
+    if _curve not in INVERSE_CURVES:
+        INVERSE_CURVES[_curve] = numeric_inverse(_curve, CURVE_PEAKS.get(_curve))
+
+
+def curve_kwargs(curve_function, context, bid_stats: BidStats = None) -> dict:
+    """
+    Keyword arguments that evaluate a curve (or its inverse) under a ScoringContext:
+    score range and base price, plus the context's k, x0 and REF_PRICE for the sigmoid,
+    REF_PRICE for the declarative curves and the bid set statistics for bid-relative curves.
+    """
+    kwargs = {"min_score": context.min_score, "max_score": context.max_score, "max_price": context.max_price}
+    if curve_function in (sigmoid, sigmoid_inverse):
+        kwargs.update(k=context.sigmoid_k, x0=context.sigmoid_x0, ref_price=context.ref_price)
+    elif isinstance(curve_function, CompiledCurve):
+        kwargs["ref_price"] = context.ref_price
+    if curve_function in BID_RELATIVE_CURVES:
+        kwargs["bid_stats"] = bid_stats
+    return kwargs
 """
 def sigmoid_abs(price: float) -> float:
     
@@ -1,14 +1,53 @@
 from datetime import datetime
+from functools import lru_cache
 import re
+from typing import List, Tuple
+
+import numpy as np
 import pandas as pd
-from src.config.config_linear import CURRENT_DATE, DATE_LIMITS, ACCEPTED_DATE_FORMATS
+from src.config.scoring_context import DEFAULT_CONTEXT, ScoringContext
+
+YEAR_PATTERN = re.compile(r'^\d{4}$')
+# dd/mm/yyyy, the usual shape: parsed with int() instead of strptime
+DMY_PATTERN = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})$')
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_text(date_str: str, accepted_formats: Tuple[str, ...]) -> tuple:
+    """parse_date of a stripped, non-empty string (memoized: repeated dates are parsed once)."""
+    # Try yyyy format
+    if YEAR_PATTERN.match(date_str):
+        try:
+            return datetime(int(date_str), 12, 31), True, ""
+        except ValueError:
+            return None, False, f"formato de data invalido: '{date_str}'"
+
+    # Fast path for dd/mm/yyyy when it is the first accepted format; impossible
+    # dates (31/02/...) fall through to strptime for the usual result
+    match = DMY_PATTERN.match(date_str) if accepted_formats[:1] == ('%d/%m/%Y',) else None
+    if match:
+        day, month, year = (int(part) for part in match.groups())
+        try:
+            return datetime(year, month, day), True, ""
+        except ValueError:
+            pass
+
+    # Try dd/mm/yyyy or dd/mm/yy
+    for fmt in accepted_formats:
+        try:
+            return datetime.strptime(date_str, fmt), True, ""
+        except ValueError:
+            continue
+    # if we reach here, format is invalid
+    return None, False, f"formato de data invalido: '{date_str}'"
 
 
-def parse_date(date_input) -> tuple:
+def parse_date(date_input, context: ScoringContext = DEFAULT_CONTEXT) -> tuple:
     """
     Parse date from multiple formats: dd/mm/yyyy, dd/mm/yy, yyyy, or datetime object
+    (the accepted formats come from context.accepted_date_formats)
     Returns: (datetime_obj, is_valid, observation)
-    
+
     - datetime_obj: parsed date or None
     - is_valid: True if format is correct, False if unparseable
     - observation: error message if invalid
@@ -16,54 +55,90 @@ def parse_date(date_input) -> tuple:
 
     if isinstance(date_input, datetime):
         return date_input, True, ""
-    
+
     if pd.isna(date_input) or date_input is None or str(date_input).strip() == "":
         return None, False, "sem data"
-    
-    date_str = str(date_input).strip()
-    
-    # Try yyyy format
-    if re.match(r'^\d{4}$', date_str):
-        try:
-            return datetime(int(date_str), 12, 31), True, ""
-        except:
-            return None, False, f"formato de data invalido: '{date_str}'"
-    
-    # Try dd/mm/yyyy or dd/mm/yy
-    for fmt in ACCEPTED_DATE_FORMATS:
-        try:
-            parsed = datetime.strptime(date_str, fmt)
-            return parsed, True, ""
-        except:
-            continue
-    # if we reach here, format is invalid
-    return None, False, f"formato de data invalido: '{date_str}'"
+
+    return _parse_date_text(str(date_input).strip(), context.accepted_date_formats)
+
+
+def parse_dates(values, context: ScoringContext = DEFAULT_CONTEXT) -> Tuple[List, np.ndarray, List[str]]:
+    """
+    parse_date over a whole column: each distinct cell value is parsed once.
+
+    Returns:
+        (dates, is_valid (bool array), observations), one entry per value
+    """
+    parsed = {}
+    results = []
+    for value in values:
+        # keyed by type too: 2010 and 2010.0 are equal but parse differently
+        key = (type(value), value)
+        result = parsed.get(key)
+        if result is None:
+            result = parsed[key] = parse_date(value, context)
+        results.append(result)
+    if not results:
+        return [], np.zeros(0, dtype=bool), []
+    dates, valid, notes = zip(*results)
+    return list(dates), np.array(valid, dtype=bool), list(notes)
 
 
-def validate_date(date_obj: datetime, item_type: str = "projeto") -> tuple:
+def date_ages(dates, reference_date: datetime) -> np.ndarray:
     """
-    Validate date against age limit.
+    Whole years from each date to the reference date (the tender date), one less
+    if the anniversary is still ahead, computed on datetime64 day arrays.
+    """
+    days = np.array(dates, dtype="datetime64[D]")
+    month_start = days.astype("datetime64[M]")
+    years = days.astype("datetime64[Y]").astype(int) + 1970
+    months = month_start.astype(int) % 12 + 1
+    month_days = (days - month_start).astype(int) + 1
+    not_yet = (months > reference_date.month) | ((months == reference_date.month) & (month_days > reference_date.day))
+    return reference_date.year - years - not_yet
+
+
+def age_checks(ages: np.ndarray, limit_years: int) -> Tuple[np.ndarray, np.ndarray]:
+    """validate_date over an array of ages: (status, observation) arrays."""
+    over = ages > limit_years
+    at_limit = ages == limit_years
+    status = np.full(len(ages), "", dtype=object)
+    status[over] = "DESCL"
+    status[at_limit] = "AVISO"
+    observations = np.full(len(ages), "", dtype=object)
+    observations[over] = [f"Excede limite de {limit_years} anos (antiguedade: {age} anos)" for age in ages[over]]
+    observations[at_limit] = [f"No limite de {limit_years} anos (antiguedade: {age} anos. Verificar data)"
+                              for age in ages[at_limit]]
+    return status, observations
+
+
+def validate_date(date_obj: datetime, item_type: str = "projeto", context: ScoringContext = DEFAULT_CONTEXT,
+                  reference_date: datetime = None) -> tuple:
+    """
+    Validate date against age limit (context.date_limits, counted back from
+    reference_date, by default context.current_date).
     Returns: (is_valid, status, observation)
-    
+
     - is_valid: True if passes validation
     - status: "" (empty/valid), "DESCL" (disqualified), or "AVISO" (warning)
     - observation: reason/note
     """
     if date_obj is None:
         return False, "DESCL", "sem data ou formato invalido"
-    
-    limit_years = DATE_LIMITS.get(item_type, 10)
-    year_diff = CURRENT_DATE.year - date_obj.year
-    
+
+    limit_years = context.date_limits.get(item_type, 10)
+    current_date = reference_date or context.current_date
+    year_diff = current_date.year - date_obj.year
+
     # Account for months (if project is in same year but after current date, it's -1)
-    if date_obj.month > CURRENT_DATE.month:
+    if date_obj.month > current_date.month:
         year_diff -= 1
-    elif date_obj.month == CURRENT_DATE.month and date_obj.day > CURRENT_DATE.day:
+    elif date_obj.month == current_date.month and date_obj.day > current_date.day:
         year_diff -= 1
-    
+
     if year_diff > limit_years:
         return False, "DESCL", f"Excede limite de {limit_years} anos (antiguedade: {year_diff} anos)"
     elif year_diff == limit_years:
         return True, "AVISO", f"No limite de {limit_years} anos (antiguedade: {year_diff} anos. Verificar data)"
     else:
-        return True, "", ""
\ No newline at end of file
+        return True, "", ""
@@ -1,50 +1,121 @@
+from concurrent.futures import ProcessPoolExecutor
 import os
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional
 from src.models.bids_linear import Projeto, Disciplina, Factor, Concorrente, Formação
-from src.models.bids_price import Bid
+from src.models.columnar import ProjectTable, ProjectTableBuilder
+from src.models.bids_price import Bid, Lot
 from src.config.factor_structure import FACTOR_STRUCTURE
-from src.config.config_linear import MAX_PROJECTS_PER_DISCIPLINA
-from src.utils.date_validation import parse_date, validate_date
+from src.config.scoring_context import DEFAULT_CONTEXT, ScoringContext
+from src.utils.row_validation import FACTOR_RULES, VALIDATED_COLUMNS, validate_sheet
 
+# Columns read from each Factor_* sheet (the others, e.g. Status/Observações, are outputs)
+FACTOR_COLUMNS = ["Disciplina", "Projeto", "Dono de obra", "Data", "Valor de obra"]
+# Text columns read as str; "Valor de obra" and "Data" keep Excel's own cell types
+# (numbers / datetimes), which the row validation already handles
+FACTOR_DTYPES = {"Disciplina": str, "Projeto": str, "Dono de obra": str}
 
-def validate_required_fields(row, factor_id: str) -> tuple:
+
+def read_factor_sheets(competitor_file: str) -> Dict[str, pd.DataFrame]:
+    """
+    Open a competitor workbook once and parse every Factor_* sheet of
+    FACTOR_STRUCTURE in that pass, only the FACTOR_COLUMNS.
+
+    Returns:
+        {factor_id: DataFrame} for the sheets present in the workbook
     """
-    Check if required fields are present based on factor_type.
-    Returns: (is_valid, missing_fields_note)
+    with pd.ExcelFile(competitor_file) as xl:
+        sheet_names = {f"Factor_{factor_id}": factor_id for factor_id in FACTOR_STRUCTURE}
+        present = [sheet for sheet in sheet_names if sheet in xl.sheet_names]
+        sheets = xl.parse(
+            sheet_name=present,
+            usecols=lambda column: column in FACTOR_COLUMNS,
+            dtype=FACTOR_DTYPES,
+        ) if present else {}
+    return {sheet_names[sheet]: df for sheet, df in sheets.items()}
+
+
+def validated_factors(competitor_id, competitor_file: str, context: ScoringContext = DEFAULT_CONTEXT):
     """
-    factor_config = FACTOR_STRUCTURE[factor_id]
+    Validate every Factor_* sheet of one competitor workbook.
 
-    required_always = ["Projeto", "Valor de obra"]
+    Yields:
+        (factor_id, disciplina names (sorted, including those without projects), validated DataFrame)
+    """
+    # Track project names across all factors to detect duplicates
+    projeto_registry: Dict[str, tuple] = {} # {nome: (valor, factor-disciplina)} 
 
-    required_conditional = []
-    if factor_config.get("require_owner", False):
-        required_conditional.append("Dono de obra")
-    if factor_config.get("require_date", False):
-        required_conditional.append("Data")
-    
-    required_fields = required_always + required_conditional
-    missing = []
+    # Read every factor sheet in one pass over the workbook
+    factor_sheets = read_factor_sheets(competitor_file)
 
-    for field in required_fields:
-        value = row.get(field, None)
-        if pd.isna(value) or str(value).strip() == "":
-            missing.append(field)
-    
-    if missing:
-        note = f"Faltam campos obrigatórios: {', '.join(missing)}"
-        return False, note
+    for factor_id in FACTOR_STRUCTURE.keys():
+        sheet_name = f"Factor_{factor_id}"
+        if factor_id not in factor_sheets:
+            print(f"Warning: Sheet {sheet_name} not found for competitor {competitor_id}")
+            continue
     
-    return True, ""
+        df = factor_sheets[factor_id]
+        # Whole sheet validated at once (required fields, dates, duplicates, project cap)
+        validated = validate_sheet(df, FACTOR_RULES[factor_id], projeto_registry, context)
+        yield factor_id, sorted(df["Disciplina"].dropna().unique()), validated
+
 
-def read_excel_folder(input_dir: str = "data/input") -> List[Concorrente]:
-    """Reads Excel files and creates Concorrente objects with factor-aware validation"""
+def read_competitor_workbook(competitor_id, competitor_file: str, context: ScoringContext = DEFAULT_CONTEXT) -> Concorrente:
+    """
+    Parse and validate one competitor workbook into a Concorrente.
+    Independent of every other competitor (the duplicate-project registry is
+    per competitor), so workbooks can be parsed in separate processes.
+    """
+    factors = []
+    for factor_id, disciplina_names, validated in validated_factors(competitor_id, competitor_file, context):
+        rules = FACTOR_RULES[factor_id]
+        items = {name: [] for name in disciplina_names}
+        # A5 holds hours (formações, no limit on their number), A1-A4 costs (projetos)
+        item_class = Projeto if rules.strict else Formação
+        for disciplina_name, name, value, date_obj, status, obs in zip(*(validated[column].tolist() for column in VALIDATED_COLUMNS)):
+            items[disciplina_name].append(item_class(name, value, date_obj, obs, status))
+
+        disciplinas = [
+            Disciplina(name=disciplina_name, projetos=group) if rules.strict
+            else Disciplina(name=disciplina_name, formacoes=group)
+            for disciplina_name, group in items.items()
+        ]
+
+        factors.append(Factor(
+            id=factor_id,
+            name=FACTOR_STRUCTURE[factor_id]["name"],
+            disciplinas=disciplinas
+        ))
+
+    return Concorrente(id=competitor_id, factors=factors)
+
+
+def read_competitor_table(competitor_id, competitor_file: str, context: ScoringContext = DEFAULT_CONTEXT) -> ProjectTable:
+    """
+    Parse and validate one competitor workbook into a ProjectTable (columns
+    straight from the validated sheets, no object per project).
+    """
+    builder = ProjectTableBuilder()
+    builder.add_competitor(competitor_id)
+    for factor_id, disciplina_names, validated in validated_factors(competitor_id, competitor_file, context):
+        builder.add_factor(factor_id, FACTOR_STRUCTURE[factor_id]["name"])
+        is_formacao = not FACTOR_RULES[factor_id].strict
+        groups = dict(tuple(validated.groupby("Disciplina", sort=False)))
+        for disciplina_name in disciplina_names:
+            rows = groups.get(disciplina_name)
+            columns = [rows[column].tolist() for column in VALIDATED_COLUMNS[1:]] if rows is not None else []
+            builder.add_disciplina(disciplina_name, *columns, is_formacao=is_formacao)
+    return builder.build()
+
+
+def _competitor_jobs(input_dir: str, context: ScoringContext) -> list:
+    """(competitor_id, competitor_file, context) for every registered competitor with a workbook."""
     
     # First read competitors entry
     competitors_file = os.path.join(input_dir, "competitors.xlsx")
-    competitors_df = pd.read_excel(competitors_file)
+    competitors_df = pd.read_excel(competitors_file, usecols=["ID", "Nome"])
     
-    competitors = []
+    jobs = []
     for _, row in competitors_df.iterrows():
         competitor_id = row["ID"]
         competitor_name = row["Nome"]
@@ -55,174 +126,39 @@ def read_excel_folder(input_dir: str = "data/input") -> List[Concorrente]:
             print(f"Warning: No data file found for competitor {competitor_id}")
             continue
 
-        # Track project names across all factors to detect duplicates
-        projeto_registry: Dict[str, tuple] = {} # {nome: (valor, factor-disciplina)} 
-
-        factors = []
-        # Read each factor sheet
-        xl = pd.ExcelFile(competitor_file)
-
-        for factor_id in FACTOR_STRUCTURE.keys():
-            sheet_name = f"Factor_{factor_id}"
-            if sheet_name not in xl.sheet_names:
-                print(f"Warning: Sheet {sheet_name} not found for competitor {competitor_id}")
-                continue
-        
-            df = pd.read_excel(competitor_file, sheet_name=sheet_name)
-            factor_config = FACTOR_STRUCTURE[factor_id]
-            require_date = factor_config.get("require_date", False)
-
-            # Group by disciplina
-            disciplinas = []
-            for disciplina_name, group in df.groupby("Disciplina"):
-                # Filter out empty projects
-                valid_rows = group[group["Projeto"].notna()]
-
-                if factor_id == "A5":
-                    # For A5: parse hours instead of cost, re-use structure and no-limit on number of formações
-                    formacoes = []
-                    for _, row in valid_rows.iterrows():
-                        # Check required fields
-                        fields_valid, fields_note = validate_required_fields(row, factor_id)
-                        if not fields_valid:
-                            formacao = Formação(
-                                name=row.get("Projeto", ""),
-                                hours=0.0,
-                                date=None,
-                                observations=fields_note,
-                                status="DESCL"
-                            )
-                            formacoes.append(formacao)
-                            continue
-
-                        # Parse date if provided
-                        date_obj = None
-                        date_obs = ""
-
-                        has_date = pd.notna(row.get("Data", None))
-
-                        if require_date and not has_date:
-                            # Date is required but missing:
-                            formacao = Formação(
-                                name=row["Projeto"],
-                                hours=float(row["Valor de obra"]),
-                                date=None,
-                                observations="sem data",
-                                status="DESCL"
-                            )
-                            formacoes.append(formacao)
-                            continue
-                        
-                        elif has_date:
-                            # Date provided, try to parse it
-                            date_obj, date_parse_valid, date_parse_note = parse_date(row.get("Data", None))
-                            if not date_parse_valid:
-                                # Date was provided but invalid format
-                                formacao = Formação(
-                                    name=row["Projeto"],
-                                    hours=float(row["Valor de obra"]),
-                                    date=None,
-                                    observations=date_parse_note,
-                                    status="DESCL"
-                                )
-                                formacoes.append(formacao)
-                                continue
-                            # Date is valid, validate age
-                            is_valid, status, obs = validate_date(date_obj, item_type="formacao")
-                            date_obs = obs
-                        
-                        # If we get here, all validations passed
-                        formacao = Formação(
-                            name=row["Projeto"],
-                            hours=float(row["Valor de obra"]),
-                            date=date_obj,
-                            observations=date_obs,
-                            status=""
-                        )
-                        formacoes.append(formacao)
-                    
-                    disciplinas.append(Disciplina(name=disciplina_name, formacoes=formacoes))
-                
-                else:
-                    # A1-A4: Projetos with strict validation
-                    projetos = []
-                    for _, row in valid_rows.iterrows():
-                        projeto_name = row.get("Projeto", "").strip()
-                        
-                        # 1. Check required fields (stricter for A1-A4)
-                        fields_valid, fields_note = validate_required_fields(row, factor_id)
-                        if not fields_valid:
-                            projeto = Projeto(
-                                name=projeto_name,
-                                cost=0.0,
-                                date=None,
-                                observations=fields_note,
-                                status="DESCL"
-                            )
-                            projetos.append(projeto)
-                            continue
-                        
-                        # Parse and validate date
-                        date_obj, date_parse_valid, date_parse_note = parse_date(row.get("Data", None))
-                        
-                        if not date_parse_valid:
-                            projeto = Projeto(
-                                name=projeto_name,
-                                cost=float(row["Valor de obra"]) if pd.notna(row["Valor de obra"]) else 0.0,
-                                date=None,
-                                observations=date_parse_note,
-                                status="DESCL"
-                            )
-                            projetos.append(projeto)
-                            continue
-                        
-                        # Validate age
-                        is_valid, age_status, age_obs = validate_date(date_obj, item_type="projeto")
-                        
-                        projeto_cost = float(row["Valor de obra"])
-                        current_obs = age_obs
-                        current_status = age_status
-                        
-                        # Check for duplicate names and value consistency
-                        if projeto_name in projeto_registry:
-                            registered_cost, registered_location = projeto_registry[projeto_name]
-                            if registered_cost != projeto_cost:
-                                current_obs = f"Mesmo projeto, valores diferentes: aplica-se valor de '{registered_location}' (€{registered_cost:,.2f})"
-                                projeto_cost = registered_cost
-                        else:
-                            # Register this project's first occurrence
-                            projeto_registry[projeto_name] = (projeto_cost, f"{factor_id}-{disciplina_name}")
-                        
-                        projeto = Projeto(
-                            name=projeto_name,
-                            cost=projeto_cost,
-                            date=date_obj,
-                            observations=current_obs,
-                            status=current_status
-                        )
-                        projetos.append(projeto)
-                    
-                    # Enforce MAX_PROJECTS_PER_DISCIPLINA limit (only on non-disqualified)
-                    non_descl = [p for p in projetos if p.status != "DESCL"]
-                    descl = [p for p in projetos if p.status == "DESCL"]
-                    
-                    if len(non_descl) > MAX_PROJECTS_PER_DISCIPLINA:
-                        print(f"Warning: Disciplina '{disciplina_name}' in factor {factor_id} has {len(non_descl)} valid projects. "
-                              f"Keeping only first {MAX_PROJECTS_PER_DISCIPLINA}.")
-                        projetos = non_descl[:MAX_PROJECTS_PER_DISCIPLINA] + descl
-                    
-                    disciplinas.append(Disciplina(name=disciplina_name, projetos=projetos))
-
-            factors.append(Factor(
-                id=factor_id,
-                name=FACTOR_STRUCTURE[factor_id]["name"],
-                disciplinas=disciplinas
-            ))
-
-        competitors.append(Concorrente(id=competitor_id, factors=factors))
-    
+        jobs.append((competitor_id, competitor_file, context))
+    return jobs
+
+
+def _read_workbooks(read_function, jobs: list, workers: Optional[int]) -> list:
+    if workers == 1 or len(jobs) <= 1:
+        return [read_function(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(read_function, *zip(*jobs)))
+
+
+def read_excel_folder(input_dir: str = "data/input", context: ScoringContext = DEFAULT_CONTEXT,
+                      workers: Optional[int] = 1) -> List[Concorrente]:
+    """
+    Reads Excel files and creates Concorrente objects with factor-aware validation
+    (date limits, reference date and project cap taken from the scoring context)
+
+    workers: processes parsing competitor workbooks in parallel
+             (None = all cores, 1 = run in this process)
+    """
+    competitors = _read_workbooks(read_competitor_workbook, _competitor_jobs(input_dir, context), workers)
     return sorted(competitors, key=lambda x: x.id)
 
+
+def read_excel_table(input_dir: str = "data/input", context: ScoringContext = DEFAULT_CONTEXT,
+                     workers: Optional[int] = 1) -> ProjectTable:
+    """
+    read_excel_folder into one columnar ProjectTable (competitors sorted by id);
+    table.concorrentes() gives the same tree as views.
+    """
+    tables = _read_workbooks(read_competitor_table, _competitor_jobs(input_dir, context), workers)
+    return ProjectTable.concat(sorted(tables, key=lambda table: table.competitor_ids[0]))
+
 def read_bids_from_registry(input_dir: str = "data/input") -> List[Bid]:
     """
     Read bids from the competitors.xlsx registry file.
@@ -249,4 +185,37 @@ def read_bids_from_registry(input_dir: str = "data/input") -> List[Bid]:
             # ignore malformed rows
             continue
     
-    return bids_list
\ No newline at end of file
+    return bids_list
+
+
+def read_lots_from_registry(input_dir: str = "data/input") -> List[Lot]:
+    """
+    Read a multi-lot tender from lots.xlsx.
+    Expects sheets:
+        Lotes:     Lote, Preço base
+        Propostas: Lote, ID, Nome, Preço
+    Returns a list of src.models.bids_price.Lot (in sheet order), or [] if missing
+    """
+    lots_file = os.path.join(input_dir, "lots.xlsx")
+    if not os.path.exists(lots_file):
+        return []
+
+    with pd.ExcelFile(lots_file) as xl:
+        lots_df = xl.parse("Lotes", dtype={"Lote": str})
+        bids_df = xl.parse("Propostas", dtype={"Lote": str})
+
+    lots = {}
+    for lot_id, base_price in zip(lots_df["Lote"], lots_df["Preço base"]):
+        if pd.isna(lot_id) or pd.isna(base_price):
+            continue
+        lots[lot_id] = Lot(id=lot_id, base_price=float(base_price))
+
+    bids_df = bids_df[bids_df["Preço"].notna() & bids_df["Lote"].isin(lots.keys())]
+    for lot_id, bid_id, name, price in zip(bids_df["Lote"], bids_df["ID"], bids_df["Nome"], bids_df["Preço"]):
+        try:
+            lots[lot_id].bids.append(Bid(id=int(bid_id), name=str(name), price=float(price)))
+        except (TypeError, ValueError):
+            # ignore malformed rows
+            continue
+
+    return list(lots.values())
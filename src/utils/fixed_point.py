@@ -0,0 +1,93 @@
+from math import lcm
+
+import numpy as np
+
+# Exact scoring mode: money as int64 cents, scores as int64 micro-points.
+# Integer sums are exact and independent of summation order, so equal scores
+# are real ties instead of float noise.
+CENTS = 100
+MICRO_POINTS = 1_000_000
+
+
+def to_fixed(values, scale=CENTS):
+    """Floats (euros, hours, points) to int64 fixed point, rounded to the nearest unit."""
+    return np.rint(np.asarray(values, dtype=float) * scale).astype(np.int64)
+
+
+def from_fixed(values, scale=CENTS):
+    """int64 fixed point back to floats (for display)."""
+    return np.asarray(values, dtype=np.int64) / scale
+
+
+def _div_round(numerator, denominator):
+    """Integer division rounded half up (denominator > 0), element-wise on int64."""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def score_micropoints(cents, curve_function, **curve_kwargs):
+    """
+    Score integer-cent prices with a price curve and quantize to micro-points.
+
+    The curves are transcendental (e^x, sqrt), so they cannot be evaluated
+    exactly; each price is evaluated once from its exact cent value and rounded
+    to an int64, which makes every later comparison and sum deterministic.
+    """
+    prices = from_fixed(cents)
+    return to_fixed(curve_function(prices, **curve_kwargs), MICRO_POINTS)
+
+
+def linear_abs_micropoints(cents, min_cents, max_cents, min_score, max_score):
+    """
+    Exact integer version of linear_abs: min_cents → min_score, max_cents → max_score,
+    0 below min_cents, max_score above max_cents. The interpolation is a ratio of
+    integers rounded half up to micro-points.
+
+    Args:
+        cents: int64 values (costs in cents, or hours in centi-hours)
+        min_cents, max_cents: thresholds in the same unit (scalars or arrays)
+        min_score, max_score: integer point scores
+    """
+    cents = np.asarray(cents, dtype=np.int64)
+    min_cents = np.asarray(min_cents, dtype=np.int64)
+    max_cents = np.asarray(max_cents, dtype=np.int64)
+    min_points = int(round(min_score * MICRO_POINTS))
+    max_points = int(round(max_score * MICRO_POINTS))
+
+    width = np.maximum(max_cents - min_cents, 1)
+    inside = min_points + _div_round((np.clip(cents, min_cents, max_cents) - min_cents) * (max_points - min_points), width)
+    return np.select([cents < min_cents, cents > max_cents], [0, max_points], default=inside)
+
+
+def weighted_total(factor_scores, factor_max, weights):
+    """
+    Exact weighted total Σ w · P / P_max as a rational with a common denominator.
+
+    Args:
+        factor_scores: (competitors, factors) int64 micro-points
+        factor_max: (factors,) integer max points of each factor
+        weights: (factors,) integer weights
+
+    Returns:
+        (numerators, denominator): integer numerators per competitor over one shared
+        denominator; equal numerators are exact ties. numerators / denominator is
+        the total in micro-points.
+    """
+    factor_max = [int(m) if m else 1 for m in factor_max]
+    denominator = lcm(*factor_max)
+    # Python ints (object arrays): the common denominator can push the products past int64
+    multipliers = np.array([int(w) * (denominator // m) for w, m in zip(weights, factor_max)], dtype=object)
+    numerators = np.asarray(factor_scores, dtype=np.int64).astype(object) @ multipliers
+    return numerators, denominator
+
+
+def tie_groups(values, mask=None):
+    """
+    Groups of positions with exactly equal values (only groups of two or more).
+
+    Returns:
+        List of index arrays, ordered by value (highest first)
+    """
+    values = np.asarray(values)
+    positions = np.arange(len(values)) if mask is None else np.flatnonzero(mask)
+    unique, inverse, counts = np.unique(values[positions], return_inverse=True, return_counts=True)
+    return [positions[inverse == u] for u in np.flatnonzero(counts > 1)[::-1]]
@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+
+from src.config.config_price import MAX_PRICE
+
+CURVE_COLORS = ['blue', 'green', 'orange', 'purple', 'pink']
+
+
+class FrameRenderer:
+    """
+    Price-curve plot built once and redrawn per frame.
+
+    The figure, axes, ticks, reference lines and legend are created and drawn
+    once in the constructor and kept as a background bitmap; update() only
+    replaces the curve y-data, the bid scatter offsets and the title text, and
+    render() restores the background and draws just those artists (blitting),
+    without pyplot or savefig. Frames go to a PNG sequence (encoded on worker
+    threads) or an animated GIF.
+    """
+
+    def __init__(self, curve_names, prices, max_price=MAX_PRICE, anorm_x=0.0, n_points=500,
+                 figsize=(16, 10), dpi=100):
+        self.prices = np.asarray(prices, dtype=float)
+        self.xs = np.linspace(0, max_price, n_points)
+
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        ax = self.figure.add_subplot()
+        self.ax = ax
+
+        # Static artists
+        ax.axvline(max_price, color='red', linestyle='--', linewidth=1)
+        if anorm_x and anorm_x > 0:
+            ax.axvline(anorm_x, color='brown', linestyle='--', linewidth=0.5)
+        ax.set_xlim(0, max_price * 1.1)
+        ax.set_ylim(-5, 105)
+        ax.set_yticks(np.arange(0, 101, 10))
+        ticks = sorted(set(np.linspace(0, max_price, 6).tolist()) | {max_price})
+        ax.set_xticks(ticks, [f"{t / 1e6:.1f}M€" if t != max_price else f"{t / 1e6:.2f}M€\nPREÇO BASE" for t in ticks],
+                      fontsize=8)
+        ax.set_ylabel("PONTUAÇÃO (0–100)")
+        ax.grid(True)
+        for spine in ax.spines.values():
+            spine.set_linewidth(0.5)
+
+        # Dynamic artists: one line and one scatter per curve
+        self.lines = []
+        self.scatters = []
+        empty = np.full(len(self.prices), np.nan)
+        for i, curve_name in enumerate(curve_names):
+            color = CURVE_COLORS[i % len(CURVE_COLORS)]
+            line, = ax.plot(self.xs, np.full(n_points, np.nan), color=color, linewidth=1.5,
+                            label=f"Curva {curve_name.capitalize()}", animated=True)
+            self.lines.append(line)
+            self.scatters.append(ax.scatter(self.prices, empty, s=20, color=color, alpha=0.8, animated=True))
+        ax.legend(loc='lower left', fontsize=8)
+        self.title = ax.set_title(" ", pad=20, animated=True)
+        self.figure.tight_layout()
+
+        # Background without the animated artists, restored before every frame
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+
+    def update(self, curve_values, bid_scores, title=""):
+        """
+        Replace the frame data.
+
+        Args:
+            curve_values: (C, n_points) curve scores over self.xs
+            bid_scores: (C, N) bid scores (NaN hides a bid)
+            title: frame title
+        """
+        for line, scatter, ys, scores in zip(self.lines, self.scatters, curve_values, bid_scores):
+            line.set_ydata(ys)
+            scatter.set_offsets(np.column_stack((self.prices, scores)))
+        self.title.set_text(title)
+
+    def render(self) -> np.ndarray:
+        """Draw the current frame; returns the RGBA pixel buffer (H, W, 4)."""
+        self.canvas.restore_region(self.background)
+        for artist in (*self.lines, *self.scatters, self.title):
+            self.figure.draw_artist(artist)
+        return np.asarray(self.canvas.buffer_rgba())
+
+    def render_frames(self, frames, output, fps=5, workers=4):
+        """
+        Render (curve_values, bid_scores, title) frames to `output`: a directory
+        (PNG sequence frame_00000.png, ...) or a .gif file (animated, frames
+        palette-quantized as they are rendered).
+
+        Returns:
+            Number of frames written
+        """
+        as_gif = output.lower().endswith(".gif")
+        if not as_gif:
+            os.makedirs(output, exist_ok=True)
+
+        gif_frames = []
+        pending = []
+        count = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for count, (curve_values, bid_scores, title) in enumerate(frames, start=1):
+                self.update(curve_values, bid_scores, title)
+                # Copy: the canvas buffer is reused by the next frame
+                image = Image.fromarray(self.render()[..., :3].copy())
+                if as_gif:
+                    gif_frames.append(image.quantize(colors=64))
+                else:
+                    # PNG compression releases the GIL, so frames are encoded in parallel
+                    path = os.path.join(output, f"frame_{count - 1:05d}.png")
+                    pending.append(pool.submit(image.save, path, compress_level=1))
+                    if len(pending) > 2 * workers:
+                        pending.pop(0).result()
+            for future in pending:
+                future.result()
+
+        if as_gif and gif_frames:
+            gif_frames[0].save(output, save_all=True, append_images=gif_frames[1:],
+                               duration=int(1000 / fps), loop=0)
+        return count
+
+    def close(self):
+        self.figure.clear()
@@ -0,0 +1,388 @@
+import bisect
+import json
+import math
+import os
+from typing import Dict, List
+
+import numpy as np
+
+from src.config.scoring_context import DEFAULT_CONTEXT, ScoringContext
+from src.models.bids_price import Bid
+from src.utils.abnormal_low import abnormal_low_threshold
+from src.utils.artifacts import atomic_write
+from src.utils.curves import BID_RELATIVE_CURVES, BidStats, curve_kwargs
+
+
+class SortedBids:
+    """
+    Accepted (price, bid_id) pairs in ascending order, kept as a list of blocks of
+    at most 2 × load pairs with per-block price sums and squared deviations (a
+    sorted list with order statistics).
+
+    Insert and remove cost a binary search over the block maxima plus O(load) work
+    inside one block; the k-th price, the sum of the k lowest prices and the count
+    of prices at or below a value and the variance add one pass over the block
+    totals, O(n / load).
+    A flat sorted list would move O(n) items on every insert or remove.
+    """
+
+    def __init__(self, pairs=(), load: int = 512):
+        self.load = load
+        pairs = sorted(pairs)
+        self._blocks = [pairs[i:i + load] for i in range(0, len(pairs), load)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._sums = []
+        self._m2 = []
+        for i in range(len(self._blocks)):
+            self._sums.append(0.0)
+            self._m2.append(0.0)
+            self._update(i)
+        self._len = len(pairs)
+
+    def __len__(self):
+        return self._len
+
+    def _update(self, i):
+        # Block totals recomputed (not patched) so no rounding accumulates
+        prices = [price for price, _ in self._blocks[i]]
+        self._sums[i] = math.fsum(prices)
+        mean = self._sums[i] / len(prices)
+        self._m2[i] = math.fsum((price - mean) ** 2 for price in prices)
+        self._maxes[i] = self._blocks[i][-1]
+
+    def add(self, price: float, bid_id):
+        pair = (price, bid_id)
+        if not self._blocks:
+            self._blocks.append([pair])
+            self._maxes.append(pair)
+            self._sums.append(0.0)
+            self._m2.append(0.0)
+            self._update(0)
+        else:
+            i = min(bisect.bisect_left(self._maxes, pair), len(self._blocks) - 1)
+            block = self._blocks[i]
+            bisect.insort(block, pair)
+            if len(block) > 2 * self.load:
+                self._blocks[i:i + 1] = [block[:self.load], block[self.load:]]
+                self._maxes.insert(i, None)
+                self._sums.insert(i, 0.0)
+                self._m2.insert(i, 0.0)
+                self._update(i + 1)
+            self._update(i)
+        self._len += 1
+
+    def remove(self, price: float, bid_id):
+        pair = (price, bid_id)
+        i = bisect.bisect_left(self._maxes, pair)
+        block = self._blocks[i]
+        del block[bisect.bisect_left(block, pair)]
+        if block:
+            self._update(i)
+        else:
+            del self._blocks[i], self._maxes[i], self._sums[i], self._m2[i]
+        self._len -= 1
+
+    def prices(self) -> List[float]:
+        """All prices, ascending."""
+        return [price for block in self._blocks for price, _ in block]
+
+    def min_price(self) -> float:
+        return self._blocks[0][0][0]
+
+    def price_at(self, k: int) -> float:
+        """k-th lowest price (0-based)."""
+        for block in self._blocks:
+            if k < len(block):
+                return block[k][0]
+            k -= len(block)
+        raise IndexError("price index out of range")
+
+    def lowest_sum(self, k: int) -> float:
+        """Sum of the k lowest prices."""
+        total = 0.0
+        for block, block_sum in zip(self._blocks, self._sums):
+            if k >= len(block):
+                total += block_sum
+                k -= len(block)
+            else:
+                return total + math.fsum(price for price, _ in block[:k])
+        return total
+
+    def count_at_most(self, price: float) -> int:
+        """Number of prices <= price."""
+        key = (price, float("inf"))
+        i = bisect.bisect_right(self._maxes, key)
+        count = sum(len(block) for block in self._blocks[:i])
+        return count + (bisect.bisect_right(self._blocks[i], key) if i < len(self._blocks) else 0)
+
+    def ids_between(self, lo: float, hi: float):
+        """Ids of the bids with lo < price <= hi."""
+        lo_key, hi_key = (lo, float("inf")), (hi, float("inf"))
+        for i in range(bisect.bisect_right(self._maxes, lo_key), len(self._blocks)):
+            block = self._blocks[i]
+            start = bisect.bisect_right(block, lo_key)
+            end = bisect.bisect_right(block, hi_key)
+            yield from (bid_id for _, bid_id in block[start:end])
+            if end < len(block):
+                return
+
+    def variance(self) -> float:
+        """Population variance of the prices, block deviations merged as in bid_stream.RunningStats."""
+        count, mean, m2 = 0, 0.0, 0.0
+        for block, block_sum, block_m2 in zip(self._blocks, self._sums, self._m2):
+            n = len(block)
+            delta = block_sum / n - mean
+            total = count + n
+            mean += delta * n / total
+            m2 += block_m2 + delta * delta * count * n / total
+            count = total
+        return m2 / count if count else 0.0
+
+
+# Abnormally-low thresholds read from the running aggregates (same results as
+# abnormal_low.ABNORMAL_LOW_DETECTORS over the sorted accepted prices)
+
+def _running_median(index, count, total, factor=0.8):
+    return 0.5 * (index.price_at((count - 1) // 2) + index.price_at(count // 2)) * factor
+
+
+def _running_trimmed_mean(index, count, total, factor=0.8, trim=0.1):
+    if not 0.0 <= trim < 0.5:
+        raise ValueError(f"trim must be in [0, 0.5), got {trim}")
+    cut = math.floor(count * trim)
+    kept = count - 2 * cut
+    return (index.lowest_sum(count - cut) - index.lowest_sum(cut)) / kept * factor if kept > 0 else 0.0
+
+
+def _running_iterative(index, count, total, factor=0.8, max_iter=None):
+    # Each round: one rank query and one prefix sum instead of a pass over the bids
+    threshold = total / count * factor
+    excluded = 0
+    for _ in range(count if max_iter is None else max_iter):
+        below = min(index.count_at_most(threshold), count - 1)
+        if below <= excluded:
+            break
+        excluded = below
+        threshold = (total - index.lowest_sum(below)) / (count - below) * factor
+    return threshold
+
+
+def _running_std_band(index, count, total, factor=0.8, n_std=1.0):
+    return max(total / count - n_std * math.sqrt(index.variance()), 0.0)
+
+
+RUNNING_DETECTORS = {
+    "mean": lambda index, count, total, factor=0.8: total / count * factor,
+    "median": _running_median,
+    "trimmed": _running_trimmed_mean,
+    "iterative": _running_iterative,
+    "std": _running_std_band,
+}
+
+
+class IncrementalPriceEvaluation:
+    """
+    Price evaluation that is updated with deltas instead of re-scored.
+
+    Keeps running aggregates of the accepted bids: count, sum and a SortedBids
+    index (order statistics, block sums and sums of squares). Adding, removing or
+    correcting a bid updates them in O(log n + load) and the threshold is read back
+    from them: the mean from count and sum, the median and trimmed mean from order
+    statistics, the iterative detector with one rank query and one prefix sum per
+    round, the std band from the sum of squares (the last three in O(n / load)).
+    Curve scores depend only on each bid's own price, so unchanged bids keep their
+    scores (except with bid-relative curves, which re-score every bid when the
+    minimum, mean or count of the accepted bids changes); after a delta only the
+    PAB flags of bids whose price lies between the old and new abnormally-low
+    threshold are re-checked.
+
+    Bids are scored under a ScoringContext (max_price, if given, replaces its
+    base price); a saved state is only reused under the same settings.
+    """
+
+    def __init__(self, curve_functions, curve_names, max_price: float = None, pab_detector: Dict = None,
+                 context: ScoringContext = DEFAULT_CONTEXT):
+        self.curve_functions = list(curve_functions)
+        self.curve_names = list(curve_names)
+        self.context = context if max_price is None else context.replace(max_price=max_price)
+        self.max_price = self.context.max_price
+        self.pab_detector = dict(pab_detector or {"method": "mean", "factor": 0.8})
+
+        self.bids: Dict[int, Bid] = {}
+        self.scores: Dict[int, List[float]] = {}
+        self.pab: set = set()
+
+        # Running aggregates over accepted bids
+        self.count = 0
+        self.total = 0.0
+        self._index = SortedBids()  # (price, bid_id) of the accepted bids
+        self.anorm_x = 0.0
+
+    def is_accepted(self, bid: Bid) -> bool:
+        return bid.price <= self.max_price
+
+    def threshold(self) -> float:
+        """Abnormally-low threshold from the running aggregates (count, sum and the sorted index)."""
+        if not self.count:
+            return 0.0
+        settings = dict(self.pab_detector)
+        detector = RUNNING_DETECTORS.get(settings.pop("method"))
+        if detector is None:
+            # Detector without a running form: one pass over the sorted prices
+            return abnormal_low_threshold(np.array(self._index.prices()), **self.pab_detector)
+        return detector(self._index, self.count, self.total, **settings)
+
+    def bid_stats(self) -> BidStats:
+        """Count, lowest and mean accepted price from the running aggregates."""
+        if not self.count:
+            return BidStats(0, float("nan"), float("nan"))
+        return BidStats(self.count, self._index.min_price(), self.total / self.count)
+
+    def _insert(self, bid: Bid):
+        self.bids[bid.id] = bid
+        if self.is_accepted(bid):
+            self.count += 1
+            self.total += bid.price
+            self._index.add(bid.price, bid.id)
+
+    def _remove(self, bid_id: int):
+        bid = self.bids.pop(bid_id, None)
+        self.scores.pop(bid_id, None)
+        if bid is None or not self.is_accepted(bid):
+            return
+        self.count -= 1
+        self.total -= bid.price
+        if self.count == 0:
+            self.total = 0.0  # drop accumulated rounding once empty
+        self._index.remove(bid.price, bid.id)
+
+    def _score(self, bids: List[Bid]):
+        """Score only the given bids, one vectorized call per curve."""
+        if not bids:
+            return
+        prices = np.array([b.price for b in bids], dtype=float)
+        accepted = prices <= self.max_price
+        bid_stats = self.bid_stats()
+        columns = [
+            np.where(accepted, curve(prices, **curve_kwargs(curve, self.context, bid_stats)), 0.0)
+            for curve in self.curve_functions
+        ]
+        for i, bid in enumerate(bids):
+            self.scores[bid.id] = [float(column[i]) for column in columns]
+
+    def apply(self, additions=(), removals=(), corrections=()) -> Dict:
+        """
+        Apply a batch of deltas.
+
+        Args:
+            additions: new Bid objects
+            removals: ids of bids to remove
+            corrections: Bid objects replacing existing bids with the same id
+
+        Returns:
+            Dict with the old/new threshold, the PAB flips as (bid_id, old_flag, new_flag)
+            and whether every bid was re-scored (bid-relative curves, statistics changed)
+        """
+        old_threshold = self.anorm_x
+        old_stats = self.bid_stats()
+        touched = set()
+
+        for bid_id in removals:
+            self._remove(bid_id)
+            touched.add(bid_id)
+        for bid in list(corrections) + list(additions):
+            self._remove(bid.id)
+            self._insert(bid)
+            touched.add(bid.id)
+
+        # Bid-relative curves: a new minimum/mean/count changes every bid's score
+        rescore_all = (any(curve in BID_RELATIVE_CURVES for curve in self.curve_functions)
+                       and self.bid_stats() != old_stats)
+        self._score(list(self.bids.values()) if rescore_all else list(corrections) + list(additions))
+
+        new_threshold = self.threshold()
+        self.anorm_x = new_threshold
+
+        # Only bids between the two thresholds (plus the touched ones) can change flag
+        lo, hi = sorted((old_threshold, new_threshold))
+        candidates = set(self._index.ids_between(lo, hi)) | touched
+
+        flips = []
+        for bid_id in sorted(candidates):
+            bid = self.bids.get(bid_id)
+            new_flag = bid is not None and self.is_accepted(bid) and bid.price <= new_threshold
+            old_flag = bid_id in self.pab
+            if new_flag != old_flag:
+                if new_flag:
+                    self.pab.add(bid_id)
+                else:
+                    self.pab.discard(bid_id)
+                if bid is not None:
+                    flips.append((bid_id, old_flag, new_flag))
+
+        return {"old_threshold": old_threshold, "new_threshold": new_threshold, "pab_flips": flips,
+                "rescored_all": rescore_all}
+
+    def diff(self, current_bids: List[Bid]):
+        """
+        Compare a full bid list (e.g. a re-read registry) with the current state.
+
+        Returns:
+            (additions, removals, corrections)
+        """
+        current = {b.id: b for b in current_bids}
+        additions = [b for bid_id, b in current.items() if bid_id not in self.bids]
+        removals = [bid_id for bid_id in self.bids if bid_id not in current]
+        corrections = [
+            b for bid_id, b in current.items()
+            if bid_id in self.bids and (self.bids[bid_id].price != b.price or self.bids[bid_id].name != b.name)
+        ]
+        return additions, removals, corrections
+
+    # --- persistence ---
+
+    def config_key(self) -> Dict:
+        """Settings a saved state must match to be reused."""
+        return {"curves": self.curve_names, "max_price": self.max_price, "pab_detector": self.pab_detector,
+                "min_score": self.context.min_score, "max_score": self.context.max_score,
+                "ref_price": self.context.ref_price, "sigmoid_k": self.context.sigmoid_k,
+                "sigmoid_x0": self.context.sigmoid_x0}
+
+    def save(self, path: str):
+        state = {
+            "config": self.config_key(),
+            "count": self.count,
+            "total": self.total,
+            "anorm_x": self.anorm_x,
+            "bids": [[b.id, b.name, b.price] for b in self.bids.values()],
+            "scores": {str(bid_id): scores for bid_id, scores in self.scores.items()},
+            "pab": sorted(self.pab),
+        }
+        # Atomic: an interrupted run keeps the previous state instead of a truncated file
+        with atomic_write(path) as f:
+            json.dump(state, f)
+
+    @classmethod
+    def load(cls, path: str, curve_functions, curve_names, max_price: float = None, pab_detector: Dict = None,
+             context: ScoringContext = DEFAULT_CONTEXT):
+        """
+        Restore a saved state; returns None if the file is missing or was saved
+        with different curves/settings (the caller then starts from scratch).
+        """
+        evaluation = cls(curve_functions, curve_names, max_price=max_price, pab_detector=pab_detector, context=context)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("config") != evaluation.config_key():
+            return None
+
+        for bid_id, name, price in state["bids"]:
+            evaluation.bids[bid_id] = Bid(bid_id, name, price)
+        evaluation.scores = {int(bid_id): scores for bid_id, scores in state["scores"].items()}
+        evaluation.pab = set(state["pab"])
+        evaluation.count = state["count"]
+        evaluation.total = state["total"]
+        evaluation.anorm_x = state["anorm_x"]
+        evaluation._index = SortedBids((b.price, b.id) for b in evaluation.bids.values() if evaluation.is_accepted(b))
+        return evaluation
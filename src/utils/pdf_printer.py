@@ -5,26 +5,21 @@ from reportlab.lib.pagesizes import A4, A3, landscape
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
+from src.utils.artifacts import atomic_path
+
 PAGE_SIZES = {
     "A4": A4,
     "A3": A3
 }
 
-def txt_to_pdf(input_txt, font_name="Courier", base_font_size=12, page_size=A4, landscape_mode=False):
-    # Derive output name (same as input but with .pdf extension)
-    root, _ = os.path.splitext(input_txt)
-    output_pdf = root + ".pdf"
-
-    font_name = "Courier"
-
+def lines_to_pdf(lines, output_pdf, font_name="Courier", base_font_size=12, page_size=A4, landscape_mode=False):
+    """
+    Write text lines to a PDF in a monospaced font, scaled so the longest line fits the page width.
+    """
     # Page setup
     page_size = landscape(page_size) if landscape_mode else page_size
     page_width, page_height = page_size
 
-    # Read lines
-    with open(input_txt, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
     # Find longest line
     max_line = max(lines, key=lambda l: len(l)) if lines else ""
     max_line_width = pdfmetrics.stringWidth(max_line, font_name, base_font_size)
@@ -51,6 +46,23 @@ def txt_to_pdf(input_txt, font_name="Courier", base_font_size=12, page_size=A4,
         y -= line_height
 
     c.save()
+
+
+def txt_to_pdf(input_txt, output_pdf=None, font_name="Courier", base_font_size=12, page_size=A4, landscape_mode=False):
+    # Derive output name (same as input but with .pdf extension) unless given
+    if output_pdf is None:
+        root, _ = os.path.splitext(input_txt)
+        output_pdf = root + ".pdf"
+
+    font_name = "Courier"
+
+    # Read lines
+    with open(input_txt, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+
+    with atomic_path(output_pdf) as tmp_pdf:
+        lines_to_pdf(lines, tmp_pdf, font_name=font_name, base_font_size=base_font_size,
+                     page_size=page_size, landscape_mode=landscape_mode)
     print(f"Saved: {output_pdf}")
 
 
@@ -0,0 +1,92 @@
+import numpy as np
+from src.config.config_price import MAX_PRICE
+
+
+def bisect_price(curve_function, target, lo, hi, keep_lo, iterations, curve_kwargs):
+    """
+    Vectorized bisection over many intervals at once. keep_lo(score, target)
+    says whether the midpoint belongs to the lower half of the solution.
+    """
+    lo = lo.copy()
+    hi = hi.copy()
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        take_lo = keep_lo(curve_function(mid, **curve_kwargs), target)
+        lo = np.where(take_lo, mid, lo)
+        hi = np.where(take_lo, hi, mid)
+    return lo, hi
+
+
+def rank_flip_margins(prices, scores, accepted, curve_function, max_price=MAX_PRICE, iterations=60, **curve_kwargs):
+    """
+    For every pair of adjacent-ranked accepted bids (better A, worse B) find how
+    far a price has to move before the pair ties, i.e. before the order flips:
+        - worse_drop: how much B must lower its price to reach A's score
+        - better_rise: how much A must raise its price to fall to B's score
+          (NaN if A would have to go above max_price, where it is excluded)
+
+    All pairs are solved together with a vectorized bisection on the curve, so it
+    works for any non-increasing curve without re-running the evaluator.
+
+    Note: for the shipped curve families the parameters (k, x0, alpha, power, min/max
+    score) keep every curve non-increasing in price, so changing them never reorders
+    bids; only prices (or exclusion above max_price) can flip a pair.
+
+    Args:
+        prices, scores: arrays over all bids
+        accepted: boolean mask of bids that are ranked
+        curve_function: curve used to compute scores
+        curve_kwargs: forwarded to curve_function (min_score, max_score, ...)
+
+    Returns:
+        Dict of arrays, one entry per adjacent pair, ordered by rank:
+        better, worse (indices into prices), score_gap, worse_drop, better_rise
+    """
+    prices = np.asarray(prices, dtype=float)
+    scores = np.asarray(scores, dtype=float)
+    curve_kwargs = dict(curve_kwargs, max_price=max_price)
+    ranked = np.flatnonzero(accepted)
+    ranked = ranked[np.argsort(-scores[ranked], kind="stable")]
+
+    better, worse = ranked[:-1], ranked[1:]
+    score_a, score_b = scores[better], scores[worse]
+    price_a, price_b = prices[better], prices[worse]
+
+    # B lowers its price: largest p in [0, price_b] with curve(p) >= score_a
+    reachable = curve_function(np.zeros_like(price_b), **curve_kwargs) >= score_a
+    lo, _ = bisect_price(curve_function, score_a, np.zeros_like(price_b), price_b,
+                          lambda s, t: s >= t, iterations, curve_kwargs)
+    worse_drop = np.where(reachable, price_b - lo, np.nan)
+
+    # A raises its price: smallest p in [price_a, max_price] with curve(p) <= score_b
+    reachable = curve_function(np.full_like(price_a, max_price), **curve_kwargs) <= score_b
+    _, hi = bisect_price(curve_function, score_b, price_a, np.full_like(price_a, max_price),
+                          lambda s, t: s > t, iterations, curve_kwargs)
+    better_rise = np.where(reachable, hi - price_a, np.nan)
+
+    # Already tied pairs need no move at all
+    tied = score_a == score_b
+    worse_drop[tied] = 0.0
+    better_rise[tied] = 0.0
+
+    return {
+        "better": better,
+        "worse": worse,
+        "score_gap": score_a - score_b,
+        "worse_drop": worse_drop,
+        "better_rise": better_rise,
+    }
+
+
+def format_rank_flip_table(margins, bid_ids, prices):
+    """Build the rank-flip table lines (console and .txt)."""
+    prices = np.asarray(prices, dtype=float)
+    header = (f"{'Rank':<6}{'ID A':<12}{'ID B':<12}{'Δ Pontuação':<14}"
+              f"{'B baixa (€)':<20}{'B baixa (%)':<13}{'A sobe (€)':<20}{'A sobe (%)':<12}")
+    lines = [header, "-" * len(header)]
+    for rank, (a, b, gap, drop, rise) in enumerate(zip(margins["better"], margins["worse"], margins["score_gap"],
+                                                       margins["worse_drop"], margins["better_rise"]), start=1):
+        drop_str = f"{drop:<20,.2f}{drop / prices[b]:<13.4%}" if not np.isnan(drop) else f"{'—':<20}{'':<13}"
+        rise_str = f"{rise:<20,.2f}{rise / prices[a]:<12.4%}" if not np.isnan(rise) else f"{'— (FORA)':<20}{'':<12}"
+        lines.append(f"{rank:<6}{bid_ids[a]:<12}{bid_ids[b]:<12}{gap:<14.6f}{drop_str}{rise_str}")
+    return lines
@@ -0,0 +1,77 @@
+import numpy as np
+
+
+def rank_scores(scores, accepted=None):
+    """
+    Rank scores along the last axis: 1 = highest score, tied scores share the
+    best rank ("1, 2, 2, 4"). Works on 1-D bid vectors and on 2-D/3-D batches
+    (grid points or simulations × bids) in one vectorized pass.
+
+    Args:
+        scores: ndarray of scores, shape (..., n_bids)
+        accepted: Optional boolean mask broadcastable to scores. Rejected bids get rank 0.
+
+    Returns:
+        int64 ndarray with the same shape as scores
+    """
+    scores = np.asarray(scores, dtype=float)
+    if accepted is not None:
+        accepted = np.broadcast_to(accepted, scores.shape)
+        scores = np.where(accepted, scores, -np.inf)
+
+    # Sort descending (stable, so equal scores keep their input order)
+    order = np.argsort(-scores, axis=-1, kind="stable")
+    ordered = np.take_along_axis(scores, order, axis=-1)
+
+    # Each run of equal scores takes the position of its first element
+    positions = np.broadcast_to(np.arange(scores.shape[-1]), scores.shape)
+    new_group = np.ones(scores.shape, dtype=bool)
+    new_group[..., 1:] = ordered[..., 1:] != ordered[..., :-1]
+    group_start = np.maximum.accumulate(np.where(new_group, positions, 0), axis=-1)
+
+    ranks = np.empty(scores.shape, dtype=np.int64)
+    np.put_along_axis(ranks, order, group_start + 1, axis=-1)
+
+    if accepted is not None:
+        ranks[~accepted] = 0
+    return ranks
+
+
+def rank_scores_grouped(scores, groups, accepted=None):
+    """
+    Rank 1-D scores within groups (e.g. bids within lots): 1 = highest score of
+    its group, ties share the best rank. Rejected bids get rank 0.
+
+    Args:
+        scores: (N,) scores
+        groups: (N,) integer group codes
+        accepted: Optional (N,) boolean mask
+
+    Returns:
+        (N,) int64 ranks
+    """
+    scores = np.asarray(scores, dtype=float)
+    groups = np.asarray(groups)
+    if accepted is not None:
+        scores = np.where(accepted, scores, -np.inf)
+
+    # Sort by group, then by descending score (stable)
+    order = np.lexsort((-scores, groups))
+    ordered_scores = scores[order]
+    ordered_groups = groups[order]
+
+    positions = np.arange(len(scores))
+    group_changes = np.ones(len(scores), dtype=bool)
+    group_changes[1:] = ordered_groups[1:] != ordered_groups[:-1]
+    new_run = group_changes.copy()
+    new_run[1:] |= ordered_scores[1:] != ordered_scores[:-1]
+
+    group_start = np.maximum.accumulate(np.where(group_changes, positions, 0))
+    run_start = np.maximum.accumulate(np.where(new_run, positions, 0))
+
+    ranks = np.empty(len(scores), dtype=np.int64)
+    ranks[order] = run_start - group_start + 1
+
+    if accepted is not None:
+        ranks[~np.asarray(accepted)] = 0
+    return ranks
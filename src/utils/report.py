@@ -0,0 +1,150 @@
+from contextlib import nullcontext
+import csv
+from dataclasses import dataclass, field
+import sys
+from typing import Any, List, Optional, Sequence, Union
+
+from src.utils.artifacts import ArtifactWriter
+
+REPORT_FORMATS = ["console", "txt", "csv", "pdf"]
+
+
+@dataclass
+class Column:
+    """Report column: header, fixed width and format spec of its values (e.g. ',.2f')."""
+    header: str
+    width: int
+    fmt: str = ""
+
+
+@dataclass
+class Table:
+    """
+    Table block of a report.
+
+    rows holds tuples (one value per column, None for a blank cell) or plain
+    strings, written verbatim (separators, blank lines, notes). Only tuple rows
+    go to the CSV sink.
+    """
+    columns: List[Column]
+    rows: List[Union[tuple, str]] = field(default_factory=list)
+    title: str = ""
+    header: bool = True
+
+    def header_line(self) -> str:
+        return "".join(f"{column.header:<{column.width}}" for column in self.columns)
+
+    def separator(self) -> str:
+        return "-" * sum(column.width for column in self.columns)
+
+    def format_rows(self) -> List[str]:
+        """Format all rows with one compiled template (per-cell only for rows with blanks)."""
+        template = "".join(f"{{:<{column.width}{column.fmt}}}" for column in self.columns)
+        blanks = [" " * column.width for column in self.columns]
+        cells = [f"{{:<{column.width}{column.fmt}}}" for column in self.columns]
+        lines = []
+        for row in self.rows:
+            if isinstance(row, str):
+                lines.append(row)
+            elif None in row:
+                lines.append("".join(blank if value is None else cell.format(value)
+                                     for value, blank, cell in zip(row, blanks, cells)))
+            else:
+                lines.append(template.format(*row))
+        return lines
+
+
+class Report:
+    """
+    Report model: text lines and tables, formatted once into lines and written
+    to any number of sinks (console, txt, csv, pdf), each in a single buffered write.
+    """
+
+    def __init__(self):
+        self.blocks: List[Any] = []
+        self._lines: Optional[List[str]] = None
+
+    def text(self, *lines: str):
+        self.blocks.extend(lines)
+        self._lines = None
+
+    def table(self, columns: Sequence[Column], rows=None, title: str = "", header: bool = True) -> Table:
+        table = Table(list(columns), list(rows or []), title, header)
+        self.blocks.append(table)
+        self._lines = None
+        return table
+
+    def lines(self) -> List[str]:
+        """The report as text lines (formatted once and cached)."""
+        if self._lines is None:
+            lines = []
+            for block in self.blocks:
+                if isinstance(block, Table):
+                    if block.header:
+                        lines += [block.header_line(), block.separator()]
+                    lines += block.format_rows()
+                else:
+                    lines.append(block)
+            self._lines = lines
+        return self._lines
+
+    def text_output(self) -> str:
+        return "\n".join(self.lines()) + "\n"
+
+    # --- sinks ---
+
+    def to_console(self, stream=None):
+        (stream or sys.stdout).write(self.text_output())
+
+    def to_txt(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.text_output())
+
+    def to_csv(self, path: str):
+        """
+        Tuple rows of every table, raw values, with the table title as first column
+        (the tables of one report are expected to share their columns).
+        """
+        tables = [block for block in self.blocks if isinstance(block, Table)]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            if tables:
+                writer.writerow(["Secção"] + [column.header for column in tables[0].columns])
+            for table in tables:
+                writer.writerows([table.title, *row] for row in table.rows if not isinstance(row, str))
+
+    def to_pdf(self, path: str, page_size="A4", **pdf_options):
+        """PDF via reportlab (imported only when a PDF is requested); page_size may be a name ("A3")."""
+        from src.utils.pdf_printer import lines_to_pdf, PAGE_SIZES
+        if isinstance(page_size, str):
+            page_size = PAGE_SIZES[page_size.upper()]
+        lines_to_pdf(self.lines(), path, page_size=page_size, **pdf_options)
+
+    def write(self, base_path: str, formats=("console", "txt"), writer=None, **pdf_options) -> List[str]:
+        """
+        Write the report to the selected sinks; files are base_path + extension.
+
+        File sinks are submitted to `writer` (an ArtifactWriter: concurrent,
+        atomic, honours its skip list); without one, a private writer is used and
+        waited for before returning. The console sink is printed right away.
+
+        Returns:
+            Paths of the files submitted (written once the writer is waited for)
+        """
+        sinks = {"txt": self.to_txt, "csv": self.to_csv, "pdf": self.to_pdf}
+
+        # Text formatted here, once, before any sink runs on a worker thread
+        self.lines()
+        submitted = []
+        with (ArtifactWriter() if writer is None else nullcontext(writer)) as artifact_writer:
+            for report_format in formats:
+                if report_format == "console":
+                    self.to_console()
+                elif report_format in sinks:
+                    path = f"{base_path}.{report_format}"
+                    options = pdf_options if report_format == "pdf" else {}
+                    if artifact_writer.submit(report_format, path, sinks[report_format], **options) is not None:
+                        submitted.append(path)
+                else:
+                    raise ValueError(f"Unknown report format '{report_format}' (expected one of {REPORT_FORMATS})")
+        return submitted
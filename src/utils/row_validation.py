@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config.factor_structure import FACTOR_STRUCTURE
+from src.config.scoring_context import DEFAULT_CONTEXT, ScoringContext
+from src.utils.date_validation import age_checks, date_ages, parse_dates
+
+# Columns of a validated sheet (one row per projeto / formação)
+VALIDATED_COLUMNS = ["Disciplina", "name", "value", "date", "status", "observations"]
+
+
+@dataclass(frozen=True)
+class FactorRules:
+    """
+    Validation rules of one factor, compiled once from FACTOR_STRUCTURE.
+
+    required: columns that must be filled ("Projeto", "Valor de obra", plus
+              "Dono de obra" / "Data" when the factor requires them)
+    item_type: date-limit key ("projeto" or "formacao")
+    strict: projetos (A1-A4): every row needs a valid date, the age limit sets the
+            status, equal names with different costs are reconciled and the valid
+            projects per disciplina are capped. formações (A5, hours instead of
+            cost): the date is only checked if given and its age is a note.
+    """
+    factor_id: str
+    required: Tuple[str, ...]
+    require_date: bool
+    item_type: str
+    strict: bool
+
+
+def compile_rules(factor_structure=FACTOR_STRUCTURE) -> Dict[str, FactorRules]:
+    rules = {}
+    for factor_id, config in factor_structure.items():
+        required = ["Projeto", "Valor de obra"]
+        if config.get("require_owner", False):
+            required.append("Dono de obra")
+        if config.get("require_date", False):
+            required.append("Data")
+        is_formacao = config.get("type") == "formação"
+        rules[factor_id] = FactorRules(
+            factor_id=factor_id,
+            required=tuple(required),
+            require_date=config.get("require_date", False),
+            item_type="formacao" if is_formacao else "projeto",
+            strict=not is_formacao,
+        )
+    return rules
+
+
+FACTOR_RULES = compile_rules()
+
+
+def _blank(column: pd.Series) -> np.ndarray:
+    """Missing or whitespace-only cells."""
+    return (column.isna() | (column.astype(str).str.strip() == "")).to_numpy()
+
+
+def missing_fields(df: pd.DataFrame, rules: FactorRules) -> pd.Series:
+    """Per row, the note listing the required fields left empty ("" when complete)."""
+    missing = pd.Series("", index=df.index)
+    for field in rules.required:
+        blank = _blank(df[field]) if field in df.columns else np.ones(len(df), dtype=bool)
+        missing = missing.where(~blank, missing + field + ", ")
+    return ("Faltam campos obrigatórios: " + missing.str[:-2]).where(missing != "", "")
+
+
+def validate_sheet(df: pd.DataFrame, rules: FactorRules, registry: Dict[str, tuple],
+                   context: ScoringContext = DEFAULT_CONTEXT) -> pd.DataFrame:
+    """
+    Validate a whole Factor_* sheet with column masks instead of row by row.
+
+    Rows with Projeto and Disciplina come out grouped by disciplina (sorted, sheet
+    order inside each one, as groupby gives them) with name, value (cost or
+    hours), date, status and observations. On strict factors the projects over
+    the cap are dropped and, in capped disciplinas, the disqualified ones go last.
+
+    registry: {project name: (cost, "factor-disciplina")} of the competitor's
+              earlier factors; this sheet's first occurrences are added to it.
+
+    Returns:
+        DataFrame with VALIDATED_COLUMNS
+    """
+    rows = df[df["Projeto"].notna() & df["Disciplina"].notna()]
+    rows = rows.iloc[np.argsort(rows["Disciplina"].to_numpy(dtype=str), kind="stable")]
+    n = len(rows)
+
+    names = rows["Projeto"].astype(str)
+    if rules.strict:
+        names = names.str.strip()
+    names = names.to_numpy(dtype=object)
+    disciplinas = rows["Disciplina"].to_numpy(dtype=object)
+
+    # 1. Required fields
+    fields_note = missing_fields(rows, rules).to_numpy(dtype=object)
+    fields_valid = fields_note == ""
+    status = np.where(fields_valid, "", "DESCL").astype(object)
+    observations = fields_note.copy()
+    # Without the column (e.g. a sheet headed "Valor da obra") every row misses it and is DESCL
+    costs = rows["Valor de obra"].to_numpy() if "Valor de obra" in rows.columns else np.full(n, np.nan)
+    values = np.zeros(n)
+    values[fields_valid] = costs[fields_valid].astype(float)
+
+    # 2. Dates: projetos always need one; formações only check the ones given
+    data = rows["Data"].to_numpy(dtype=object) if "Data" in rows.columns else np.full(n, None, dtype=object)
+    to_parse = fields_valid.copy()
+    if not rules.strict:
+        to_parse &= pd.notna(data)
+        if rules.require_date:
+            no_date = fields_valid & ~to_parse
+            status[no_date] = "DESCL"
+            observations[no_date] = "sem data"
+
+    dates = np.full(n, None, dtype=object)
+    dated = np.zeros(n, dtype=bool)
+    parsed_dates, parse_valid, parse_notes = parse_dates(data[to_parse], context)
+    if len(parsed_dates):
+        dated[to_parse] = parse_valid
+        dates[dated] = [date for date, is_valid in zip(parsed_dates, parse_valid) if is_valid]
+        bad_date = to_parse & ~dated
+        status[bad_date] = "DESCL"
+        observations[bad_date] = [note for note, is_valid in zip(parse_notes, parse_valid) if not is_valid]
+
+    # 3. Age limits against the tender's reference date, all dated rows at once (only a note on formações)
+    if dated.any():
+        ages = date_ages(dates[dated], context.current_date)
+        age_status, age_obs = age_checks(ages, context.date_limits.get(rules.item_type, 10))
+        observations[dated] = age_obs
+        if rules.strict:
+            status[dated] = age_status
+
+    if rules.strict:
+        values = _reconcile_duplicates(rules, names, disciplinas, values, observations, dated, registry)
+
+    result = pd.DataFrame({
+        "Disciplina": disciplinas,
+        "name": names,
+        "value": values,
+        "date": pd.Series(dates, dtype=object),
+        "status": status,
+        "observations": observations,
+    }, columns=VALIDATED_COLUMNS)
+    return _cap_projects(result, rules, context) if rules.strict else result
+
+
+def _reconcile_duplicates(rules: FactorRules, names, disciplinas, values, observations, eligible, registry):
+    """
+    The first occurrence of a project name (in this or an earlier factor) sets
+    its cost; later rows with a different cost take it and get a note. Only
+    rows with complete fields and a valid date take part.
+    """
+    positions = np.flatnonzero(eligible)
+    if not len(positions):
+        return values
+    eligible_names = pd.Series(names[positions])
+
+    first = ~eligible_names.duplicated().to_numpy() & ~eligible_names.isin(list(registry)).to_numpy()
+    for position in positions[first]:
+        registry[names[position]] = (float(values[position]), f"{rules.factor_id}-{disciplinas[position]}")
+
+    reference = np.array([registry[name][0] for name in names[positions]])
+    differs = positions[reference != values[positions]]
+    for position in differs:
+        registered_cost, registered_location = registry[names[position]]
+        observations[position] = (f"Mesmo projeto, valores diferentes: aplica-se valor de "
+                                  f"'{registered_location}' (€{registered_cost:,.2f})")
+    values = values.copy()
+    values[positions] = reference
+    return values
+
+
+def _cap_projects(result: pd.DataFrame, rules: FactorRules, context: ScoringContext) -> pd.DataFrame:
+    """
+    Disciplinas with more than max_projects_per_disciplina valid projects keep
+    the first ones, followed by their disqualified projects.
+    """
+    cap = context.max_projects_per_disciplina
+    descl = (result["status"] == "DESCL").to_numpy()
+    valid_counts = result.loc[~descl, "Disciplina"].value_counts(sort=False)
+    over = valid_counts[valid_counts > cap]
+    if over.empty:
+        return result
+
+    for disciplina in sorted(over.index):
+        print(f"Warning: Disciplina '{disciplina}' in factor {rules.factor_id} has {over[disciplina]} valid projects. "
+              f"Keeping only first {cap}.")
+
+    capped = result["Disciplina"].isin(over.index).to_numpy()
+    valid_rank = pd.Series(~descl).groupby(result["Disciplina"].to_numpy()).cumsum().to_numpy()
+    keep = ~capped | descl | (valid_rank <= cap)
+    # Rows are grouped by disciplina already: move the disqualified ones last only where capped
+    order = np.lexsort((np.arange(len(result)), capped & descl, result["Disciplina"].to_numpy(dtype=str)))
+    order = order[keep[order]]
+    return result.iloc[order].reset_index(drop=True)